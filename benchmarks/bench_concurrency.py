@@ -0,0 +1,130 @@
+"""
+Latency of tool calls under mixed read/write load.
+
+Runs the same workload twice against a scratch data directory: once with
+every tool called inline on the event loop (how handlers used to run) and
+once through the registered async handlers. Prints p50/p95/p99 latency for
+reads and writes in each mode.
+
+Requests arrive open-loop (exponential gaps per client) and latency is
+measured from each request's scheduled time, so queueing behind a blocked
+event loop is included.
+
+    python benchmarks/bench_concurrency.py --clients 8 --calls 20 --slow-write-ms 10
+"""
+
+import argparse
+import asyncio
+import inspect
+import os
+import random
+import tempfile
+import time
+
+READS = [
+    ("get_progress", {}),
+    ("get_reading_log", {"limit": 20}),
+    ("get_next_book", {}),
+    ("get_similar_books", {"title": "Book 1"}),
+    ("get_favorite_authors", {}),
+]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def seed(call_sync, books: int) -> None:
+    call_sync("save_profile", name="Bench", domains=[
+        {"id": "fiction", "name": "Fiction", "target_books": books},
+        {"id": "science", "name": "Science", "target_books": books},
+    ], preferences={}, context={})
+    for i in range(books):
+        call_sync("log_book", title=f"Book {i}", author=f"Author {i % 25}",
+                  domain="fiction" if i % 2 else "science", rating=i % 5 + 1)
+    call_sync("save_bookstack", domain="fiction", books=[
+        {"title": f"Stack Book {i}", "author": f"Author {i}"} for i in range(30)
+    ])
+    for i in range(books - 1):
+        call_sync("add_book_connection", from_book=f"Book {i}", to_book=f"Book {i + 1}",
+                  relationship="next_step", reason="sequel")
+
+
+async def run_mode(mcp, inline: bool, clients: int, calls: int, write_ratio: float,
+                   interval_ms: float) -> dict:
+    tools = {t.name: t.fn for t in mcp._tool_manager.list_tools()}
+    timings = {"read": [], "write": []}
+    counter = iter(range(10**9))
+
+    async def one_call(name, args):
+        if inline:
+            return inspect.unwrap(tools[name])(**args)
+        return await mcp.call_tool(name, args)
+
+    async def client(seed_value):
+        rng = random.Random(seed_value)
+        scheduled = time.perf_counter()
+        for _ in range(calls):
+            # Open-loop arrivals: latency counts from when the request was
+            # due, so time spent waiting for a blocked event loop shows up.
+            scheduled += rng.expovariate(1000 / interval_ms)
+            await asyncio.sleep(max(0, scheduled - time.perf_counter()))
+            if rng.random() < write_ratio:
+                kind, name = "write", "log_book"
+                args = {"title": f"Bench {next(counter)}", "author": "Bench Author",
+                        "domain": "fiction", "rating": 4}
+            else:
+                kind = "read"
+                name, args = rng.choice(READS)
+            await one_call(name, args)
+            timings[kind].append((time.perf_counter() - scheduled) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(clients)))
+    wall = time.perf_counter() - start
+
+    return {
+        kind: {p: round(percentile(samples, p), 2) for p in (50, 95, 99)}
+        for kind, samples in timings.items() if samples
+    } | {"wall_s": round(wall, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--books", type=int, default=150)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--interval-ms", type=float, default=250,
+                        help="Mean time between requests from each client")
+    parser.add_argument("--slow-write-ms", type=float, default=0,
+                        help="Simulated latency added to every file write")
+    args = parser.parse_args()
+
+    os.environ["READING_COMPANION_DATA_DIR"] = tempfile.mkdtemp(prefix="rc-bench-")
+
+    from reading_companion import mcp, storage, markdown
+
+    if args.slow_write_ms:
+        original = storage.write_text
+
+        def slow_write(path, text):
+            time.sleep(args.slow_write_ms / 1000)
+            original(path, text)
+
+        storage.write_text = markdown.write_text = slow_write
+
+    tools = {t.name: t.fn for t in mcp._tool_manager.list_tools()}
+    seed(lambda tool, **kw: inspect.unwrap(tools[tool])(**kw), args.books)
+
+    for label, inline in (("blocking", True), ("async", False)):
+        result = asyncio.run(run_mode(
+            mcp, inline, args.clients, args.calls, args.write_ratio, args.interval_ms
+        ))
+        print(f"{label:>9}: {result}")
+
+
+if __name__ == "__main__":
+    main()
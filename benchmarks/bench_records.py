@@ -0,0 +1,118 @@
+"""
+Decode speed and memory of reading log entries as dicts and as records.
+
+Generates a synthetic reading log, then for each representation decodes
+reading_log.json, encodes it back and measures what the decoded entries
+keep alive: traced bytes per entry and the growth in resident memory.
+Each representation is measured in a fresh interpreter so RSS figures
+don't share allocator state.
+
+    python benchmarks/bench_records.py --entries 50000
+"""
+
+import argparse
+import gc
+import json
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+MODES = ("dict", "record")
+
+
+def rss_bytes() -> int:
+    """Current resident set size (Linux), or 0 where /proc isn't available."""
+    try:
+        pages = int(Path("/proc/self/statm").read_text().split()[1])
+    except OSError:
+        return 0
+    import resource
+    return pages * resource.getpagesize()
+
+
+def load(raw: bytes, mode: str) -> list:
+    if mode == "dict":
+        return json.loads(raw)["entries"]
+    from reading_companion.records import ReadingEntry
+
+    # Entries become records as the parser finishes each one, so their dicts never pile up
+    return json.loads(raw, object_hook=lambda d: ReadingEntry.decode(d) if "finished_at" in d else d)["entries"]
+
+
+def dump(entries: list, mode: str) -> str:
+    if mode == "record":
+        entries = [entry.to_dict() for entry in entries]
+    return json.dumps({"version": "1.0", "entries": entries}, separators=(",", ":"))
+
+
+def measure(path: str, mode: str, repeat: int) -> dict:
+    raw = Path(path).read_bytes()
+    # Import before the baseline so module code isn't counted
+    import reading_companion.records  # noqa: F401
+
+    decode_s = min(_timed(lambda: load(raw, mode)) for _ in range(repeat))
+
+    gc.collect()
+    before = rss_bytes()
+    tracemalloc.start()
+    entries = load(raw, mode)
+    gc.collect()
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss = rss_bytes() - before
+
+    encode_s = min(_timed(lambda: dump(entries, mode)) for _ in range(repeat))
+    assert json.loads(dump(entries, mode)) == json.loads(raw)
+    return {
+        "mode": mode,
+        "entries": len(entries),
+        "decode_ms": round(decode_s * 1000, 1),
+        "encode_ms": round(encode_s * 1000, 1),
+        "bytes_per_entry": round(traced / len(entries)),
+        "rss_mb": round(rss / 2**20, 1),
+    }
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--measure", nargs=2, metavar=("PATH", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(*args.measure, args.repeat)))
+        return
+
+    sys.path.insert(0, str(Path(__file__).parent))
+    from synthetic import generate
+
+    out_dir = Path(tempfile.mkdtemp(prefix="rc-records-"))
+    generate(out_dir, books=args.entries, authors=max(args.entries // 25, 1), connections=0)
+    path = out_dir / "progress" / "reading_log.json"
+
+    results = {}
+    for mode in MODES:
+        child = subprocess.run(
+            [sys.executable, __file__, "--repeat", str(args.repeat), "--measure", str(path), mode],
+            check=True, capture_output=True, text=True,
+        )
+        results[mode] = json.loads(child.stdout)
+        print(f"{mode:>7}: {results[mode]}")
+
+    dicts, records = results["dict"], results["record"]
+    print(f"records keep {1 - records['bytes_per_entry'] / dicts['bytes_per_entry']:.0%} fewer bytes per entry, "
+          f"decode takes {records['decode_ms'] / dicts['decode_ms']:.2f}x as long")
+
+
+if __name__ == "__main__":
+    main()
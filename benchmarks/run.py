@@ -0,0 +1,195 @@
+"""
+Benchmark every tool against a synthetic data directory.
+
+Generates a dataset at the chosen scale, calls each tool through its
+registered handler (dataset locks, transaction and worker pool, as the
+server runs it, but without an MCP transport) and records median latency
+and peak traced memory.
+Results are compared against benchmarks/baseline.json; any tool slower
+than --threshold times its baseline is reported as a regression.
+
+    python benchmarks/run.py --scale small
+    python benchmarks/run.py --scale large --repeat 3
+    python benchmarks/run.py --scale small --save-baseline
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+BASELINE = Path(__file__).with_name("baseline.json")
+
+# Slowdowns smaller than this are treated as noise regardless of ratio
+MIN_REGRESSION_MS = 2.0
+
+
+def tool_cases(sample: dict) -> list[tuple[str, dict]]:
+    """One representative call per tool, using titles and authors from the dataset."""
+    domain = sample["domain"]
+    title = sample["title"]
+    author = sample["author"]
+    return [
+        ("start_interview", {}),
+        ("get_profile", {}),
+        ("save_profile", {
+            "name": "Synthetic Reader",
+            "domains": sample["domains"],
+            "preferences": {"pacing": "steady"},
+            "context": {"avoidances": ["war"]},
+        }),
+        ("extract_context", {}),
+        ("update_latent_features", {"features": {"exploration_score": 0.7}}),
+        ("build_bookstack", {"domain": domain}),
+        ("get_bookstacks", {}),
+        ("get_next_book", {}),
+        ("save_bookstack", {"domain": "benchmark", "books": [
+            {"title": f"Benchmark Stack Book {i}", "author": author, "why": "benchmark"} for i in range(20)
+        ]}),
+        ("add_book_to_stack", {"domain": domain, "title": "Benchmark Addition", "author": author}),
+        ("log_book", {"title": "Benchmark Book", "author": author, "domain": domain, "rating": 4}),
+        ("start_reflection", {"title": title}),
+        ("save_reflection", {"title": title, "key_takeaway": "Benchmarks keep us honest",
+                             "craft_lessons": ["Measure first"]}),
+        ("get_reading_log", {"limit": 50}),
+        ("get_progress", {}),
+        ("get_reading_trends", {"period": "month"}),
+        ("facet_query", {"all_of": [f"domain:{domain}", "rating:5"], "none_of": ["reflection:yes"]}),
+        ("analyze_reading_patterns", {}),
+        ("get_author_profile", {"author": author}),
+        ("update_author_notes", {"author": author, "your_notes": "Consistent benchmark subject"}),
+        ("merge_authors", {}),
+        ("get_favorite_authors", {}),
+        ("add_book_connection", {"from_book": title, "to_book": sample["stack_title"],
+                                 "relationship": "next_step", "reason": "benchmark"}),
+        ("get_similar_books", {"title": sample["connected_title"]}),
+        ("suggest_connections", {"title": title}),
+        ("search_library", {"query": "memory craft"}),
+        ("export_library", {"format": "jsonl", "full": True}),
+        # Last: it moves old entries out of the hot log the other cases read
+        ("archive_reading_log", {"older_than_years": 5}),
+    ]
+
+
+def blocking(loop, handler):
+    """A synchronous function that runs an async tool handler to completion on loop."""
+    return lambda **kwargs: loop.run_until_complete(handler(**kwargs))
+
+
+def measure(func, kwargs: dict, repeat: int, clear_cache) -> dict:
+    """Median latency over untraced runs, then peak memory from one traced run."""
+    timings = []
+    for _ in range(repeat):
+        clear_cache()
+        start = time.perf_counter()
+        func(**kwargs)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    clear_cache()
+    tracemalloc.start()
+    func(**kwargs)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "ms": round(statistics.median(timings), 3),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        ratio = current["ms"] / max(previous["ms"], 0.001)
+        current["vs_baseline"] = round(ratio, 2)
+        if ratio > threshold and current["ms"] - previous["ms"] > MIN_REGRESSION_MS:
+            regressions.append(f"{name}: {previous['ms']} ms -> {current['ms']} ms ({ratio:.2f}x)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every tool against synthetic data")
+    parser.add_argument("--scale", default="small")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=1.5,
+                        help="Slowdown factor over baseline reported as a regression")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Store these results as the baseline for this scale")
+    parser.add_argument("--output", type=Path, help="Also write results as JSON here")
+    args = parser.parse_args()
+
+    data_dir = Path(tempfile.mkdtemp(prefix=f"rc-bench-{args.scale}-"))
+    os.environ["READING_COMPANION_DATA_DIR"] = str(data_dir)
+
+    sys.path.insert(0, str(Path(__file__).parent))
+    from synthetic import SCALES, generate
+    from reading_companion import get_server
+    from reading_companion.cache import clear_cache
+    from reading_companion.handlers import shutdown_handlers
+
+    if args.scale not in SCALES:
+        parser.error(f"--scale must be one of {', '.join(SCALES)}")
+
+    start = time.perf_counter()
+    sample = generate(data_dir, **SCALES[args.scale])
+    print(f"Generated {args.scale} dataset {SCALES[args.scale]} in {time.perf_counter() - start:.1f}s")
+
+    loop = asyncio.new_event_loop()
+    tools = {t.name: blocking(loop, t.fn) for t in get_server()._tool_manager.list_tools()}
+    cases = tool_cases(sample)
+    missing = sorted(set(tools) - {name for name, _ in cases})
+    if missing:
+        print(f"WARNING: no benchmark case for: {', '.join(missing)}")
+
+    results = {}
+    for name, kwargs in cases:
+        results[name] = measure(tools[name], kwargs, args.repeat, clear_cache)
+    shutdown_handlers()
+    loop.close()
+
+    baselines = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    baseline = baselines.get(args.scale, {}).get("tools", {})
+    regressions = compare(results, baseline, args.threshold)
+
+    print(f"\n{'tool':<26} {'median ms':>10} {'peak KiB':>10} {'vs base':>8}")
+    for name, r in results.items():
+        vs = f"{r['vs_baseline']:.2f}x" if "vs_baseline" in r else "-"
+        print(f"{name:<26} {r['ms']:>10.2f} {r['peak_kb']:>10.1f} {vs:>8}")
+
+    if args.output:
+        args.output.write_text(json.dumps({args.scale: results}, indent=2))
+
+    if args.save_baseline:
+        for r in results.values():
+            r.pop("vs_baseline", None)
+        baselines[args.scale] = {
+            "machine": f"{platform.system()} {platform.machine()} / Python {platform.python_version()}",
+            "repeat": args.repeat,
+            "tools": results,
+        }
+        args.baseline.write_text(json.dumps(baselines, indent=2) + "\n")
+        print(f"\nSaved baseline for '{args.scale}' to {args.baseline}")
+        return
+
+    if regressions:
+        print("\nRegressions:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    if baseline:
+        print(f"\nNo regressions over {args.threshold}x baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""
+Deterministic synthetic data directory generator.
+
+Writes a realistic reading-companion data directory (profile, reading log,
+authors, stacks, connections and patterns) at a configurable scale. The
+same arguments always produce byte-identical files.
+
+    python benchmarks/synthetic.py /tmp/rc-data --books 10000 --authors 2000 --connections 50000
+"""
+
+import argparse
+import json
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from reading_companion.storage import slugify
+
+SCALES = {
+    "small": {"books": 500, "authors": 100, "connections": 2000},
+    "medium": {"books": 2000, "authors": 400, "connections": 10000},
+    "large": {"books": 10000, "authors": 2000, "connections": 50000},
+}
+
+DOMAINS = [
+    ("classic_lit", "Classic Literature"),
+    ("neuroscience", "Neuroscience"),
+    ("philosophy", "Philosophy"),
+    ("history", "History"),
+    ("science_fiction", "Science Fiction"),
+    ("engineering", "Engineering"),
+]
+
+FIRST_NAMES = [
+    "Leo", "George", "Jane", "Virginia", "Fyodor", "Ursula", "Oliver", "Mary",
+    "Italo", "Toni", "Gabriel", "Iris", "Octavia", "Jorge", "Hannah", "Anton",
+]
+LAST_NAMES = [
+    "Tolstoy", "Eliot", "Austen", "Woolf", "Dostoevsky", "Le Guin", "Sacks", "Shelley",
+    "Calvino", "Morrison", "Marquez", "Murdoch", "Butler", "Borges", "Arendt", "Chekhov",
+]
+TITLE_WORDS = [
+    "Silent", "River", "Memory", "Garden", "Machine", "Winter", "Empire", "Mind",
+    "Light", "Shadow", "House", "Stranger", "Journey", "Brain", "City", "Night",
+    "Origin", "Island", "Letters", "Time", "Fire", "Glass", "Ocean", "Dream",
+]
+PHRASES = [
+    "how attention shapes perception", "the cost of ambition", "grief as a teacher",
+    "the limits of reason", "small choices compounding", "unreliable memory",
+    "power and its discontents", "the texture of ordinary days", "systems that fail quietly",
+    "learning by imitation", "the ethics of curiosity", "what cities remember",
+]
+STRENGTHS = ["strong", "moderate", "weak"]
+RELATIONSHIPS = ["similar_theme", "complements", "next_step", "contrast"]
+DIFFICULTIES = ["light", "moderate", "challenging"]
+
+BASE_DATE = datetime(2015, 1, 1)
+
+
+def _title(rng: random.Random, index: int) -> str:
+    words = rng.sample(TITLE_WORDS, rng.randint(1, 3))
+    return f"The {' '.join(words)} {index}"
+
+
+def _sentence(rng: random.Random) -> str:
+    return f"A book about {rng.choice(PHRASES)} and {rng.choice(PHRASES)}."
+
+
+def _write(path: Path, data: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2))
+
+
+def generate(
+    out_dir: Path,
+    books: int = 500,
+    authors: int = 100,
+    connections: int = 2000,
+    stack_size: int = 25,
+    seed: int = 42
+) -> dict:
+    """
+    Write a synthetic data directory to out_dir.
+
+    Args:
+        out_dir: Directory to write into (created if missing)
+        books: Reading log entries
+        authors: Distinct authors the logged books are spread across
+        connections: Book connections between logged titles
+        stack_size: Books per domain stack
+        seed: Random seed; the same seed always produces the same files
+
+    Returns sample titles, authors and domains for driving tool calls.
+    """
+    rng = random.Random(seed)
+    out_dir = Path(out_dir)
+
+    domains = [
+        {"id": domain_id, "name": name, "purpose": _sentence(rng), "target_books": books // len(DOMAINS)}
+        for domain_id, name in DOMAINS
+    ]
+    profile = {
+        "version": "1.0",
+        "created_at": BASE_DATE.isoformat(),
+        "updated_at": BASE_DATE.isoformat(),
+        "identity": {"name": "Synthetic Reader"},
+        "goals": {"domains": domains},
+        "preferences": {"pacing": "steady", "challenge_tolerance": "medium", "parallel_books": 2},
+        "context": {"mood": "curious", "avoidances": ["war", "true crime"]},
+        "latent_features": {"exploration_score": 0.6, "reader_archetype": "explorer"},
+    }
+
+    author_names = []
+    for i in range(authors):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        author_names.append(name if i < len(FIRST_NAMES) else f"{name} {i}")
+
+    # Spread books over the authors with a long tail, like a real library
+    weights = [1 / (i + 1) for i in range(authors)]
+    span_days = 365 * 10
+    entries = []
+    for i in range(books):
+        finished = BASE_DATE + timedelta(days=span_days * i / max(books, 1), hours=rng.randint(0, 23))
+        rating = rng.choice([None, 2, 3, 3, 4, 4, 4, 5, 5])
+        reflection = None
+        if rng.random() < 0.3:
+            reflection = {
+                "key_takeaway": _sentence(rng),
+                "craft_lessons": [_sentence(rng) for _ in range(rng.randint(0, 3))],
+                "personal_insights": [_sentence(rng) for _ in range(rng.randint(0, 2))],
+                "favorite_quotes": [_sentence(rng) for _ in range(rng.randint(0, 2))],
+                "next_appetite": rng.choice(["more_like_this", "ready_for_challenge", "palette_cleanser"]),
+                "reflected_at": (finished + timedelta(days=2)).isoformat(),
+            }
+        entries.append({
+            "id": f"log_{finished.strftime('%Y%m%d_%H%M%S')}_{i}",
+            "title": _title(rng, i),
+            "author": rng.choices(author_names, weights)[0],
+            "domain": rng.choice(domains)["id"],
+            "finished_at": finished.isoformat(),
+            "rating": rating,
+            "quick_note": _sentence(rng) if rng.random() < 0.5 else None,
+            "reflection": reflection,
+        })
+
+    authors_out = {}
+    for entry in entries:
+        slug = slugify(entry["author"])
+        author = authors_out.setdefault(slug, {
+            "name": entry["author"],
+            "books_read": [],
+            "total_books": 0,
+            "ratings": [],
+            "average_rating": None,
+            "first_read": entry["finished_at"],
+            "last_read": entry["finished_at"],
+            "affinity": "unknown",
+            "style_notes": {},
+            "your_notes": "",
+        })
+        author["books_read"].append(entry["title"])
+        author["total_books"] = len(author["books_read"])
+        author["last_read"] = entry["finished_at"]
+        if entry["rating"]:
+            author["ratings"].append(entry["rating"])
+            avg = round(sum(author["ratings"]) / len(author["ratings"]), 1)
+            author["average_rating"] = avg
+            author["affinity"] = "high" if avg >= 4.5 else "medium" if avg >= 3.5 else "low"
+    for author in authors_out.values():
+        if rng.random() < 0.2:
+            author["style_notes"] = {
+                "prose": _sentence(rng),
+                "themes": rng.sample(PHRASES, 2),
+                "strengths": [_sentence(rng)],
+            }
+            author["your_notes"] = _sentence(rng)
+
+    stacks = {}
+    for domain in domains:
+        stacks[domain["id"]] = {
+            "generated_at": BASE_DATE.isoformat(),
+            "description": _sentence(rng),
+            "books": [
+                {
+                    "title": _title(rng, books + len(stacks) * stack_size + j),
+                    "author": rng.choice(author_names),
+                    "why": _sentence(rng),
+                    "difficulty": rng.choice(DIFFICULTIES),
+                    "time_estimate": f"{rng.randint(1, 6)} weeks",
+                    "craft_focus": rng.choice(PHRASES),
+                    "position": j + 1,
+                }
+                for j in range(stack_size)
+            ],
+        }
+
+    titles = [e["title"] for e in entries]
+    connection_list = []
+    for i in range(connections if len(titles) > 1 else 0):
+        from_book, to_book = rng.sample(titles, 2)
+        connection_list.append({
+            "from": from_book,
+            "to": to_book,
+            "relationship": rng.choice(RELATIONSHIPS),
+            "reason": _sentence(rng),
+            "strength": rng.choice(STRENGTHS),
+            "created_at": (BASE_DATE + timedelta(minutes=i)).isoformat(),
+        })
+
+    _write(out_dir / "profile.json", profile)
+    _write(out_dir / "progress" / "reading_log.json", {"version": "1.0", "entries": entries})
+    _write(out_dir / "authors.json", {"version": "1.0", "authors": authors_out})
+    _write(out_dir / "bookstacks.json", {"version": "1.0", "stacks": stacks})
+    _write(out_dir / "connections.json", {"version": "1.0", "connections": connection_list, "clusters": []})
+    _write(out_dir / "patterns.json", {
+        "version": "1.0",
+        "analyzed_at": BASE_DATE.isoformat(),
+        "patterns": {
+            "themes_loved": [{"theme": name, "frequency": 1, "avg_rating": 4.0} for _, name in DOMAINS[:3]],
+            "themes_avoided": [],
+        },
+    })
+
+    return {
+        "domain": domains[0]["id"],
+        "domains": domains,
+        "title": entries[0]["title"] if entries else None,
+        "connected_title": connection_list[0]["from"] if connection_list else None,
+        "author": entries[0]["author"] if entries else None,
+        "stack_title": stacks[domains[0]["id"]]["books"][0]["title"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic reading-companion data directory")
+    parser.add_argument("out_dir", type=Path)
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--books", type=int)
+    parser.add_argument("--authors", type=int)
+    parser.add_argument("--connections", type=int)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    sizes = dict(SCALES[args.scale])
+    for key in sizes:
+        if getattr(args, key) is not None:
+            sizes[key] = getattr(args, key)
+
+    generate(args.out_dir, seed=args.seed, **sizes)
+    print(f"Wrote {sizes} to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,21 +4,151 @@ Reading Companion MCP Server
 A 4-stage reading companion that integrates with Claude Desktop.
 """
 
+import time
+
+_started_at = time.perf_counter()
+
 __version__ = "0.1.0"
 
-from mcp.server.fastmcp import FastMCP
+_server = None
+
+
+def get_server():
+    """
+    Create the MCP server on first use.
+
+    The MCP stack and tool modules are only imported here, so commands that
+    don't serve MCP (and `import reading_companion`) stay cheap.
+    """
+    global _server
+    if _server is None:
+        from .startup import phase
+
+        with phase("import_mcp"):
+            from mcp.server.fastmcp import FastMCP
 
-from .tools import register_all_tools
-from .resources import register_resources
+        with phase("import_tools"):
+            from .tools import register_all_tools
+            from .resources import register_resources
 
-# Initialize MCP server
-mcp = FastMCP("Reading Companion")
+        with phase("registration"):
+            server = FastMCP("Reading Companion")
+            register_all_tools(server)
+            register_resources(server)
 
-# Register all tools and resources
-register_all_tools(mcp)
-register_resources(mcp)
+        _server = server
+    return _server
 
 
-def main():
+def __getattr__(name):
+    # Keeps `from reading_companion import mcp` working without eager setup
+    if name == "mcp":
+        return get_server()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def main(argv=None):
     """Run the MCP server."""
-    mcp.run()
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="reading-companion", description="Reading Companion MCP server")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Time each startup phase up to the first tool response, print a report and exit"
+    )
+    parser.add_argument(
+        "--export",
+        choices=["csv", "jsonl", "parquet"],
+        metavar="FORMAT",
+        help="Export the library as csv, jsonl or parquet and exit"
+    )
+    parser.add_argument("--export-dir", help="Folder for --export (default: exports/ in the data directory)")
+    parser.add_argument("--full", action="store_true", help="With --export, rewrite everything instead of only changes")
+    parser.add_argument(
+        "--migrate-catalog",
+        action="store_true",
+        help="Give every book in existing data a catalog ID and exit"
+    )
+    parser.add_argument(
+        "--archive-log",
+        action="store_true",
+        help="Move log entries older than ARCHIVE_AFTER_YEARS into compressed yearly archives and exit"
+    )
+    parser.add_argument(
+        "--transport",
+        choices=["stdio", "streamable-http", "sse"],
+        default="stdio",
+        help="stdio for one client (Claude Desktop), or an HTTP transport for many"
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Serve on a local Unix socket that stdio servers proxy to, sharing one warm cache"
+    )
+    parser.add_argument("--no-daemon", action="store_true", help="Run standalone even if a daemon is running")
+    parser.add_argument("--host", default="127.0.0.1", help="Address for HTTP transports")
+    parser.add_argument("--port", type=int, default=8000, help="Port for HTTP transports")
+    parser.add_argument("--workers", type=int, help="Worker threads for read-only tools")
+    parser.add_argument("--write-workers", type=int, help="Worker threads for tools that save data")
+    args = parser.parse_args(argv)
+
+    if args.profile_startup:
+        from .startup import profile_startup
+        raise SystemExit(profile_startup(_started_at))
+
+    if args.export:
+        import json
+        from .export import export_library
+        print(json.dumps(export_library(args.export, out_dir=args.export_dir, full=args.full), indent=2))
+        return
+
+    if args.migrate_catalog:
+        import json
+        from .catalog import migrate_catalog
+        print(json.dumps(migrate_catalog(), indent=2))
+        return
+
+    if args.archive_log:
+        import json
+        from .archive import archive_log
+        from .storage import transaction
+        with transaction():
+            result = archive_log()
+        print(json.dumps(result, indent=2))
+        return
+
+    if args.transport == "stdio" and not args.daemon and not args.no_daemon:
+        from .daemon import run_proxy
+        if run_proxy():
+            return
+
+    from .handlers import configure_workers, shutdown_handlers
+
+    configure_workers(read=args.workers, write=args.write_workers)
+    server = get_server()
+    server.settings.host = args.host
+    server.settings.port = args.port
+
+    _exit_on_sigterm()
+    try:
+        if args.daemon:
+            from .daemon import serve_daemon
+            serve_daemon(server)
+        else:
+            server.run(transport=args.transport)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # Let queued and in-flight writes finish before the process exits
+        shutdown_handlers(wait=True)
+
+
+def _exit_on_sigterm():
+    """Turn SIGTERM into a normal exit so pending writes are flushed on shutdown."""
+    import signal
+
+    def handle(signum, frame):
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, handle)
@@ -0,0 +1,180 @@
+"""
+Author alias resolution.
+
+"Leo Tolstoy", "Tolstoy, Leo" and "L. N. Tolstoy" should all land on one
+author record. Names are normalised (diacritics folded, "Last, First"
+reordered, punctuation and suffixes dropped) into a name key, and every
+name an author has been logged under is kept in the "aliases" dataset as
+{name key: author slug}. Names not seen before are matched by surname and
+compatible given names/initials against an in-memory index, so lookups
+stay O(1) however many authors there are.
+"""
+
+import re
+import unicodedata
+
+from .indexes import index
+from .storage import load_json, slugify
+
+SUFFIXES = {"jr", "sr", "ii", "iii", "iv"}
+
+
+def _fold(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def split_name(name: str) -> tuple[list[str], str]:
+    """
+    Split an author name into (given name tokens, surname), normalised.
+
+    Example: "Tolstoy, Lev N." -> (["lev", "n"], "tolstoy")
+    """
+    folded = _fold(name)
+    if "," in folded:
+        surname, _, given = folded.partition(",")
+        folded = f"{given} {surname}"
+    tokens = [t for t in re.split(r"[^\w]+", folded) if t and t not in SUFFIXES]
+    if not tokens:
+        return [], ""
+    return tokens[:-1], tokens[-1]
+
+
+def name_key(name: str) -> str:
+    """Normalised full name, e.g. "Tolstoy, Leo" -> "leo tolstoy"."""
+    given, surname = split_name(name)
+    return " ".join(given + [surname])
+
+
+def _compatible(given: list[str], other: list[str]) -> bool:
+    # Tokens must agree pairwise, where an initial matches any name it starts
+    for a, b in zip(given, other):
+        if a != b and not (len(a) == 1 and b.startswith(a)) and not (len(b) == 1 and a.startswith(b)):
+            return False
+    return True
+
+
+@index("authors", "aliases")
+def author_lookup() -> dict:
+    """
+    Name indexes over the author records.
+
+    "names" maps every known name key to its author slug; "surnames" maps a
+    surname to [(given name tokens, slug)] for matching unseen variants.
+    """
+    all_authors = load_json("authors").get("authors", {})
+    names = {}
+    surnames = {}
+    for slug, data in all_authors.items():
+        given, surname = split_name(data.get("name", slug))
+        names[" ".join(given + [surname])] = slug
+        surnames.setdefault(surname, []).append((given, slug))
+    names.update(load_json("aliases").get("aliases", {}))
+    return {"names": names, "surnames": surnames, "slugs": set(all_authors)}
+
+
+def resolve_author(name: str):
+    """
+    Slug of the author record a name refers to, or None if there isn't one.
+
+    An unseen variant only matches when exactly one author with that
+    surname has compatible given names, so "L. Tolstoy" is not guessed
+    when both Leo and Lisa Tolstoy are known.
+    """
+    lookup = author_lookup()
+    given, surname = split_name(name)
+    slug = lookup["names"].get(" ".join(given + [surname]))
+    if slug is not None:
+        return slug
+
+    candidates = {
+        candidate_slug
+        for candidate_given, candidate_slug in lookup["surnames"].get(surname, [])
+        if given and candidate_given and _compatible(given, candidate_given)
+    }
+    if len(candidates) == 1:
+        return candidates.pop()
+    # Records whose stored name differs from the slug they were created under
+    slug = slugify(name)
+    return slug if slug in lookup["slugs"] else None
+
+
+def add_alias(aliases_data: dict, name: str, slug: str) -> None:
+    """Record that a name refers to an author slug."""
+    aliases_data.setdefault("version", "1.0")
+    aliases_data.setdefault("aliases", {})[name_key(name)] = slug
+
+
+def refresh_author_stats(author_entry: dict) -> None:
+    """Recompute book count, average rating and affinity after a change."""
+    author_entry["total_books"] = len(author_entry["books_read"])
+    ratings = author_entry["ratings"]
+    if not ratings:
+        return
+    author_entry["average_rating"] = round(sum(ratings) / len(ratings), 1)
+    avg = author_entry["average_rating"]
+    if avg >= 4.5:
+        author_entry["affinity"] = "high"
+    elif avg >= 3.5:
+        author_entry["affinity"] = "medium"
+    else:
+        author_entry["affinity"] = "low"
+
+
+def merge_author_records(target: dict, duplicate: dict) -> None:
+    """Fold a duplicate author record into target."""
+    for title in duplicate.get("books_read", []):
+        if title not in target["books_read"]:
+            target["books_read"].append(title)
+    for book_id in duplicate.get("book_ids", []):
+        if book_id not in target.setdefault("book_ids", []):
+            target["book_ids"].append(book_id)
+    target["ratings"] = target.get("ratings", []) + duplicate.get("ratings", [])
+
+    dates = [d for d in (target.get("first_read"), duplicate.get("first_read")) if d]
+    target["first_read"] = min(dates) if dates else None
+    dates = [d for d in (target.get("last_read"), duplicate.get("last_read")) if d]
+    target["last_read"] = max(dates) if dates else None
+
+    style = target.setdefault("style_notes", {})
+    for key, value in duplicate.get("style_notes", {}).items():
+        if isinstance(value, list) and isinstance(style.get(key), list):
+            style[key] = list(dict.fromkeys(style[key] + value))
+        else:
+            style.setdefault(key, value)
+
+    notes = [n for n in (target.get("your_notes"), duplicate.get("your_notes")) if n]
+    target["your_notes"] = "\n\n".join(dict.fromkeys(notes))
+    refresh_author_stats(target)
+
+
+def find_duplicate_groups(all_authors: dict) -> list[list[str]]:
+    """
+    Group author slugs that look like the same person, in one pass.
+
+    Authors are bucketed by surname. Within a bucket, fuller names are
+    placed first so they anchor the groups; each name then joins the one
+    group it is compatible with. A name compatible with several groups
+    ("L. Tolstoy" next to Leo and Lisa) is ambiguous and left alone.
+    """
+    buckets = {}
+    for slug, data in all_authors.items():
+        given, surname = split_name(data.get("name", slug))
+        buckets.setdefault(surname, []).append((given, slug))
+
+    result = []
+    for names in buckets.values():
+        if len(names) < 2:
+            continue
+        groups = []
+        for given, slug in sorted(names, key=lambda n: -sum(len(t) for t in n[0])):
+            matches = [
+                group for group in groups
+                if given and all(other and _compatible(given, other) for other, _ in group)
+            ]
+            if len(matches) == 1:
+                matches[0].append((given, slug))
+            elif not matches:
+                groups.append([(given, slug)])
+        result.extend([slug for _, slug in group] for group in groups if len(group) > 1)
+    return result
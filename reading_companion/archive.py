@@ -0,0 +1,307 @@
+"""
+Hot/cold tiering of the reading log.
+
+archive_log() moves every entry finished in a year that ended more than
+ARCHIVE_AFTER_YEARS ago out of reading_log.json into a gzipped segment per
+year, progress/archive/<year>-<digest>.json.gz, and keeps a small summary
+of each archived year hot in the "log_archive" dataset (book, rated and
+reflected counts, rating sums, per-domain and per-author titles, and the
+year's monthly rollup buckets).
+Counts and aggregates are read from the summaries; segments are only
+decompressed when a query needs the archived entries themselves.
+
+Segments are immutable and named by their contents. Only whole years are
+archived, so a segment never gains entries; the rare edit to an archived
+entry (a late reflection) writes a new segment for its year and points the
+summary at it. Archived years all come before the hot entries, so the full
+log in order is the archived years, oldest first, followed by the hot log.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+from .config import ARCHIVE_AFTER_YEARS, progress_dir
+from .indexes import index
+from .metrics import record_read, record_write
+from .progress import track
+from .records import ReadingEntry
+from .storage import load_json, save_json
+from .tenancy import tenant_state
+
+ARCHIVE_DIR = "archive"
+
+
+def _archive_dir():
+    return progress_dir() / ARCHIVE_DIR
+
+
+def _new_summary() -> dict:
+    return {"version": "1.0", "years": {}}
+
+
+def _summarize(entries: list[dict]) -> dict:
+    from .rollups import build_rollups
+
+    year = {"books": 0, "rated": 0, "rating_sum": 0, "reflected": 0, "domains": {}, "authors": {}}
+    for entry in entries:
+        rating = entry.get("rating")
+        domain = year["domains"].setdefault(
+            entry.get("domain") or "other", {"books": 0, "rated": 0, "rating_sum": 0, "titles": []}
+        )
+        for bucket in (year, domain):
+            bucket["books"] += 1
+            if rating:
+                bucket["rated"] += 1
+                bucket["rating_sum"] += rating
+        domain["titles"].append(entry.get("title"))
+        year["authors"].setdefault(entry.get("author") or "", []).append(entry.get("title"))
+        if entry.get("reflection"):
+            year["reflected"] += 1
+    year["months"] = build_rollups(entries)["months"]
+    return year
+
+
+def _write_segment(year: str, entries: list[dict]) -> str:
+    """
+    Write a year's entries as a new segment and return its file name.
+
+    Written directly rather than through the transaction: the file is new
+    and only becomes part of the log when the summary naming it commits.
+    """
+    data = gzip.compress(json.dumps(entries, separators=(",", ":")).encode("utf-8"))
+    name = f"{year}-{hashlib.sha1(data).hexdigest()[:10]}.json.gz"
+    directory = _archive_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / name
+    if not path.exists():
+        tmp = path.with_name(f".{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        record_write(path, len(data))
+    return name
+
+
+def segment_entries(name: str) -> list[dict]:
+    """
+    Entries of one segment, as new dicts.
+
+    Each segment is decompressed once, since it never changes, and kept as
+    ReadingEntry records, which hold less memory than the parsed dicts.
+    """
+    segments = tenant_state().indexes.setdefault("_archive_segments", {})
+    if name not in segments:
+        path = _archive_dir() / name
+        raw = path.read_bytes()
+        record_read(path, len(raw))
+        segments[name] = [ReadingEntry.decode(entry) for entry in json.loads(gzip.decompress(raw))]
+    return [record.to_dict() for record in segments[name]]
+
+
+@index("log_archive")
+def archive_summary() -> dict:
+    """Summaries of archived years, keyed by year ("2015"), oldest first."""
+    years = load_json("log_archive", progress_dir()).get("years", {})
+    return dict(sorted(years.items()))
+
+
+@index("log_archive")
+def archived_totals() -> dict:
+    """
+    Archived counts: {"books", "rated", "rating_sum", "reflected", "domains"}.
+
+    domains maps each domain to {"books", "rated", "rating_sum", "titles"}.
+    """
+    totals = {"books": 0, "rated": 0, "rating_sum": 0, "reflected": 0, "domains": {}}
+    for year in archive_summary().values():
+        for key in ("books", "rated", "rating_sum", "reflected"):
+            totals[key] += year[key]
+        for domain, bucket in year["domains"].items():
+            total = totals["domains"].setdefault(domain, {"books": 0, "rated": 0, "rating_sum": 0, "titles": []})
+            for key in ("books", "rated", "rating_sum"):
+                total[key] += bucket[key]
+            total["titles"].extend(bucket["titles"])
+    return totals
+
+
+def archived_count() -> int:
+    """Number of archived entries (they take the first positions of the full log)."""
+    return archived_totals()["books"]
+
+
+@index("log_archive")
+def archived_titles() -> dict[str, str]:
+    """Year of every archived title."""
+    return {
+        title: year
+        for year, summary in archive_summary().items()
+        for titles in summary["authors"].values()
+        for title in titles
+    }
+
+
+@index("log_archive")
+def archived_entries() -> list[dict]:
+    """Every archived entry, oldest year first. Decompresses all segments."""
+    entries = []
+    for summary in archive_summary().values():
+        entries.extend(segment_entries(summary["segment"]))
+    return entries
+
+
+@index("log_archive")
+def archived_books() -> list[dict]:
+    """
+    {"title", "author", "domain", "year"} of every archived entry, read from the summaries.
+
+    Oldest year first; within a year, grouped by domain.
+    """
+    books = []
+    for year, summary in archive_summary().items():
+        authors = {title: author for author, titles in summary["authors"].items() for title in titles}
+        for domain, bucket in summary["domains"].items():
+            for title in bucket["titles"]:
+                books.append({
+                    "title": title, "author": authors.get(title) or None, "domain": domain, "year": year
+                })
+    return books
+
+
+def archived_at(positions) -> dict[int, dict]:
+    """
+    Archived entries at the given full-log positions, keyed by position.
+
+    Only the segments holding one of the positions are decompressed.
+    """
+    wanted = sorted(positions)
+    found = {}
+    start = i = 0
+    for summary in archive_summary().values():
+        end = start + summary["books"]
+        if i < len(wanted) and wanted[i] < end:
+            entries = segment_entries(summary["segment"])
+            while i < len(wanted) and wanted[i] < end:
+                found[wanted[i]] = entries[wanted[i] - start]
+                i += 1
+        start = end
+    return found
+
+
+@index("reading_log", "log_archive")
+def full_log() -> list[dict]:
+    """Archived and hot entries as one list, in log order."""
+    hot = load_json("reading_log", progress_dir()).get("entries", [])
+    if not archived_count():
+        return hot
+    return archived_entries() + hot
+
+
+def find_archived(matches):
+    """
+    The first archived entry a predicate accepts, as (year, index in year, position in full log, entry).
+
+    Only years whose summary lists a title the predicate accepts are
+    decompressed (summaries keep titles, not IDs, so years are picked by title).
+
+    Args:
+        matches: Predicate over log entries (e.g. catalog.book_matcher(title))
+    """
+    position = 0
+    for year, summary in archive_summary().items():
+        candidates = [
+            {"title": title, "author": author}
+            for author, titles in summary["authors"].items()
+            for title in titles
+        ]
+        if any(matches(c) for c in candidates):
+            for i, entry in enumerate(segment_entries(summary["segment"])):
+                if matches(entry):
+                    return year, i, position + i, entry
+        position += summary["books"]
+    return None
+
+
+def update_archived_entry(year: str, i: int, entry: dict) -> None:
+    """
+    Replace one archived entry, writing a new segment for its year.
+
+    Tools calling this must declare "log_archive" in writes=.
+    """
+    archive = load_json("log_archive", progress_dir()) or _new_summary()
+    entries = list(segment_entries(archive["years"][year]["segment"]))
+    entries[i] = entry
+    archive["years"][year] = {"segment": _write_segment(year, entries), **_summarize(entries)}
+    save_json("log_archive", archive, progress_dir())
+
+
+def archive_log(older_than_years: int = None) -> dict:
+    """
+    Move entries from years that ended more than older_than_years ago into archive segments.
+
+    Tools calling this must declare "reading_log", "log_archive" and "facets" in writes=.
+
+    Args:
+        older_than_years: Age in whole years (default: ARCHIVE_AFTER_YEARS)
+
+    Returns how many entries moved, per year, and how many stay hot.
+    """
+    from .facets import build_facets
+
+    years = ARCHIVE_AFTER_YEARS if older_than_years is None else older_than_years
+    if years < 1:
+        raise ValueError("older_than_years must be at least 1")
+    cutoff = f"{datetime.now().year - years:04d}"
+
+    log = load_json("reading_log", progress_dir())
+    hot = log.get("entries", [])
+    moving: dict[str, list[dict]] = {}
+    kept = []
+    for entry in track(hot, label="log entries"):
+        year = (entry.get("finished_at") or "")[:4]
+        if year and year < cutoff:
+            moving.setdefault(year, []).append(entry)
+        else:
+            kept.append(entry)
+
+    archive = load_json("log_archive", progress_dir()) or _new_summary()
+
+    # Segments replaced by edits to archived entries are no longer referenced
+    referenced = {summary["segment"] for summary in archive["years"].values()}
+    directory = _archive_dir()
+    for path in directory.glob("*.json.gz") if directory.is_dir() else []:
+        if path.name not in referenced:
+            path.unlink()
+
+    if not moving:
+        return {"archived": 0, "years": {}, "hot_entries": len(hot), "archived_years": sorted(archive["years"])}
+
+    previous = archive["years"]
+    older = set(previous)
+    for year, entries in sorted(moving.items()):
+        if year in previous:
+            # Only reachable when entries were backdated into an archived year
+            entries = segment_entries(previous[year]["segment"]) + entries
+        previous[year] = {"segment": _write_segment(year, entries), **_summarize(entries)}
+    archive["years"] = dict(sorted(previous.items()))
+
+    # Facet bits are log positions: they stay valid only if the moved entries
+    # were already the oldest hot entries, in order, and newer than the archive
+    moved = [entry for _, entries in sorted(moving.items()) for entry in entries]
+    in_place = (not older or min(moving) > max(older)) and all(a is b for a, b in zip(moved, hot))
+
+    log["entries"] = kept
+    save_json("reading_log", log, progress_dir())
+    save_json("log_archive", archive, progress_dir())
+    if not in_place:
+        full = [e for y in archive["years"].values() for e in segment_entries(y["segment"])] + kept
+        save_json("facets", build_facets(full), progress_dir(), indent=None)
+
+    return {
+        "archived": len(moved),
+        "years": {year: len(entries) for year, entries in sorted(moving.items())},
+        "hot_entries": len(kept),
+        "archived_years": sorted(archive["years"]),
+    }
@@ -0,0 +1,125 @@
+"""
+Avoidance matching for candidate books.
+
+The profile's context.avoidances ("war", "body horror", ...) are compiled
+into one Aho-Corasick automaton whenever the profile changes. A book is
+checked by running its title, "why", "craft_focus" and its author's style
+themes through the automaton once, so checking a stack costs time linear
+in the length of its text, however many avoidances there are.
+
+Matching ignores case and diacritics and only counts whole words (a
+trailing plural "s" is allowed), so "war" matches "wars" but not "award".
+"""
+
+import unicodedata
+from collections import deque
+
+from .aliases import resolve_author
+from .indexes import authors_by_slug, index
+from .storage import load_json, slugify
+
+
+def _fold_char(c: str) -> str:
+    return unicodedata.normalize("NFKD", c)[0].lower()[:1] or c
+
+
+def _fold(text: str) -> str:
+    # One character out per character in, so match positions line up with the text
+    if text.isascii():
+        return text.lower()
+    return "".join(_fold_char(c) for c in text)
+
+
+class AvoidanceMatcher:
+    """Aho-Corasick automaton over a fixed set of phrases."""
+
+    def __init__(self, phrases: list[str]):
+        self.phrases = [p for p in dict.fromkeys(p.strip() for p in phrases) if p]
+        # goto[state] maps a character to the next state; out[state] holds
+        # the indexes of phrases ending there
+        self.goto: list[dict[str, int]] = [{}]
+        self.fail: list[int] = [0]
+        self.out: list[list[int]] = [[]]
+        for i, phrase in enumerate(self.phrases):
+            state = 0
+            for c in _fold(phrase):
+                if c not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                    self.goto[state][c] = len(self.goto) - 1
+                state = self.goto[state][c]
+            self.out[state].append(i)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for c, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and c not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(c, 0)
+                self.out[child] = self.out[child] + self.out[self.fail[child]]
+
+    def find(self, text: str) -> set[str]:
+        """Phrases occurring in text as whole words."""
+        if not self.phrases or not text:
+            return set()
+        text = _fold(text)
+        found = set()
+        state = 0
+        for end, c in enumerate(text):
+            while state and c not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(c, 0)
+            for i in self.out[state]:
+                if i in found:
+                    continue
+                start = end - len(self.phrases[i]) + 1
+                before = text[start - 1] if start > 0 else " "
+                after = text[end + 1:end + 3]
+                if not before.isalnum() and (
+                    not after[:1].isalnum() or (after[:1] == "s" and not after[1:2].isalnum())
+                ):
+                    found.add(i)
+        return {self.phrases[i] for i in found}
+
+
+@index("profile")
+def avoidance_matcher() -> AvoidanceMatcher:
+    """Matcher for the current profile's avoidances."""
+    return AvoidanceMatcher(load_json("profile").get("context", {}).get("avoidances", []))
+
+
+def book_avoidances(book: dict) -> list[str]:
+    """
+    Avoidances a candidate book touches, from its title, why, craft_focus and author's style themes.
+
+    Args:
+        book: Stack book ({"title", "author", "why", "craft_focus", ...})
+    """
+    return stack_avoidances([book])[0]
+
+
+def stack_avoidances(books: list[dict]) -> list[list[str]]:
+    """
+    book_avoidances() for each of several books, in order.
+
+    The matcher and author records are looked up once for the whole list.
+    """
+    matcher = avoidance_matcher()
+    if not matcher.phrases:
+        return [[] for _ in books]
+    authors = authors_by_slug()
+    found = []
+    for book in books:
+        parts = [book.get("title"), book.get("why"), book.get("craft_focus")]
+        author = book.get("author")
+        if author:
+            style = authors.get(resolve_author(author) or slugify(author), {}).get("style_notes") or {}
+            themes = style.get("themes") or []
+            parts.extend(themes if isinstance(themes, list) else [themes])
+        # One pass over the joined text; the separator keeps words from running together
+        found.append(sorted(matcher.find("\n".join(str(p) for p in parts if p))))
+    return found
@@ -0,0 +1,196 @@
+"""
+Token-budgeted reading history context.
+
+Picks the slice of reading history most relevant to a target domain and
+summarises the rest as aggregate counts, so the payload sent with
+build_bookstack stays within a fixed size. Archived entries are taken from
+the archive summaries (title, author, domain and year), so building the
+context never decompresses archive segments.
+"""
+
+import json
+
+from .catalog import book_ref
+from .config import BYTES_PER_TOKEN
+
+STRENGTH_SCORE = {"strong": 3, "moderate": 2, "weak": 1}
+
+# Fraction of the budget each section may claim before leftovers are shared
+SECTION_SHARES = {
+    "books_read": 0.45,
+    "favorite_authors": 0.1,
+    "recent_reflections": 0.2,
+    "connections": 0.2,
+    "clusters": 0.05,
+}
+
+
+def json_size(data) -> int:
+    """Size in bytes of data serialized as compact JSON."""
+    return len(json.dumps(data, separators=(",", ":"), default=str).encode("utf-8"))
+
+
+def _book_summary(entry: dict) -> dict:
+    return {
+        "title": entry.get("title"),
+        "author": entry.get("author"),
+        "domain": entry.get("domain"),
+        "rating": entry.get("rating"),
+        "had_reflection": entry.get("reflection") is not None
+    }
+
+
+def _candidates(domain, entries, all_authors, connections, clusters, archived=()):
+    """
+    Yield (score, section, item) for everything that could go into the context.
+
+    Higher scores are more relevant to the target domain. Within a tier,
+    more recent entries score slightly higher.
+    """
+    total = (len(archived) + len(entries)) or 1
+    high_affinity = {
+        a.get("name", "").lower()
+        for a in all_authors.values()
+        if a.get("affinity") == "high"
+    }
+    domain_books = set()
+
+    def book_score(book: dict, recency: float, book_id: str = None) -> float:
+        if domain and book.get("domain") == domain:
+            domain_books.add(book_ref(book.get("title", ""), book.get("author"), book_id))
+            return 100 + recency
+        if (book.get("author") or "").lower() in high_affinity:
+            return 70 + recency
+        return 10 + recency
+
+    for i, book in enumerate(archived):
+        summary = {key: book[key] for key in ("title", "author", "domain")}
+        yield book_score(book, i / total), "books_read", {**summary, "archived_year": book["year"]}
+
+    for i, entry in enumerate(entries, len(archived)):
+        recency = i / total
+        yield book_score(entry, recency, entry.get("book_id")), "books_read", _book_summary(entry)
+
+        reflection = entry.get("reflection")
+        if reflection and reflection.get("key_takeaway"):
+            yield 60 + recency, "recent_reflections", {
+                "title": entry.get("title"),
+                "key_takeaway": reflection.get("key_takeaway"),
+                "next_appetite": reflection.get("next_appetite")
+            }
+
+    for a in all_authors.values():
+        if a.get("affinity") == "high":
+            yield 90 + (a.get("total_books", 0) / total), "favorite_authors", {
+                "name": a["name"],
+                "books": a["total_books"],
+                "rating": a.get("average_rating")
+            }
+
+    # Connections without IDs repeat titles, so resolve each title once
+    title_refs = {}
+
+    def title_ref(title):
+        if title not in title_refs:
+            title_refs[title] = book_ref(title)
+        return title_refs[title]
+
+    for conn in connections:
+        score = 40 + 5 * STRENGTH_SCORE.get(conn.get("strength"), 0)
+        if domain_books and {
+            conn.get("from_id") or title_ref(conn.get("from", "")),
+            conn.get("to_id") or title_ref(conn.get("to", "")),
+        } & domain_books:
+            score += 20
+        yield score, "connections", conn
+
+    for cluster in clusters:
+        yield 5, "clusters", cluster
+
+
+def budget_reading_history(
+    domain: str,
+    entries: list[dict],
+    all_authors: dict,
+    patterns: dict,
+    avoidances: list[str],
+    connections: list[dict],
+    clusters: list[dict],
+    budget_tokens: int,
+    archived: list[dict] = ()
+) -> dict:
+    """
+    Build a reading history context that fits within budget_tokens.
+
+    Themes and totals are always included. Books, favorite authors,
+    connections, reflections and clusters are added in order of relevance
+    to the target domain until the budget is spent; whatever doesn't fit is
+    reported under "omitted" as counts.
+
+    Args:
+        entries: Hot reading log entries
+        archived: Archived books (see archive.archived_books), oldest first
+    """
+    budget_bytes = budget_tokens * BYTES_PER_TOKEN
+    sections = list(SECTION_SHARES)
+
+    context = {
+        "total_books": len(archived) + len(entries),
+        "themes_loved": patterns.get("themes_loved", []),
+        "themes_avoided": [{"theme": a, "reason": "stated avoidance"} for a in avoidances],
+        "difficulty_sweet_spot": patterns.get("difficulty_sweet_spot", {}),
+    }
+    for section in sections:
+        context[section] = []
+
+    # Reserve room for the "omitted" and "size" blocks added at the end
+    used = json_size(context) + 512
+    available = max(budget_bytes - used, 0)
+
+    ranked = sorted(
+        _candidates(domain, entries, all_authors, connections, clusters, archived),
+        key=lambda c: -c[0]
+    )
+
+    # First pass gives each section its share of the budget so one large
+    # section can't crowd out the rest; the second pass spends what's left
+    # on the most relevant leftovers.
+    section_used = {section: 0 for section in sections}
+    leftovers = []
+    for _, section, item in ranked:
+        cost = json_size(item) + 1
+        if section_used[section] + cost <= available * SECTION_SHARES[section]:
+            context[section].append(item)
+            section_used[section] += cost
+            used += cost
+        else:
+            leftovers.append((section, item, cost))
+
+    omitted = {section: 0 for section in sections}
+    omitted_domains = {}
+    for section, item, cost in leftovers:
+        if used + cost <= budget_bytes:
+            context[section].append(item)
+            used += cost
+            continue
+        omitted[section] += 1
+        if section == "books_read":
+            key = item.get("domain") or "other"
+            omitted_domains[key] = omitted_domains.get(key, 0) + 1
+
+    # Keep chronological order for books and reflections
+    order = {e.get("title"): i for i, e in enumerate([*archived, *entries])}
+    context["books_read"].sort(key=lambda b: order.get(b["title"], 0))
+    context["recent_reflections"].sort(key=lambda r: -order.get(r["title"], 0))
+
+    context["omitted"] = {
+        **{section: count for section, count in omitted.items() if count},
+        "books_by_domain": omitted_domains
+    }
+    size = json_size(context)
+    context["size"] = {
+        "bytes": size,
+        "approx_tokens": size // BYTES_PER_TOKEN,
+        "budget_tokens": budget_tokens
+    }
+    return context
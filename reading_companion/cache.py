@@ -0,0 +1,93 @@
+"""
+Memoization of derived, read-only results.
+
+Results are keyed on the call arguments plus the version (see
+storage.dataset_version) of every dataset they depend on, so a cached value
+is served until one of those datasets is saved again, by this process or
+another one. Cached values live in the current tenant's state.
+
+Calls made inside a write transaction use the transaction's own cache
+(see storage.transaction_cache), so they see the transaction's saves and
+never publish uncommitted data.
+"""
+
+import threading
+from functools import wraps
+
+from .storage import dataset_version, transaction_cache
+from .tenancy import tenant_state
+
+# Cached argument combinations kept per function
+MAX_ENTRIES = 128
+
+_stats: dict[str, dict] = {}
+_lock = threading.Lock()
+
+
+def memoize(*datasets: str):
+    """
+    Cache a function's result until one of the named datasets changes.
+
+    Args:
+        datasets: Dataset names the result is derived from (e.g., "reading_log")
+    """
+    def decorator(func):
+        key_name = func.__name__
+        stats = _stats.setdefault(key_name, {"hits": 0, "misses": 0})
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                key = (args, tuple(sorted(kwargs.items())))
+                hash(key)
+            except TypeError:
+                return func(*args, **kwargs)
+
+            pending = transaction_cache()
+            if pending is not None:
+                entry = pending.get((key_name, key))
+                if entry is None:
+                    entry = pending[(key_name, key)] = (datasets, func(*args, **kwargs))
+                return entry[1]
+
+            cache = tenant_state().memo.setdefault(key_name, {})
+            versions = tuple(dataset_version(name) for name in datasets)
+            with _lock:
+                cached = cache.get(key)
+                if cached is not None and cached[0] == versions:
+                    stats["hits"] += 1
+                    return cached[1]
+                stats["misses"] += 1
+
+            result = func(*args, **kwargs)
+
+            with _lock:
+                cache.pop(key, None)
+                if len(cache) >= MAX_ENTRIES:
+                    cache.pop(next(iter(cache)))
+                cache[key] = (versions, result)
+            return result
+
+        # Lets resource registration know which datasets a result depends on
+        wrapper.datasets = datasets
+        return wrapper
+
+    return decorator
+
+
+def cache_stats() -> dict:
+    """Hit/miss counters for every memoized function, plus the current tenant's entry counts."""
+    memo = tenant_state().memo
+    with _lock:
+        return {
+            name: {**stats, "entries": len(memo.get(name, {}))}
+            for name, stats in _stats.items()
+        }
+
+
+def clear_cache() -> None:
+    """Drop the current tenant's memoized results (counters are kept)."""
+    memo = tenant_state().memo
+    with _lock:
+        for cache in memo.values():
+            cache.clear()
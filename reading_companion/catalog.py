@@ -0,0 +1,271 @@
+"""
+Canonical book catalog.
+
+Every book in the reading log, a stack, a connection or an author's
+books_read has one record in the "catalog" dataset under a stable ID. The
+reading log and stack books carry it as "book_id", connections as
+"from_id"/"to_id" and authors as "book_ids" (next to the titles, which stay
+for display), so cross-dataset joins are set and dict lookups on IDs.
+
+Titles are matched on a normalised key (diacritics, case, punctuation,
+leading articles and generic subtitles such as "A Novel" ignored), so "The
+Count of Monte Cristo" and "Count of Monte-Cristo: A Novel" are one book.
+Other subtitles are kept: they often tell apart volumes of one series. Records written before the
+catalog existed fall back to that key until migrate_catalog() stamps them.
+"""
+
+import hashlib
+import re
+from datetime import datetime
+
+from .aliases import _fold, name_key, resolve_author
+from .archive import archive_summary
+from .config import progress_dir
+from .indexes import index
+from .progress import track
+from .storage import load_json, save_json, transaction
+
+ARTICLES = ("the ", "a ", "an ")
+
+# Subtitles that only describe the form, e.g. "Beloved: A Novel" or "Educated (A Memoir)"
+GENERIC_SUBTITLE = re.compile(r"\s*[:(]\s*(?:a )?(?:novel|novella|memoir|story|stories)\)?\s*$")
+
+
+def title_key(title: str) -> str:
+    """Normalised title, e.g. "The Left Hand of Darkness: A Novel" -> "left hand of darkness"."""
+    title = title or ""
+    folded = GENERIC_SUBTITLE.sub("", title.lower() if title.isascii() else _fold(title))
+    folded = " ".join(re.findall(r"\w+", folded.replace("'", "")))
+    for article in ARTICLES:
+        if folded.startswith(article) and len(folded) > len(article):
+            folded = folded[len(article):]
+            break
+    return folded
+
+
+def _book_id(title_k: str, author_k: str, n: int = 0) -> str:
+    digest = hashlib.sha1(f"{title_k}|{author_k}|{n}".encode()).hexdigest()
+    return f"bk_{digest[:10]}"
+
+
+def _new_catalog() -> dict:
+    return {"version": "1.0", "books": {}, "titles": {}}
+
+
+@index("catalog")
+def saved_catalog() -> dict:
+    """The saved catalog: {"books": {id: record}, "titles": {title key: [ids]}}."""
+    return load_json("catalog") or _new_catalog()
+
+
+def _same_author(a: str, b: str) -> bool:
+    if not a or not b or name_key(a) == name_key(b):
+        return True
+    slug = resolve_author(a)
+    return slug is not None and slug == resolve_author(b)
+
+
+def find_book(title: str, author: str = None, catalog: dict = None):
+    """
+    ID of a catalogued book, or None.
+
+    Without an author, a title matches only if one catalogued book has it.
+
+    Args:
+        title: Title in any spelling variant
+        author: Author name, to tell apart books that share a title
+        catalog: Loaded catalog data to search instead of the saved catalog
+    """
+    return _find(title_key(title), author, catalog or saved_catalog())
+
+
+def _find(key: str, author: str, catalog: dict):
+    books = catalog["books"]
+    candidates = catalog["titles"].get(key, [])
+    if author:
+        candidates = [book_id for book_id in candidates if _same_author(author, books[book_id].get("author"))]
+    return candidates[0] if len(candidates) == 1 else None
+
+
+def book_ref(title: str, author: str = None, book_id: str = None, catalog: dict = None) -> str:
+    """
+    Join key for a book: its catalog ID, or "title:<title key>" if it isn't catalogued.
+
+    Args:
+        title: Book title
+        author: Author, if known
+        book_id: The record's stored ID, used as is when present
+        catalog: Loaded catalog data to search instead of the saved catalog,
+            for callers resolving many books at once
+    """
+    if book_id:
+        return book_id
+    key = title_key(title)
+    return _find(key, author, catalog or saved_catalog()) or f"title:{key}"
+
+
+@index("reading_log", "log_archive", "catalog")
+def logged_refs() -> set[str]:
+    """Join keys (see book_ref) of every book in the reading log, archived ones from their summaries."""
+    refs = {
+        book_ref(entry.get("title", ""), entry.get("author"), entry.get("book_id"))
+        for entry in load_json("reading_log", progress_dir()).get("entries", [])
+    }
+    for summary in archive_summary().values():
+        for author, titles in summary["authors"].items():
+            refs.update(book_ref(title, author or None) for title in titles)
+    return refs
+
+
+@index("bookstacks", "catalog")
+def stacked_refs() -> set[str]:
+    """Join keys (see book_ref) of every book in a stack."""
+    return {
+        book_ref(book.get("title", ""), book.get("author"), book.get("book_id"))
+        for stack in load_json("bookstacks").get("stacks", {}).values()
+        for book in stack.get("books", [])
+    }
+
+
+@index("connections", "catalog")
+def connections_by_book() -> dict[str, list]:
+    """
+    Connections touching each book, keyed by join key (see book_ref).
+
+    Values are [(connection, "leads_to" | "leads_from", other book's title, other book's join key)].
+    """
+    by_book: dict[str, list] = {}
+    for conn in load_json("connections").get("connections", []):
+        from_ref = conn.get("from_id") or book_ref(conn.get("from", ""))
+        to_ref = conn.get("to_id") or book_ref(conn.get("to", ""))
+        by_book.setdefault(from_ref, []).append((conn, "leads_to", conn.get("to"), to_ref))
+        if to_ref != from_ref:
+            by_book.setdefault(to_ref, []).append((conn, "leads_from", conn.get("from"), from_ref))
+    return by_book
+
+
+def book_matcher(title: str, author: str = None):
+    """
+    Predicate telling whether a record (log entry, stack book) is the book a title refers to.
+
+    Records are compared by book_id, or by title key when either side isn't catalogued.
+    """
+    ref = book_ref(title, author)
+    key = title_key(title)
+
+    def matches(record: dict) -> bool:
+        if record.get("book_id") and not ref.startswith("title:"):
+            return record["book_id"] == ref
+        return title_key(record.get("title", "")) == key
+
+    return matches
+
+
+def save_catalog(catalog: dict) -> None:
+    """Save catalog data, compactly: it has a record for every book ever mentioned."""
+    save_json("catalog", catalog, indent=None)
+
+
+def register_book(catalog: dict, title: str, author: str = None) -> str:
+    """
+    ID of a book in loaded catalog data, adding a record if it is new (the caller saves).
+
+    Tools calling this must declare "catalog" in writes=.
+    """
+    for key, value in _new_catalog().items():
+        catalog.setdefault(key, value)
+    books = catalog["books"]
+    title_k = title_key(title)
+    author_k = name_key(author) if author else ""
+
+    # IDs are derived from the keys, so an exact match is a dict hit
+    n = 0
+    book_id = _book_id(title_k, author_k)
+    while book_id in books:
+        book = books[book_id]
+        if book["title_key"] == title_k and book["author_key"] == author_k:
+            return book_id
+        n += 1
+        book_id = _book_id(title_k, author_k, n)
+
+    existing = find_book(title, author, catalog)
+    if existing is not None:
+        if author and not books[existing].get("author"):
+            books[existing]["author"] = author
+        return existing
+
+    books[book_id] = {
+        "title": title,
+        "author": author,
+        "title_key": title_k,
+        "author_key": author_k,
+        "added_at": datetime.now().isoformat(),
+    }
+    catalog["titles"].setdefault(title_k, []).append(book_id)
+    return book_id
+
+
+def migrate_catalog() -> dict:
+    """
+    Catalog every book in the existing data and stamp IDs on all records, in one pass.
+
+    Safe to run again: records that already have IDs keep them, unless the
+    ID belongs to a book with a different title key (a series volume merged
+    into another by older versions, which dropped subtitles).
+
+    Returns how many records of each dataset were stamped.
+    """
+    with transaction():
+        catalog = load_json("catalog") or _new_catalog()
+        log = load_json("reading_log", progress_dir())
+        stacks = load_json("bookstacks")
+        authors = load_json("authors")
+        connections = load_json("connections")
+        stamped = {"reading_log": 0, "bookstacks": 0, "authors": 0, "connections": 0}
+
+        # Re-key titles saved under an older title_key()
+        by_key = {}
+        for book_id, book in catalog["books"].items():
+            book["title_key"] = title_key(book["title"])
+            by_key.setdefault(book["title_key"], []).append(book_id)
+        catalog["titles"] = by_key
+
+        def needs_id(book_id: str, title: str) -> bool:
+            book = catalog["books"].get(book_id)
+            return book is None or book["title_key"] != title_key(title)
+
+        for entry in track(log.get("entries", []), label="log entries"):
+            if needs_id(entry.get("book_id"), entry.get("title", "")):
+                entry["book_id"] = register_book(catalog, entry.get("title", ""), entry.get("author"))
+                stamped["reading_log"] += 1
+
+        for stack in stacks.get("stacks", {}).values():
+            for book in stack.get("books", []):
+                if needs_id(book.get("book_id"), book.get("title", "")):
+                    book["book_id"] = register_book(catalog, book.get("title", ""), book.get("author"))
+                    stamped["bookstacks"] += 1
+
+        for data in authors.get("authors", {}).values():
+            titles = data.get("books_read", [])
+            if len(data.get("book_ids", [])) != len(titles):
+                data["book_ids"] = [register_book(catalog, title, data.get("name")) for title in titles]
+                stamped["authors"] += 1
+
+        for conn in track(connections.get("connections", []), label="connections"):
+            if (needs_id(conn.get("from_id"), conn.get("from", ""))
+                    or needs_id(conn.get("to_id"), conn.get("to", ""))):
+                conn["from_id"] = register_book(catalog, conn.get("from", ""))
+                conn["to_id"] = register_book(catalog, conn.get("to", ""))
+                stamped["connections"] += 1
+
+        save_catalog(catalog)
+        if stamped["reading_log"]:
+            save_json("reading_log", log, progress_dir())
+        if stamped["bookstacks"]:
+            save_json("bookstacks", stacks)
+        if stamped["authors"]:
+            save_json("authors", authors)
+        if stamped["connections"]:
+            save_json("connections", connections)
+
+    return {"books": len(catalog["books"]), "stamped": stamped}
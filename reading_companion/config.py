@@ -2,24 +2,115 @@
 Configuration and path constants.
 """
 
+import os
+from contextvars import ContextVar
 from pathlib import Path
 from importlib.resources import files
 
-# Data directory in user's home folder (separate from code)
-DATA_DIR = Path.home() / "reading-companion-data"
+# Data directory in user's home folder (separate from code), overridable
+# with READING_COMPANION_DATA_DIR
+DATA_DIR = Path(
+    os.environ.get("READING_COMPANION_DATA_DIR") or Path.home() / "reading-companion-data"
+).expanduser()
 BOOKSTACKS_DIR = DATA_DIR / "bookstacks"
 PROGRESS_DIR = DATA_DIR / "progress"
 REFLECTIONS_DIR = DATA_DIR / "reflections"
 AUTHORS_DIR = DATA_DIR / "authors"
 
+# Each tenant (reader) gets its own data root under TENANTS_DIR. Requests
+# without a tenant use DATA_DIR itself, so single-reader setups are unchanged.
+TENANTS_DIR = DATA_DIR / "tenants"
+DEFAULT_TENANT = os.environ.get("READING_COMPANION_TENANT") or None
+
+# Over HTTP, take the tenant from the X-Reading-Companion-Tenant header. Off
+# by default: the header isn't authenticated, so only turn this on behind a
+# proxy that authenticates readers and sets the header itself.
+HTTP_TENANT_HEADER = os.environ.get("READING_COMPANION_HTTP_TENANT_HEADER", "") in ("1", "true", "yes")
+
+# Tenants whose caches and indexes are kept in memory at once
+MAX_LOADED_TENANTS = 256
+
+current_tenant: ContextVar = ContextVar("reading_companion_tenant", default=DEFAULT_TENANT)
+
+# Reading history sent with build_bookstack is trimmed to this budget
+HISTORY_BUDGET_TOKENS = 4000
+
+# Entries per page of the log://page/{n} resource
+LOG_PAGE_SIZE = 20
+BYTES_PER_TOKEN = 4
+
+# Worker threads for read-only tool handlers and for writing tool handlers
+TOOL_WORKERS = 4
+WRITE_WORKERS = 2
+
+# Time-to-first-response target checked by `reading-companion --profile-startup`
+STARTUP_TARGET_MS = 1500
+
+# archive_reading_log moves log entries from years that ended more than this
+# many years ago into compressed yearly archive segments
+ARCHIVE_AFTER_YEARS = int(os.environ.get("READING_COMPANION_ARCHIVE_AFTER_YEARS", "5"))
+
+# Long-running tools report progress and check for cancellation every
+# PROGRESS_CHUNK_ITEMS items, sending at most one notification per
+# PROGRESS_MIN_INTERVAL seconds
+PROGRESS_CHUNK_ITEMS = 200
+PROGRESS_MIN_INTERVAL = 0.25
+
+# Latency samples kept per tool for percentiles
+METRICS_SAMPLES = 1000
+
+# Optional JSON-lines log of every tool call, rotated at METRICS_FILE_MAX_BYTES
+METRICS_FILE = os.environ.get("READING_COMPANION_METRICS_FILE")
+METRICS_FILE_MAX_BYTES = 5_000_000
+METRICS_FILE_BACKUPS = 3
+
+# Opt-in cProfile/tracemalloc of tool calls: "all" or comma-separated tool names
+PROFILE_TOOLS = os.environ.get("READING_COMPANION_PROFILE", "")
+PROFILE_SAMPLE_RATE = float(os.environ.get("READING_COMPANION_PROFILE_SAMPLE_RATE", "1.0"))
+PROFILE_DIR = DATA_DIR / "profiling"
+PROFILE_TOP_ALLOCATIONS = 25
+
+# Where reflection and author pages go inside reflections/ and authors/:
+# "flat", "prefix" (subfolders by the slug's first two characters) or "year"
+# (subfolders by year finished / first read). Existing pages never move.
+PAGE_LAYOUT = os.environ.get("READING_COMPANION_PAGE_LAYOUT", "flat")
+
+# Unix socket of the shared daemon (`reading-companion --daemon`); stdio
+# servers proxy to it when it's running
+DAEMON_SOCKET = Path(
+    os.environ.get("READING_COMPANION_SOCKET") or DATA_DIR / ".daemon.sock"
+).expanduser()
+
 # Prompts are bundled inside the package for distribution
 PROMPTS_DIR = files("reading_companion.prompts")
 
 
+def data_dir() -> Path:
+    """Data root for the tenant of the current request."""
+    tenant = current_tenant.get()
+    return DATA_DIR if tenant is None else TENANTS_DIR / tenant
+
+
+def bookstacks_dir() -> Path:
+    return data_dir() / "bookstacks"
+
+
+def progress_dir() -> Path:
+    return data_dir() / "progress"
+
+
+def reflections_dir() -> Path:
+    return data_dir() / "reflections"
+
+
+def authors_dir() -> Path:
+    return data_dir() / "authors"
+
+
 def ensure_dirs():
-    """Create all necessary directories if they don't exist."""
-    DATA_DIR.mkdir(exist_ok=True)
-    BOOKSTACKS_DIR.mkdir(exist_ok=True)
-    PROGRESS_DIR.mkdir(exist_ok=True)
-    REFLECTIONS_DIR.mkdir(exist_ok=True)
-    AUTHORS_DIR.mkdir(exist_ok=True)
+    """Create all necessary directories for the current tenant if they don't exist."""
+    data_dir().mkdir(parents=True, exist_ok=True)
+    bookstacks_dir().mkdir(exist_ok=True)
+    progress_dir().mkdir(exist_ok=True)
+    reflections_dir().mkdir(exist_ok=True)
+    authors_dir().mkdir(exist_ok=True)
@@ -0,0 +1,205 @@
+"""
+Shared local daemon.
+
+Claude Desktop starts one stdio server per session, and each one would
+otherwise load the data and build its caches and indexes on its own.
+`reading-companion --daemon` runs a single long-lived server on a Unix
+socket instead; a stdio server started while it's up becomes a thin proxy
+that pipes its stdin/stdout to the socket, so every session shares the
+daemon's warm caches, indexes and dataset locks. Without a daemon (or with
+--no-daemon) the stdio server runs standalone as before.
+
+Each socket connection is one MCP session with the same framing as stdio
+(one JSON-RPC message per line). A proxy first sends a one-line preamble
+with its tenant, so READING_COMPANION_TENANT still applies through the
+daemon.
+"""
+
+import json
+import logging
+import os
+import socket
+import sys
+import threading
+
+from .config import DAEMON_SOCKET, current_tenant
+
+logger = logging.getLogger(__name__)
+
+# First line sent by a proxy: {"reading_companion_proxy": 1, "tenant": ...}
+PREAMBLE_KEY = "reading_companion_proxy"
+
+CHUNK_BYTES = 65536
+MAX_LINE_BYTES = 64 * 1024 * 1024
+
+
+def connect_daemon(path=DAEMON_SOCKET):
+    """A socket connected to a running daemon, or None if none is listening."""
+    if not os.path.exists(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def run_proxy(path=DAEMON_SOCKET) -> bool:
+    """
+    Pipe stdin to the daemon and its replies to stdout until either side closes.
+
+    Returns False without touching stdin/stdout if no daemon is listening.
+    """
+    sock = connect_daemon(path)
+    if sock is None:
+        return False
+
+    preamble = {PREAMBLE_KEY: 1, "tenant": current_tenant.get()}
+    sock.sendall((json.dumps(preamble) + "\n").encode())
+
+    def forward_stdin():
+        try:
+            while chunk := sys.stdin.buffer.read1(CHUNK_BYTES):
+                sock.sendall(chunk)
+        except OSError:
+            pass
+        finally:
+            # Half-close so the daemon ends the session once the client is done
+            try:
+                sock.shutdown(socket.SHUT_WR)
+            except OSError:
+                pass
+
+    threading.Thread(target=forward_stdin, name="daemon-proxy", daemon=True).start()
+    try:
+        while chunk := sock.recv(CHUNK_BYTES):
+            sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+    except (OSError, ValueError):
+        pass
+    finally:
+        sock.close()
+    return True
+
+
+def _parse_preamble(line: bytes):
+    """The tenant named by a proxy preamble line, or False if line isn't one."""
+    try:
+        preamble = json.loads(line)
+    except ValueError:
+        return False
+    if not isinstance(preamble, dict) or PREAMBLE_KEY not in preamble:
+        return False
+    return preamble.get("tenant")
+
+
+async def _serve_connection(server, stream) -> None:
+    """Run one MCP session over an accepted socket connection."""
+    import anyio
+    import mcp.types as types
+    from anyio.streams.buffered import BufferedByteReceiveStream
+    from mcp.shared.message import SessionMessage
+
+    from .tenancy import validate_tenant
+
+    reader = BufferedByteReceiveStream(stream)
+    read_writer, read_stream = anyio.create_memory_object_stream(0)
+    write_stream, write_reader = anyio.create_memory_object_stream(0)
+    closed = (anyio.EndOfStream, anyio.IncompleteRead, anyio.ClosedResourceError, anyio.BrokenResourceError)
+
+    try:
+        first = await reader.receive_until(b"\n", MAX_LINE_BYTES)
+    except closed:
+        await stream.aclose()
+        return
+    tenant = _parse_preamble(first)
+    # Plain MCP clients can connect too; their first line is a message
+    pending = [first] if tenant is False else []
+
+    async def read_lines():
+        async with read_writer:
+            while True:
+                if pending:
+                    line = pending.pop()
+                else:
+                    try:
+                        line = await reader.receive_until(b"\n", MAX_LINE_BYTES)
+                    except closed:
+                        return
+                if not line.strip():
+                    continue
+                try:
+                    message = types.JSONRPCMessage.model_validate_json(line)
+                except Exception as exc:
+                    await read_writer.send(exc)
+                    continue
+                await read_writer.send(SessionMessage(message))
+
+    async def write_lines():
+        async with write_reader:
+            async for session_message in write_reader:
+                text = session_message.message.model_dump_json(by_alias=True, exclude_none=True)
+                try:
+                    await stream.send((text + "\n").encode())
+                except closed:
+                    return
+
+    # Tasks started below copy this context, so the tenant applies to every request
+    current_tenant.set(validate_tenant(tenant) if tenant else current_tenant.get())
+    mcp_server = server._mcp_server
+    async with stream, anyio.create_task_group() as tg:
+        tg.start_soon(read_lines)
+        tg.start_soon(write_lines)
+        await mcp_server.run(read_stream, write_stream, mcp_server.create_initialization_options())
+        tg.cancel_scope.cancel()
+
+
+async def _serve(server, path) -> None:
+    import anyio
+
+    # Owner-only from the moment it's bound, rather than chmod-ed afterwards
+    umask = os.umask(0o177)
+    try:
+        listener = await anyio.create_unix_listener(path)
+    finally:
+        os.umask(umask)
+    logger.info("Reading Companion daemon listening on %s", path)
+
+    async def handle(stream):
+        try:
+            await _serve_connection(server, stream)
+        except Exception:
+            logger.exception("Daemon session failed")
+
+    async with listener:
+        await listener.serve(handle)
+
+
+def serve_daemon(server, path=DAEMON_SOCKET) -> None:
+    """
+    Serve MCP sessions on a Unix socket until interrupted.
+
+    Args:
+        server: The FastMCP server whose tools every session shares
+        path: Socket path (default: DAEMON_SOCKET)
+    """
+    import anyio
+
+    path = str(path)
+    if os.path.exists(path):
+        probe = connect_daemon(path)
+        if probe is not None:
+            probe.close()
+            raise SystemExit(f"A Reading Companion daemon is already listening on {path}")
+        # Left behind by a daemon that didn't shut down cleanly
+        os.unlink(path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    try:
+        anyio.run(_serve, server, path)
+    finally:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
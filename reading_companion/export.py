@@ -0,0 +1,288 @@
+"""
+Library export to CSV, JSON Lines or Parquet.
+
+Each dataset is flattened into one row per record (log entry, author, stack
+book, connection) and written row by row, so no copy of the rows is built
+in memory; Parquet is written in fixed-size batches. Parquet needs the
+optional pyarrow package (pip install reading-companion[parquet]).
+
+Repeat exports are incremental. The export directory keeps a watermark per
+format and dataset: log entries and connections changed since the last
+export are appended (the last row for an entry or connection wins), and
+the other datasets are rewritten only when their file has changed.
+Consumers dedupe log rows by entry id, which is unique within the log.
+
+The export files are written directly, outside the calling tool's
+transaction, so the state file is too: it is replaced atomically even
+when the tool is cancelled, and always describes the files on disk.
+"""
+
+import csv
+import json
+from datetime import datetime
+from pathlib import Path
+
+from .archive import full_log
+from .config import data_dir, progress_dir
+from .progress import Cancelled, track
+from .storage import _replace, load_json
+
+FORMATS = ("csv", "jsonl", "parquet")
+
+# Rows per Parquet record batch
+BATCH_ROWS = 1000
+
+STATE_FILE = "_export_state.json"
+
+# Column name -> type, per dataset; lists are kept in JSONL and joined with
+# LIST_SEPARATOR in CSV and Parquet
+COLUMNS = {
+    "reading_log": {
+        "id": "string", "book_id": "string", "title": "string", "author": "string", "domain": "string",
+        "finished_at": "string", "rating": "int", "quick_note": "string",
+        "reflection_key_takeaway": "string", "reflection_craft_lessons": "list",
+        "reflection_personal_insights": "list", "reflection_favorite_quotes": "list",
+        "reflection_next_appetite": "string", "reflection_reflected_at": "string",
+    },
+    "authors": {
+        "slug": "string", "name": "string", "total_books": "int", "average_rating": "float",
+        "affinity": "string", "first_read": "string", "last_read": "string",
+        "books_read": "list", "book_ids": "list", "style_prose": "string", "style_themes": "list",
+        "style_strengths": "list", "style_comparable_to": "list", "your_notes": "string",
+    },
+    "bookstacks": {
+        "domain": "string", "position": "int", "book_id": "string", "title": "string", "author": "string",
+        "why": "string", "difficulty": "string", "added_at": "string",
+    },
+    "connections": {
+        "from": "string", "to": "string", "from_id": "string", "to_id": "string",
+        "relationship": "string", "reason": "string",
+        "strength": "string", "created_at": "string", "updated_at": "string",
+    },
+}
+
+LIST_SEPARATOR = " | "
+
+
+def _list(value) -> list:
+    if value is None:
+        return []
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def _log_rows():
+    for entry in full_log():
+        reflection = entry.get("reflection") or {}
+        changed = max(entry.get("finished_at") or "", reflection.get("reflected_at") or "")
+        yield changed, {
+            "id": entry.get("id"),
+            "book_id": entry.get("book_id"),
+            "title": entry.get("title"),
+            "author": entry.get("author"),
+            "domain": entry.get("domain"),
+            "finished_at": entry.get("finished_at"),
+            "rating": entry.get("rating"),
+            "quick_note": entry.get("quick_note"),
+            "reflection_key_takeaway": reflection.get("key_takeaway"),
+            "reflection_craft_lessons": _list(reflection.get("craft_lessons")),
+            "reflection_personal_insights": _list(reflection.get("personal_insights")),
+            "reflection_favorite_quotes": _list(reflection.get("favorite_quotes")),
+            "reflection_next_appetite": reflection.get("next_appetite"),
+            "reflection_reflected_at": reflection.get("reflected_at"),
+        }
+
+
+def _author_rows():
+    for slug, data in load_json("authors").get("authors", {}).items():
+        style = data.get("style_notes") or {}
+        yield None, {
+            "slug": slug,
+            "name": data.get("name"),
+            "total_books": data.get("total_books"),
+            "average_rating": data.get("average_rating"),
+            "affinity": data.get("affinity"),
+            "first_read": data.get("first_read"),
+            "last_read": data.get("last_read"),
+            "books_read": _list(data.get("books_read")),
+            "book_ids": _list(data.get("book_ids")),
+            "style_prose": style.get("prose"),
+            "style_themes": _list(style.get("themes")),
+            "style_strengths": _list(style.get("strengths")),
+            "style_comparable_to": _list(style.get("comparable_to")),
+            "your_notes": data.get("your_notes"),
+        }
+
+
+def _stack_rows():
+    for domain, stack in load_json("bookstacks").get("stacks", {}).items():
+        for position, book in enumerate(stack.get("books", []), 1):
+            yield None, {
+                "domain": domain,
+                "position": book.get("position") or position,
+                "book_id": book.get("book_id"),
+                "title": book.get("title"),
+                "author": book.get("author"),
+                "why": book.get("why"),
+                "difficulty": book.get("difficulty"),
+                "added_at": book.get("added_at") or stack.get("generated_at"),
+            }
+
+
+def _connection_rows():
+    for conn in load_json("connections").get("connections", []):
+        yield conn.get("updated_at") or conn.get("created_at") or "", {
+            "from": conn.get("from"),
+            "to": conn.get("to"),
+            "from_id": conn.get("from_id"),
+            "to_id": conn.get("to_id"),
+            "relationship": conn.get("relationship"),
+            "reason": conn.get("reason"),
+            "strength": conn.get("strength"),
+            "created_at": conn.get("created_at"),
+            "updated_at": conn.get("updated_at"),
+        }
+
+
+# Dataset -> (source files, row generator, whether rows carry change times)
+SOURCES = {
+    "reading_log": (
+        lambda: [progress_dir() / "reading_log.json", progress_dir() / "log_archive.json"], _log_rows, True
+    ),
+    "authors": (lambda: [data_dir() / "authors.json"], _author_rows, False),
+    "bookstacks": (lambda: [data_dir() / "bookstacks.json"], _stack_rows, False),
+    "connections": (lambda: [data_dir() / "connections.json"], _connection_rows, True),
+}
+
+
+def _flat(row: dict, columns: dict) -> dict:
+    return {
+        name: LIST_SEPARATOR.join(str(v) for v in row[name]) if kind == "list" else row[name]
+        for name, kind in columns.items()
+    }
+
+
+def _write_csv(path: Path, rows, columns: dict, append: bool) -> int:
+    count = 0
+    with open(path, "a" if append else "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(columns))
+        if f.tell() == 0:
+            writer.writeheader()
+        for row in rows:
+            writer.writerow(_flat(row, columns))
+            count += 1
+    return count
+
+
+def _write_jsonl(path: Path, rows, columns: dict, append: bool) -> int:
+    count = 0
+    with open(path, "a" if append else "w") as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+def _write_parquet(path: Path, rows, columns: dict, append: bool) -> int:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {"string": pa.string(), "list": pa.string(), "int": pa.int64(), "float": pa.float64()}
+    schema = pa.schema([(name, types[kind]) for name, kind in columns.items()])
+
+    # A dataset is a folder of parts; incremental exports add a part
+    path.mkdir(parents=True, exist_ok=True)
+    if not append:
+        for part in path.glob("part-*.parquet"):
+            part.unlink()
+    part = path / f"part-{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.parquet"
+
+    count = 0
+    writer = None
+    batch = []
+    try:
+        for row in rows:
+            batch.append(_flat(row, columns))
+            if len(batch) == BATCH_ROWS:
+                writer = writer or pq.ParquetWriter(part, schema)
+                writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+                count += len(batch)
+                batch = []
+        if batch:
+            writer = writer or pq.ParquetWriter(part, schema)
+            writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+            count += len(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
+
+
+WRITERS = {"csv": _write_csv, "jsonl": _write_jsonl, "parquet": _write_parquet}
+
+
+def export_library(fmt: str = "csv", out_dir: Path = None, datasets: list[str] = None,
+                   full: bool = False) -> dict:
+    """
+    Export datasets for analysis.
+
+    Args:
+        fmt: "csv", "jsonl" or "parquet"
+        out_dir: Destination folder (default: exports/ in the data directory)
+        datasets: Subset of reading_log, authors, bookstacks, connections (default: all)
+        full: Rewrite everything instead of exporting only what changed
+
+    Returns a summary per dataset: rows written, mode and output path.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}': use one of {', '.join(FORMATS)}")
+    unknown = set(datasets or []) - set(SOURCES)
+    if unknown:
+        raise ValueError(f"Unknown datasets: {', '.join(sorted(unknown))}")
+    if fmt == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ValueError("Parquet export needs pyarrow: pip install reading-companion[parquet]") from None
+
+    out_dir = Path(out_dir) if out_dir else data_dir() / "exports"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    state_path = out_dir / STATE_FILE
+    state = json.loads(state_path.read_text()) if state_path.exists() else {}
+    marks = state.setdefault(fmt, {})
+
+    summary = {}
+    for name in datasets or SOURCES:
+        sources, generate, has_change_times = SOURCES[name]
+        path = out_dir / (name if fmt == "parquet" else f"{name}.{fmt}")
+        mtime = max((source.stat().st_mtime_ns for source in sources() if source.exists()), default=None)
+        previous = None if full else marks.get(name)
+
+        if previous and previous.get("mtime") == mtime and path.exists():
+            summary[name] = {"mode": "unchanged", "rows": 0, "path": str(path)}
+            continue
+
+        since = previous.get("watermark") if previous and has_change_times and path.exists() else None
+        watermark = {"value": since or ""}
+
+        def changed_rows():
+            for changed, row in track(generate(), label=f"{name} rows"):
+                if since is None or changed > since:
+                    watermark["value"] = max(watermark["value"], changed or "")
+                    yield row
+
+        try:
+            rows = WRITERS[fmt](path, changed_rows(), COLUMNS[name], append=since is not None)
+        except Cancelled:
+            # The file is partly written, so the next export must redo it in full
+            marks.pop(name, None)
+            _replace(state_path, json.dumps(state, indent=2))
+            raise
+        marks[name] = {"mtime": mtime, "watermark": watermark["value"] or None}
+        summary[name] = {
+            "mode": "incremental" if since is not None else "full",
+            "rows": rows,
+            "path": str(path),
+        }
+
+    _replace(state_path, json.dumps(state, indent=2))
+    return {"format": fmt, "directory": str(out_dir), "datasets": summary}
@@ -0,0 +1,273 @@
+"""
+Bitmap indexes over the reading log for faceted queries.
+
+Bit n of a bitmap stands for the n-th reading log entry. The "facets"
+dataset, stored next to the log, keeps one bitmap per domain, rating,
+difficulty (from the book's stack), year finished, reflection status and
+author; log_book and save_reflection set the new bits, and the stack
+tools move entries whose book changed difficulty. Author affinity
+bands are the OR of their authors' bitmaps, so a change in affinity
+doesn't touch the stored bitmaps.
+
+Queries combine bitmaps with AND/OR/NOT as Python integers, and count
+facet values with popcounts, instead of filtering entries one by one.
+"""
+
+from .aliases import resolve_author
+from .archive import archive_summary, archived_at, archived_count, archived_entries, full_log, segment_entries
+from .catalog import book_ref, saved_catalog
+from .config import progress_dir
+from .indexes import authors_by_slug, index
+from .progress import track
+from .storage import load_json, save_json, slugify
+
+# Facets that can be queried, as "facet:value" terms
+FACETS = ("domain", "rating", "difficulty", "year", "reflection", "affinity", "author")
+
+# Facets reported with counts (author has too many values to be useful)
+COUNTED = ("domain", "rating", "difficulty", "year", "reflection", "affinity")
+
+
+def _encode(bitmap: int):
+    # Sparse bitmaps (most authors) as positions, dense ones as hex
+    count = bitmap.bit_count()
+    if count * 16 < bitmap.bit_length():
+        positions = []
+        while bitmap:
+            low = bitmap & -bitmap
+            positions.append(low.bit_length() - 1)
+            bitmap ^= low
+        return positions
+    return format(bitmap, "x")
+
+
+def _decode(value) -> int:
+    if isinstance(value, str):
+        return int(value, 16)
+    bitmap = 0
+    for position in value:
+        bitmap |= 1 << position
+    return bitmap
+
+
+@index("bookstacks", "catalog")
+def stack_difficulties() -> dict[str, str]:
+    """Difficulty of each stacked book, keyed by join key (see book_ref)."""
+    catalog = saved_catalog()
+    return {
+        book_ref(book.get("title", ""), book.get("author"), book.get("book_id"), catalog): book["difficulty"]
+        for stack in load_json("bookstacks").get("stacks", {}).values()
+        for book in stack.get("books", [])
+        if book.get("difficulty")
+    }
+
+
+def _values(entry: dict, author_slug: str, difficulties: dict[str, str], catalog: dict) -> dict[str, str]:
+    # difficulties and catalog are loaded once by the caller, not per entry
+    ref = book_ref(entry.get("title", ""), entry.get("author"), entry.get("book_id"), catalog)
+    return {
+        "domain": entry.get("domain") or "other",
+        "rating": str(entry.get("rating") or "none"),
+        "difficulty": difficulties.get(ref, "unknown"),
+        "year": (entry.get("finished_at") or "")[:4] or "unknown",
+        "reflection": "yes" if entry.get("reflection") else "no",
+        "author": author_slug,
+    }
+
+
+def add_entry(facets: dict, position: int, entry: dict, author_slug: str) -> None:
+    """Set the bits for the log entry at position (its index in the log)."""
+    bitmaps = facets.setdefault("bitmaps", {})
+    for facet, value in _values(entry, author_slug, stack_difficulties(), saved_catalog()).items():
+        values = bitmaps.setdefault(facet, {})
+        values[value] = _encode(_decode(values.get(value, [])) | (1 << position))
+    facets["size"] = max(facets.get("size", 0), position + 1)
+
+
+def mark_reflected(facets: dict, position: int) -> None:
+    """Move the entry at position from reflection:no to reflection:yes."""
+    values = facets.setdefault("bitmaps", {}).setdefault("reflection", {})
+    bit = 1 << position
+    values["no"] = _encode(_decode(values.get("no", [])) & ~bit)
+    values["yes"] = _encode(_decode(values.get("yes", [])) | bit)
+
+
+def update_difficulties(before: dict[str, str]) -> None:
+    """
+    Move log entries whose book's stack difficulty changed to the new value.
+
+    Tools calling this must declare "facets" in writes=. Only archived years
+    listing a changed book are decompressed. Saved facets that are already
+    out of date are left for facet_bitmaps() to rebuild.
+
+    Args:
+        before: stack_difficulties() from before the stacks were saved
+    """
+    after = stack_difficulties()
+    changed = {ref for ref in before.keys() | after.keys() if before.get(ref) != after.get(ref)}
+    if not changed:
+        return
+    facets = load_json("facets", progress_dir())
+    hot = load_json("reading_log", progress_dir()).get("entries", [])
+    if not facets or facets.get("size") != archived_count() + len(hot):
+        return
+
+    values = {
+        value: _decode(bitmap)
+        for value, bitmap in facets.setdefault("bitmaps", {}).get("difficulty", {}).items()
+    }
+    catalog = saved_catalog()
+
+    def move(position: int, entry: dict) -> None:
+        ref = book_ref(entry.get("title", ""), entry.get("author"), entry.get("book_id"), catalog)
+        if ref in changed:
+            bit = 1 << position
+            for value in values:
+                values[value] &= ~bit
+            difficulty = after.get(ref, "unknown")
+            values[difficulty] = values.get(difficulty, 0) | bit
+
+    position = 0
+    for summary in archive_summary().values():
+        if any(
+            book_ref(title, author or None, catalog=catalog) in changed
+            for author, titles in summary["authors"].items()
+            for title in titles
+        ):
+            for i, entry in enumerate(segment_entries(summary["segment"])):
+                move(position + i, entry)
+        position += summary["books"]
+    for i, entry in enumerate(hot, position):
+        move(i, entry)
+
+    facets["bitmaps"]["difficulty"] = {value: _encode(bitmap) for value, bitmap in values.items() if bitmap}
+    save_json("facets", facets, progress_dir(), indent=None)
+
+
+def merge_author_bits(facets: dict, target: str, duplicate: str) -> None:
+    """Fold a merged author's entries into the author they were merged into."""
+    values = facets.get("bitmaps", {}).get("author", {})
+    if duplicate in values:
+        values[target] = _encode(_decode(values.get(target, [])) | _decode(values.pop(duplicate)))
+
+
+def build_facets(entries: list[dict]) -> dict:
+    """Facet bitmaps for a whole log, for data logged before they existed."""
+    facets = {"version": "1.0", "size": 0, "bitmaps": {}}
+    bitmaps = {}
+    difficulties = stack_difficulties()
+    catalog = saved_catalog()
+    for position, entry in enumerate(track(entries, label="log entries")):
+        author = entry.get("author") or ""
+        slug = resolve_author(author) or slugify(author)
+        for facet, value in _values(entry, slug, difficulties, catalog).items():
+            values = bitmaps.setdefault(facet, {})
+            values[value] = values.get(value, 0) | (1 << position)
+    facets["bitmaps"] = {
+        facet: {value: _encode(bitmap) for value, bitmap in values.items()}
+        for facet, values in bitmaps.items()
+    }
+    facets["size"] = len(entries)
+    return facets
+
+
+def current_facets(entries: list[dict]) -> dict:
+    """
+    Saved facets if they cover every entry but the last, else rebuilt from the log.
+
+    For write tools that have just appended an entry to the hot log entries.
+    """
+    facets = load_json("facets", progress_dir())
+    if facets.get("size") == archived_count() + len(entries) - 1:
+        return facets
+    return build_facets(archived_entries() + entries[:-1])
+
+
+@index("reading_log", "log_archive", "facets")
+def facet_bitmaps() -> dict:
+    """
+    Decoded bitmaps: {"size": n, "bitmaps": {facet: {value: int}}}.
+
+    Built from the log if none are saved or they don't cover every entry.
+    """
+    facets = load_json("facets", progress_dir())
+    hot = load_json("reading_log", progress_dir()).get("entries", [])
+    if facets.get("size") != archived_count() + len(hot):
+        facets = build_facets(full_log())
+    return {
+        "size": facets["size"],
+        "bitmaps": {
+            facet: {value: _decode(bitmap) for value, bitmap in values.items()}
+            for facet, values in facets["bitmaps"].items()
+        },
+    }
+
+
+@index("reading_log", "log_archive", "facets", "authors")
+def _affinity_bitmaps() -> dict[str, int]:
+    by_author = facet_bitmaps()["bitmaps"].get("author", {})
+    bands: dict[str, int] = {}
+    for slug, bitmap in by_author.items():
+        band = authors_by_slug().get(slug, {}).get("affinity", "unknown")
+        bands[band] = bands.get(band, 0) | bitmap
+    return bands
+
+
+def _bitmap(term: str) -> int:
+    facet, _, value = term.partition(":")
+    if facet not in FACETS or not value:
+        raise ValueError(f"Invalid facet term '{term}': use facet:value with facet one of {', '.join(FACETS)}")
+    if facet == "affinity":
+        return _affinity_bitmaps().get(value, 0)
+    return facet_bitmaps()["bitmaps"].get(facet, {}).get(value, 0)
+
+
+def query_facets(all_of: list[str] = (), any_of: list[str] = (), none_of: list[str] = (),
+                limit: int = 20) -> dict:
+    """
+    Log entries matching facet terms, newest first, with facet counts over the matches.
+
+    Terms are "facet:value", e.g. "domain:classic_lit", "rating:5",
+    "difficulty:challenging", "year:2025", "reflection:yes", "affinity:high".
+
+    Args:
+        all_of: Entries must match every term
+        any_of: Entries must match at least one term (ignored if empty)
+        none_of: Entries must match none of these terms
+        limit: Maximum entries returned
+    """
+    size = facet_bitmaps()["size"]
+    match = (1 << size) - 1
+    for term in all_of:
+        match &= _bitmap(term)
+    if any_of:
+        either = 0
+        for term in any_of:
+            either |= _bitmap(term)
+        match &= either
+    for term in none_of:
+        match &= ~_bitmap(term)
+
+    positions = []
+    remaining = match
+    while remaining and len(positions) < limit:
+        position = remaining.bit_length() - 1
+        positions.append(position)
+        remaining ^= 1 << position
+
+    # Archived entries come first in the log; only their segments that hold a match are read
+    archived = archived_count()
+    hot = load_json("reading_log", progress_dir()).get("entries", [])
+    older = archived_at(p for p in positions if p < archived)
+    found = [older[p] if p < archived else hot[p - archived] for p in positions]
+
+    bitmaps = dict(facet_bitmaps()["bitmaps"], affinity=_affinity_bitmaps())
+    counts = {
+        facet: {
+            value: count
+            for value, bitmap in sorted(bitmaps.get(facet, {}).items())
+            if (count := (match & bitmap).bit_count())
+        }
+        for facet in COUNTED
+    }
+    return {"total": match.bit_count(), "entries": found, "counts": counts}
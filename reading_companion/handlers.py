@@ -0,0 +1,166 @@
+"""
+Async tool and resource handlers.
+
+Tools are written as plain synchronous functions. Registering them through
+HandlerRegistrar turns each one into an async handler that runs on a
+worker thread, so blocking file I/O and markdown rendering never stall the
+server's event loop.
+
+Read-only handlers share a bounded pool and run concurrently. Handlers that
+write run on a separate, smaller pool and hold a lock on each dataset they
+declare, so load-modify-save sequences on the same dataset never interleave
+while writes to unrelated datasets (or tenants) proceed in parallel, and
+waiting writers never tie up the read workers.
+"""
+
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from mcp.types import ToolAnnotations
+
+from .config import TOOL_WORKERS, WRITE_WORKERS
+from .metrics import instrument
+from .profiling import profiled
+from .progress import reporting
+from .storage import dataset_lock, transaction
+from .subscriptions import track_resource
+from .tenancy import request_tenant, use_tenant
+
+# Pass as @mcp.tool(annotations=READ_ONLY) for tools that never save datasets
+READ_ONLY = ToolAnnotations(readOnlyHint=True)
+
+_read_executor = None
+_write_executor = None
+_workers = {"read": TOOL_WORKERS, "write": WRITE_WORKERS}
+
+
+def configure_workers(read: int = None, write: int = None) -> None:
+    """Set handler pool sizes; must be called before the first handler runs."""
+    if _read_executor is not None:
+        raise RuntimeError("Handler pools are already running")
+    if read:
+        _workers["read"] = read
+    if write:
+        _workers["write"] = write
+
+
+def _executors() -> tuple[ThreadPoolExecutor, ThreadPoolExecutor]:
+    global _read_executor, _write_executor
+    if _read_executor is None:
+        _read_executor = ThreadPoolExecutor(
+            max_workers=_workers["read"], thread_name_prefix="reading-companion-read"
+        )
+        _write_executor = ThreadPoolExecutor(
+            max_workers=_workers["write"], thread_name_prefix="reading-companion-write"
+        )
+    return _read_executor, _write_executor
+
+
+async def run_blocking(func, *args, read_only: bool = False, **kwargs):
+    """
+    Run a blocking function on the handler pool and await its result.
+
+    Args:
+        func: Synchronous function to call
+        read_only: True to use the read pool, False to use the write pool
+    """
+    read_executor, write_executor = _executors()
+    executor = read_executor if read_only else write_executor
+    ctx = contextvars.copy_context()
+    future = executor.submit(ctx.run, func, *args, **kwargs)
+    return await asyncio.wrap_future(future)
+
+
+def locked(datasets, func):
+    """
+    Wrap a synchronous handler so it holds the current tenant's dataset locks
+    and commits everything it saves as one journaled transaction.
+    """
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with dataset_lock(*datasets), transaction():
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def offload(func, read_only: bool = False):
+    """Wrap a synchronous handler as an async one that runs on the handler pool."""
+
+    @wraps(func)
+    async def handler(*args, **kwargs):
+        return await run_blocking(func, *args, read_only=read_only, **kwargs)
+
+    return handler
+
+
+def tenant_scoped(mcp, handler):
+    """Wrap an async handler so it runs as the tenant named by the request."""
+
+    @wraps(handler)
+    async def scoped(*args, **kwargs):
+        with use_tenant(request_tenant(mcp)):
+            return await handler(*args, **kwargs)
+
+    return scoped
+
+
+def shutdown_handlers(wait: bool = True) -> None:
+    """Stop the handler pools, by default waiting for queued work to finish."""
+    global _read_executor, _write_executor
+    if _read_executor is not None:
+        _read_executor.shutdown(wait=wait)
+        _write_executor.shutdown(wait=wait)
+        _read_executor = _write_executor = None
+
+
+class HandlerRegistrar:
+    """
+    Stand-in for the FastMCP server while tools and resources are registered.
+
+    tool() and resource() accept the same arguments as FastMCP's decorators
+    and register an offloaded, instrumented async version of the decorated
+    function (profiled too, when enabled in config) that runs as the
+    request's tenant and can report progress (see progress.track). Tools
+    annotated with READ_ONLY run on the read pool. Every other tool must
+    pass writes=(dataset names it saves) and runs on the write pool
+    holding those datasets' locks. Resources are always
+    read-only; memoized ones can be subscribed to, and subscribers are
+    notified when the datasets they were memoized on change. The original
+    function is returned unchanged.
+    """
+
+    def __init__(self, mcp):
+        self.mcp = mcp
+
+    def tool(self, *args, writes: tuple[str, ...] = (), **kwargs):
+        annotations = kwargs.get("annotations")
+        read_only = bool(annotations and annotations.readOnlyHint)
+        register = self.mcp.tool(*args, **kwargs)
+
+        def decorator(func):
+            name = kwargs.get("name") or func.__name__
+            if not read_only and not writes:
+                raise ValueError(f"Tool '{name}' must be annotated READ_ONLY or declare writes=")
+            if not read_only:
+                func = locked(writes, func)
+            handler = reporting(self.mcp, offload(profiled(name, func), read_only=read_only))
+            register(instrument(name, tenant_scoped(self.mcp, handler)))
+            return func
+
+        return decorator
+
+    def resource(self, *args, **kwargs):
+        register = self.mcp.resource(*args, **kwargs)
+
+        def decorator(func):
+            uri = args[0] if args else kwargs["uri"]
+            track_resource(uri, getattr(func, "datasets", ()))
+            handler = offload(func, read_only=True)
+            register(instrument(uri, tenant_scoped(self.mcp, handler)))
+            return func
+
+        return decorator
@@ -0,0 +1,79 @@
+"""
+Derived lookup indexes over the JSON datasets.
+
+Each index is built on first use and kept in the current tenant's state
+until one of the datasets it was built from is saved again (by this process
+or another one; see storage.dataset_version), so resources
+that fetch a single stack, author or log page look it up directly instead
+of re-reading and walking the whole file.
+
+Inside a write transaction indexes are kept in the transaction's own cache
+instead (see storage.transaction_cache): a build there sees the
+transaction's uncommitted saves, which other readers must not, and is
+dropped when the transaction saves one of its datasets again.
+"""
+
+from functools import wraps
+
+from .config import progress_dir
+from .storage import dataset_version, load_json, transaction_cache
+from .tenancy import tenant_state
+
+
+def index(*datasets: str):
+    """
+    Build an index once per change of the named datasets.
+
+    Args:
+        datasets: Dataset names the index is derived from
+    """
+    def decorator(build):
+        name = build.__name__
+
+        @wraps(build)
+        def wrapper():
+            pending = transaction_cache()
+            if pending is not None:
+                if name not in pending:
+                    pending[name] = (datasets, build())
+                return pending[name][1]
+            indexes = tenant_state().indexes
+            # Read before building: a save during the build leaves a stale
+            # version behind, so the next call rebuilds
+            versions = tuple(dataset_version(dataset) for dataset in datasets)
+            cached = indexes.get(name)
+            if cached is not None and cached[0] == versions:
+                return cached[1]
+            value = build()
+            indexes[name] = (versions, value)
+            return value
+
+        wrapper.datasets = datasets
+        return wrapper
+
+    return decorator
+
+
+@index("bookstacks")
+def stacks_by_domain() -> dict:
+    """Stack data keyed by domain id."""
+    return load_json("bookstacks").get("stacks", {})
+
+
+@index("authors")
+def authors_by_slug() -> dict:
+    """Author entries keyed by slug."""
+    return load_json("authors").get("authors", {})
+
+
+@index("reading_log")
+def log_by_date() -> tuple[list[str], list[dict]]:
+    """
+    Log entries sorted by finish date, oldest first.
+
+    Returns (finished_at values, entries) as parallel lists, so date ranges
+    can be found with bisect.
+    """
+    entries = load_json("reading_log", progress_dir()).get("entries", [])
+    ordered = sorted(entries, key=lambda e: e.get("finished_at") or "")
+    return [e.get("finished_at") or "" for e in ordered], ordered
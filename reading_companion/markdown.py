@@ -6,15 +6,18 @@ Each function generates human-readable markdown files from JSON data.
 
 from datetime import datetime
 
+from .archive import archive_summary, archived_count, archived_titles, archived_totals
 from .config import (
-    DATA_DIR,
-    BOOKSTACKS_DIR,
-    PROGRESS_DIR,
-    REFLECTIONS_DIR,
-    AUTHORS_DIR,
+    data_dir,
+    bookstacks_dir,
+    progress_dir,
+    reflections_dir,
+    authors_dir,
     ensure_dirs,
 )
-from .storage import load_json, slugify
+from .progress import track
+from .slugs import assign_page, page_links
+from .storage import load_json, slugify, write_text
 
 
 def save_profile_markdown(profile: dict) -> None:
@@ -81,8 +84,8 @@ def save_profile_markdown(profile: dict) -> None:
             lines.append(f"**Notes**: {latent.get('notes')}")
             lines.append("")
 
-    path = DATA_DIR / "profile.md"
-    path.write_text("\n".join(lines))
+    path = data_dir() / "profile.md"
+    write_text(path, "\n".join(lines))
 
 
 def save_bookstack_markdown(domain: str, stack_data: dict, domain_name: str = None) -> None:
@@ -127,8 +130,8 @@ def save_bookstack_markdown(domain: str, stack_data: dict, domain_name: str = No
             lines.append(f"- **Focus**: {book.get('craft_focus')}")
         lines.append("")
 
-    path = BOOKSTACKS_DIR / f"{domain}.md"
-    path.write_text("\n".join(lines))
+    path = bookstacks_dir() / f"{domain}.md"
+    write_text(path, "\n".join(lines))
     update_bookstacks_index()
 
 
@@ -157,8 +160,8 @@ def update_bookstacks_index() -> None:
             lines.append(f"- {data.get('description')}")
         lines.append("")
 
-    path = BOOKSTACKS_DIR / "_index.md"
-    path.write_text("\n".join(lines))
+    path = bookstacks_dir() / "_index.md"
+    write_text(path, "\n".join(lines))
 
 
 def save_reflection_markdown(entry: dict) -> None:
@@ -231,9 +234,8 @@ def save_reflection_markdown(entry: dict) -> None:
             "",
         ])
 
-    slug = slugify(title)
-    path = REFLECTIONS_DIR / f"{slug}.md"
-    path.write_text("\n".join(lines))
+    path = assign_page("reflections", entry.get("book_id") or title, finished[:4] or None, name=title)
+    write_text(path, "\n".join(lines))
     update_reflections_index()
 
 
@@ -241,13 +243,14 @@ def update_reflections_index() -> None:
     """Update the _index.md file listing all reflections."""
     ensure_dirs()
 
-    log = load_json("reading_log", PROGRESS_DIR)
+    log = load_json("reading_log", progress_dir())
     entries = log.get("entries", [])
+    links = page_links("reflections")
 
     lines = [
         "# My Book Reflections",
         "",
-        f"Total books read: {len(entries)}",
+        f"Total books read: {archived_count() + len(entries)}",
         "",
         "---",
         "",
@@ -255,7 +258,7 @@ def update_reflections_index() -> None:
 
     # Group by domain
     by_domain = {}
-    for entry in entries:
+    for entry in track(entries, label="log entries"):
         domain = entry.get("domain", "other")
         if domain not in by_domain:
             by_domain[domain] = []
@@ -268,27 +271,37 @@ def update_reflections_index() -> None:
 
         for book in books:
             title = book.get("title", "Unknown")
-            slug = slugify(title)
+            link = links.get(book.get("book_id")) or links.get(title) or f"{slugify(title)}.md"
             rating = book.get("rating")
             rating_str = f" {'⭐' * rating}" if rating else ""
             has_reflection = "✓" if book.get("reflection") else "○"
-            lines.append(f"- [{title}]({slug}.md){rating_str} {has_reflection}")
+            lines.append(f"- [{title}]({link}){rating_str} {has_reflection}")
 
         lines.append("")
 
-    path = REFLECTIONS_DIR / "_index.md"
-    path.write_text("\n".join(lines))
+    # Archived years are listed from their summaries, without opening the archive
+    archived = archive_summary()
+    if archived:
+        lines.append("## Archived")
+        lines.append("")
+        for year, summary in reversed(archived.items()):
+            lines.append(f"- **{year}**: {summary['books']} books, {summary['reflected']} reflections")
+        lines.append("")
+
+    path = reflections_dir() / "_index.md"
+    write_text(path, "\n".join(lines))
 
 
 def update_progress_markdown() -> None:
     """Update the current progress view."""
     ensure_dirs()
 
-    log = load_json("reading_log", PROGRESS_DIR)
+    log = load_json("reading_log", progress_dir())
     profile = load_json("profile")
 
     entries = log.get("entries", [])
     domains = profile.get("goals", {}).get("domains", [])
+    archived = archived_totals()
 
     lines = [
         "# Reading Progress",
@@ -297,7 +310,7 @@ def update_progress_markdown() -> None:
         "",
         f"## Overview",
         "",
-        f"**Total books read**: {len(entries)}",
+        f"**Total books read**: {archived['books'] + len(entries)}",
         "",
         "---",
         "",
@@ -311,7 +324,8 @@ def update_progress_markdown() -> None:
         target = domain.get("target_books", 0)
 
         domain_entries = [e for e in entries if e.get("domain") == domain_id]
-        completed = len(domain_entries)
+        archived_titles_in_domain = archived["domains"].get(domain_id, {}).get("titles", [])
+        completed = len(archived_titles_in_domain) + len(domain_entries)
 
         # Progress bar
         if target > 0:
@@ -326,9 +340,10 @@ def update_progress_markdown() -> None:
         lines.append(f"{status}")
         lines.append("")
 
-        if domain_entries:
-            for book in domain_entries[-3:]:
-                lines.append(f"- {book.get('title')}")
+        recent_titles = (archived_titles_in_domain + [book.get("title") for book in domain_entries])[-3:]
+        if recent_titles:
+            for title in recent_titles:
+                lines.append(f"- {title}")
             lines.append("")
 
     if entries:
@@ -343,8 +358,8 @@ def update_progress_markdown() -> None:
             lines.append(f"- **{date}**: {entry.get('title')}")
         lines.append("")
 
-    path = PROGRESS_DIR / "_current.md"
-    path.write_text("\n".join(lines))
+    path = progress_dir() / "_current.md"
+    write_text(path, "\n".join(lines))
 
 
 def save_author_markdown(author_slug: str, author_data: dict) -> None:
@@ -375,7 +390,7 @@ def save_author_markdown(author_slug: str, author_data: dict) -> None:
     if books:
         lines.append("## Books You've Read")
         lines.append("")
-        log = load_json("reading_log", PROGRESS_DIR)
+        log = load_json("reading_log", progress_dir())
         for book_title in books:
             for entry in log.get("entries", []):
                 if entry.get("title") == book_title:
@@ -385,7 +400,8 @@ def save_author_markdown(author_slug: str, author_data: dict) -> None:
                     lines.append(f"- **{book_title}** ({date}){rating_str}")
                     break
             else:
-                lines.append(f"- {book_title}")
+                year = archived_titles().get(book_title)
+                lines.append(f"- **{book_title}** ({year})" if year else f"- {book_title}")
         lines.append("")
 
     if style:
@@ -410,8 +426,9 @@ def save_author_markdown(author_slug: str, author_data: dict) -> None:
         lines.append(notes)
         lines.append("")
 
-    path = AUTHORS_DIR / f"{author_slug}.md"
-    path.write_text("\n".join(lines))
+    first_read = author_data.get("first_read") or ""
+    path = assign_page("authors", author_slug, first_read[:4] or None)
+    write_text(path, "\n".join(lines))
 
 
 def update_authors_index() -> None:
@@ -420,6 +437,7 @@ def update_authors_index() -> None:
 
     authors_data = load_json("authors")
     all_authors = authors_data.get("authors", {})
+    links = page_links("authors")
 
     sorted_authors = sorted(
         all_authors.items(),
@@ -439,7 +457,7 @@ def update_authors_index() -> None:
     ]
 
     current_affinity = None
-    for slug, data in sorted_authors:
+    for slug, data in track(sorted_authors, label="authors"):
         affinity = data.get("affinity", "unknown")
         if affinity != current_affinity:
             current_affinity = affinity
@@ -451,12 +469,12 @@ def update_authors_index() -> None:
         book_count = data.get("total_books", 0)
         avg = data.get("average_rating")
         rating_str = f" (avg ⭐{avg})" if avg else ""
-        lines.append(f"- [{name}]({slug}.md) - {book_count} books{rating_str}")
+        lines.append(f"- [{name}]({links.get(slug) or f'{slug}.md'}) - {book_count} books{rating_str}")
 
     lines.append("")
 
-    path = AUTHORS_DIR / "_index.md"
-    path.write_text("\n".join(lines))
+    path = authors_dir() / "_index.md"
+    write_text(path, "\n".join(lines))
 
 
 def save_patterns_markdown(patterns: dict) -> None:
@@ -538,5 +556,5 @@ def save_patterns_markdown(patterns: dict) -> None:
             lines.append(f"- {name}" + (f" ({reason})" if reason else ""))
         lines.append("")
 
-    path = PROGRESS_DIR / "_insights.md"
-    path.write_text("\n".join(lines))
+    path = progress_dir() / "_insights.md"
+    write_text(path, "\n".join(lines))
@@ -0,0 +1,186 @@
+"""
+Per-tool latency and I/O metrics.
+
+Every tool and resource handler registered through HandlerRegistrar is
+timed, and every JSON load/save and markdown write is attributed to the
+handler that caused it. Snapshots are served by the metrics://tools
+resource; when METRICS_FILE is set, each call is also appended to a
+rotating JSON-lines file for offline analysis.
+"""
+
+import json
+import logging
+import logging.handlers
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+
+from .config import (
+    DATA_DIR,
+    METRICS_FILE,
+    METRICS_FILE_MAX_BYTES,
+    METRICS_FILE_BACKUPS,
+    METRICS_SAMPLES,
+)
+
+# Upper bounds (ms) of the latency histogram buckets
+BUCKETS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+# Files listed per handler in snapshots; the count is always exact
+MAX_FILES_LISTED = 20
+
+_current = ContextVar("reading_companion_metrics_call", default=None)
+_lock = threading.Lock()
+_handlers: dict[str, dict] = {}
+_file_logger = None
+
+
+def _new_stats() -> dict:
+    return {
+        "calls": 0,
+        "errors": 0,
+        "total_ms": 0.0,
+        "max_ms": 0.0,
+        "samples": deque(maxlen=METRICS_SAMPLES),
+        "buckets": [0] * (len(BUCKETS_MS) + 1),
+        "bytes_read": 0,
+        "bytes_written": 0,
+        "files_read": set(),
+        "files_written": set(),
+    }
+
+
+def _display_path(path: Path) -> str:
+    try:
+        return str(Path(path).relative_to(DATA_DIR))
+    except ValueError:
+        return str(path)
+
+
+def record_read(path: Path, nbytes: int) -> None:
+    """Attribute a file read to the handler currently running, if any."""
+    call = _current.get()
+    if call is not None:
+        call["bytes_read"] += nbytes
+        call["files_read"].add(_display_path(path))
+
+
+def record_write(path: Path, nbytes: int) -> None:
+    """Attribute a file write to the handler currently running, if any."""
+    call = _current.get()
+    if call is not None:
+        call["bytes_written"] += nbytes
+        call["files_written"].add(_display_path(path))
+
+
+def _record_call(name: str, elapsed_ms: float, call: dict, error: bool) -> None:
+    with _lock:
+        stats = _handlers.setdefault(name, _new_stats())
+        stats["calls"] += 1
+        stats["errors"] += int(error)
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+        stats["samples"].append(elapsed_ms)
+        bucket = next((i for i, bound in enumerate(BUCKETS_MS) if elapsed_ms <= bound), len(BUCKETS_MS))
+        stats["buckets"][bucket] += 1
+        stats["bytes_read"] += call["bytes_read"]
+        stats["bytes_written"] += call["bytes_written"]
+        stats["files_read"] |= call["files_read"]
+        stats["files_written"] |= call["files_written"]
+
+    logger = _metrics_file_logger()
+    if logger:
+        logger.info(json.dumps({
+            "at": datetime.now().isoformat(),
+            "handler": name,
+            "ms": round(elapsed_ms, 3),
+            "error": error,
+            "bytes_read": call["bytes_read"],
+            "bytes_written": call["bytes_written"],
+            "files_read": sorted(call["files_read"]),
+            "files_written": sorted(call["files_written"]),
+        }))
+
+
+def _metrics_file_logger():
+    global _file_logger
+    if not METRICS_FILE:
+        return None
+    if _file_logger is None:
+        path = Path(METRICS_FILE).expanduser()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=METRICS_FILE_MAX_BYTES, backupCount=METRICS_FILE_BACKUPS
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger = logging.getLogger("reading_companion.metrics")
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        _file_logger = logger
+    return _file_logger
+
+
+def instrument(name: str, handler):
+    """Wrap an async handler so each call's latency and file I/O are recorded."""
+
+    @wraps(handler)
+    async def timed(*args, **kwargs):
+        call = {"bytes_read": 0, "bytes_written": 0, "files_read": set(), "files_written": set()}
+        token = _current.set(call)
+        start = time.perf_counter()
+        error = False
+        try:
+            return await handler(*args, **kwargs)
+        except BaseException:
+            error = True
+            raise
+        finally:
+            _current.reset(token)
+            _record_call(name, (time.perf_counter() - start) * 1000, call, error)
+
+    return timed
+
+
+def _percentile(ordered: list[float], pct: float) -> float:
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return round(ordered[index], 3)
+
+
+def metrics_snapshot() -> dict:
+    """Current metrics for every handler that has been called."""
+    labels = [f"<={bound}ms" for bound in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"]
+    result = {}
+    with _lock:
+        for name, stats in sorted(_handlers.items()):
+            ordered = sorted(stats["samples"])
+            touched = sorted(stats["files_read"] | stats["files_written"])
+            result[name] = {
+                "calls": stats["calls"],
+                "errors": stats["errors"],
+                "latency_ms": {
+                    "mean": round(stats["total_ms"] / stats["calls"], 3),
+                    "p50": _percentile(ordered, 50),
+                    "p95": _percentile(ordered, 95),
+                    "p99": _percentile(ordered, 99),
+                    "max": round(stats["max_ms"], 3),
+                },
+                "histogram": {
+                    label: count for label, count in zip(labels, stats["buckets"]) if count
+                },
+                "bytes_read": stats["bytes_read"],
+                "bytes_written": stats["bytes_written"],
+                "files_touched": len(touched),
+                "files": touched[:MAX_FILES_LISTED],
+            }
+    return result
+
+
+def reset_metrics() -> None:
+    """Clear all recorded metrics."""
+    with _lock:
+        _handlers.clear()
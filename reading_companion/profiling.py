@@ -0,0 +1,89 @@
+"""
+Opt-in cProfile and tracemalloc hooks for tool calls.
+
+Set READING_COMPANION_PROFILE to "all" or a comma-separated list of tool
+names to profile them. Each sampled call writes a .pstats file and a
+top-allocations summary to PROFILE_DIR. READING_COMPANION_PROFILE_SAMPLE_RATE
+(0-1) profiles only a fraction of calls so it can stay on under load.
+
+    python -m pstats ~/reading-companion-data/profiling/<file>.pstats
+"""
+
+import cProfile
+import random
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from functools import wraps
+
+from .config import PROFILE_TOOLS, PROFILE_SAMPLE_RATE, PROFILE_DIR, PROFILE_TOP_ALLOCATIONS
+
+# Only one call is profiled at a time; samples that arrive meanwhile are skipped
+_lock = threading.Lock()
+
+
+def _selected(name: str) -> bool:
+    selected = {t.strip() for t in PROFILE_TOOLS.split(",") if t.strip()}
+    return "all" in selected or name in selected
+
+
+def _write_allocations(path, name: str, snapshot, peak: int, elapsed_ms: float) -> None:
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, tracemalloc.__file__),
+    ])
+    stats = snapshot.statistics("lineno")
+    lines = [
+        f"# {name}",
+        f"elapsed: {elapsed_ms:.1f} ms",
+        f"peak traced memory: {peak / 1024:.1f} KiB",
+        "",
+        f"Top {PROFILE_TOP_ALLOCATIONS} allocations by line:",
+    ]
+    for stat in stats[:PROFILE_TOP_ALLOCATIONS]:
+        frame = stat.traceback[0]
+        lines.append(f"{stat.size / 1024:10.1f} KiB {stat.count:8} blocks  {frame.filename}:{frame.lineno}")
+    path.write_text("\n".join(lines) + "\n")
+
+
+def profiled(name: str, func):
+    """
+    Wrap a synchronous tool so sampled calls are profiled.
+
+    Returns func unchanged when the tool isn't selected for profiling.
+    """
+    if not _selected(name):
+        return func
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if random.random() >= PROFILE_SAMPLE_RATE or not _lock.acquire(blocking=False):
+            return func(*args, **kwargs)
+
+        try:
+            profiler = cProfile.Profile()
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.disable()
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                snapshot = tracemalloc.take_snapshot()
+                peak = tracemalloc.get_traced_memory()[1]
+                if started_tracing:
+                    tracemalloc.stop()
+
+                PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+                stem = f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}-{name}"
+                profiler.dump_stats(PROFILE_DIR / f"{stem}.pstats")
+                _write_allocations(PROFILE_DIR / f"{stem}.alloc.txt", name, snapshot, peak, elapsed_ms)
+        finally:
+            _lock.release()
+
+    return wrapper
@@ -0,0 +1,133 @@
+"""
+Progress notifications and cancellation for long-running tools.
+
+Bulk loops (pattern analysis, exports, index and markdown rebuilds,
+catalog migration) iterate through track(), which passes items through
+unchanged and, after every chunk of PROGRESS_CHUNK_ITEMS items, sends the
+client an MCP progress notification (items done, total and an ETA) if it
+asked for them, and checks whether the request was cancelled. A cancelled
+tool stops at the next check by raising Cancelled; write tools run inside
+transaction(), so none of their saves are committed.
+
+Outside a tool call (CLI commands, benchmarks) track() only yields items.
+"""
+
+import asyncio
+import threading
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from .config import PROGRESS_CHUNK_ITEMS, PROGRESS_MIN_INTERVAL
+
+_current = ContextVar("reading_companion_progress", default=None)
+
+
+class Cancelled(Exception):
+    """The client cancelled the request this tool call was running for."""
+
+
+class _Reporter:
+    """Progress and cancellation state of one tool call."""
+
+    def __init__(self, request_context, loop):
+        meta = request_context.meta
+        self.token = meta.progressToken if meta is not None else None
+        self.session = request_context.session
+        self.request_id = request_context.request_id
+        self.loop = loop
+        self.cancelled = threading.Event()
+        self.sent_at = 0.0
+        self.last_sent = None
+        # Items done by earlier track() loops, so progress keeps increasing
+        self.done = 0
+
+    def report(self, done: int, total: int | None, label: str, started: float) -> None:
+        if self.token is None:
+            return
+        now = time.monotonic()
+        finished = total is not None and done >= total
+        if (now - self.sent_at < PROGRESS_MIN_INTERVAL and not finished) or self.last_sent == (done, total):
+            return
+        self.sent_at = now
+        self.last_sent = (done, total)
+        message = f"{done}/{total} {label}" if total is not None else f"{done} {label}"
+        if total and 0 < done < total:
+            message += f", about {(now - started) * (total - done) / done:.0f}s left"
+        asyncio.run_coroutine_threadsafe(
+            self.session.send_progress_notification(
+                self.token,
+                self.done + done,
+                None if total is None else self.done + total,
+                message,
+                related_request_id=self.request_id,
+            ),
+            self.loop,
+        )
+
+
+def check_cancelled() -> None:
+    """Raise Cancelled if the client cancelled the current tool call."""
+    reporter = _current.get()
+    if reporter is not None and reporter.cancelled.is_set():
+        raise Cancelled("Cancelled by the client")
+
+
+def track(items, total: int = None, label: str = "items", chunk: int = PROGRESS_CHUNK_ITEMS):
+    """
+    Yield items, reporting progress and checking for cancellation every chunk items.
+
+    Args:
+        items: Any iterable; consumed lazily
+        total: Number of items, if known (defaults to len(items) when available)
+        label: What the items are, for progress messages ("books", "rows", ...)
+        chunk: Items between progress reports and cancellation checks
+    """
+    reporter = _current.get()
+    if reporter is None:
+        yield from items
+        return
+    if total is None and hasattr(items, "__len__"):
+        total = len(items)
+
+    check_cancelled()
+    started = time.monotonic()
+    done = 0
+    try:
+        for item in items:
+            yield item
+            done += 1
+            if done % chunk == 0:
+                check_cancelled()
+                reporter.report(done, total, label, started)
+        if done:
+            reporter.report(done, done, label, started)
+    finally:
+        reporter.done += done
+
+
+def reporting(mcp, handler):
+    """
+    Wrap an async handler so the blocking function it runs can report progress.
+
+    When the client cancels the request, the awaiting handler is cancelled
+    but the worker thread keeps running until its next check_cancelled().
+    """
+
+    @wraps(handler)
+    async def reported(*args, **kwargs):
+        try:
+            request_context = mcp.get_context().request_context
+        except (LookupError, ValueError):
+            return await handler(*args, **kwargs)
+        reporter = _Reporter(request_context, asyncio.get_running_loop())
+        token = _current.set(reporter)
+        try:
+            return await handler(*args, **kwargs)
+        except asyncio.CancelledError:
+            reporter.cancelled.set()
+            raise
+        finally:
+            _current.reset(token)
+
+    return reported
@@ -0,0 +1,230 @@
+"""
+Typed records for reading log entries, authors, stack books and connections.
+
+On disk and in the data layer these are plain JSON objects. The record
+classes give them a checked shape at the edges:
+
+- from_dict() validates an object arriving at a tool boundary (argument
+  types, required fields, allowed values) and raises ValueError naming the
+  offending field, which tools return as an error.
+- decode() builds a record from trusted on-disk data without checks, for
+  bulk readers that keep many records around, such as the archive's
+  segment cache. A slotted record, with its repeated strings (author,
+  domain, ...) shared between records, keeps about a quarter less memory
+  alive than the dict it came from (see benchmarks/bench_records.py).
+- to_dict() writes a record back in the on-disk layout. Optional fields
+  that are unset are left out, and keys the record doesn't know are kept
+  in extra, so decode/to_dict round-trips files written by older versions.
+"""
+
+from dataclasses import dataclass, fields
+from sys import intern
+from typing import get_args, get_origin, get_type_hints
+
+DIFFICULTIES = ("light", "moderate", "challenging")
+RELATIONSHIPS = ("similar_theme", "complements", "next_step", "contrast")
+STRENGTHS = ("strong", "moderate", "weak")
+AFFINITIES = ("high", "medium", "low", "unknown")
+
+
+def _matches(value, kind) -> bool:
+    origin = get_origin(kind)
+    if origin is list:
+        (item,) = get_args(kind)
+        return isinstance(value, list) and all(_matches(v, item) for v in value)
+    if kind is float:
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    if kind is int:
+        return isinstance(value, int) and not isinstance(value, bool)
+    return isinstance(value, origin or kind)
+
+
+_TYPE_NAMES = {
+    str: ("a string", "strings"),
+    int: ("an integer", "integers"),
+    float: ("a number", "numbers"),
+    dict: ("an object", "objects"),
+}
+
+
+def _type_name(kind) -> str:
+    if get_origin(kind) is list:
+        return f"a list of {_TYPE_NAMES[get_args(kind)[0]][1]}"
+    return _TYPE_NAMES[kind][0]
+
+
+class _Record:
+    """Shared decode/encode/validation for the record classes below."""
+
+    __slots__ = ()
+
+    # On-disk keys for fields named differently ("from" isn't a valid name)
+    _KEYS = {}
+    # Fields that must be present and non-empty in from_dict()
+    _REQUIRED = ()
+    # Optional keys left out of to_dict() while unset
+    _OMIT_NONE = frozenset()
+    # Allowed values, by field
+    _CHOICES = {}
+    # String fields with few distinct values, shared between records by decode()
+    _INTERN = ()
+
+    @classmethod
+    def decode(cls, data: dict):
+        """Record from trusted on-disk data, without validation; _INTERN fields are interned."""
+        record = cls(*map(data.get, cls._DISK_ORDER))
+        if not cls._DISK_KEYS.issuperset(data):
+            record.extra = {k: v for k, v in data.items() if k not in cls._DISK_KEYS}
+        for field in cls._INTERN:
+            value = getattr(record, field)
+            if value is not None:
+                setattr(record, field, intern(value))
+        return record
+
+    @classmethod
+    def from_dict(cls, data: dict, where: str = None):
+        """
+        Validated record from a tool argument or other untrusted object.
+
+        Args:
+            data: Object in the on-disk layout
+            where: Name for error messages (e.g. "books[2]")
+
+        Raises ValueError naming the first invalid field.
+        """
+        prefix = f"{where}: " if where else ""
+        if not isinstance(data, dict):
+            raise ValueError(f"{where or cls.__name__} must be an object")
+        for field, key in cls._LAYOUT:
+            value = data.get(key)
+            if field in cls._REQUIRED and value in (None, ""):
+                raise ValueError(f"{prefix}{key} is required")
+            if value is None:
+                continue
+            kind = cls._TYPES[field]
+            if not _matches(value, kind):
+                raise ValueError(f"{prefix}{key} must be {_type_name(kind)}, got {value!r}")
+            choices = cls._CHOICES.get(field)
+            if choices and value not in choices:
+                raise ValueError(f"{prefix}{key} must be one of {', '.join(choices)}, got {value!r}")
+        record = cls.decode(data)
+        record._check(prefix)
+        return record
+
+    def _check(self, prefix: str) -> None:
+        """Checks beyond types and choices; raise ValueError on failure."""
+
+    def to_dict(self) -> dict:
+        """The record in its on-disk layout."""
+        data = {}
+        for field, key in self._LAYOUT:
+            value = getattr(self, field)
+            if value is not None or key not in self._OMIT_NONE:
+                data[key] = value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+
+def _record(cls):
+    """Make cls a slotted dataclass and precompute its on-disk layout."""
+    cls = dataclass(slots=True)(cls)
+    hints = get_type_hints(cls)
+    names = [f.name for f in fields(cls) if f.name != "extra"]
+    cls._LAYOUT = tuple((name, cls._KEYS.get(name, name)) for name in names)
+    cls._DISK_ORDER = tuple(key for _, key in cls._LAYOUT)
+    cls._DISK_KEYS = frozenset(cls._DISK_ORDER)
+    cls._TYPES = {name: hints[name] for name in names}
+    return cls
+
+
+@_record
+class ReadingEntry(_Record):
+    """One reading log entry (progress/reading_log.json "entries")."""
+
+    id: str = None
+    book_id: str = None
+    title: str = None
+    author: str = None
+    domain: str = None
+    finished_at: str = None
+    rating: int = None
+    quick_note: str = None
+    reflection: dict = None
+    extra: dict = None
+
+    _REQUIRED = ("id", "title", "author", "domain", "finished_at")
+    _OMIT_NONE = frozenset({"book_id"})
+    _INTERN = ("author", "domain")
+
+    def _check(self, prefix: str) -> None:
+        if self.rating is not None and not 1 <= self.rating <= 5:
+            raise ValueError(f"{prefix}rating must be between 1 and 5, got {self.rating}")
+
+
+@_record
+class Author(_Record):
+    """One author record (authors.json "authors", keyed by slug)."""
+
+    name: str = None
+    books_read: list[str] = None
+    book_ids: list[str] = None
+    total_books: int = None
+    ratings: list[int] = None
+    average_rating: float = None
+    first_read: str = None
+    last_read: str = None
+    affinity: str = None
+    style_notes: dict = None
+    your_notes: str = None
+    extra: dict = None
+
+    _REQUIRED = ("name",)
+    _OMIT_NONE = frozenset({"book_ids"})
+    _CHOICES = {"affinity": AFFINITIES}
+    _INTERN = ("affinity",)
+
+
+@_record
+class StackBook(_Record):
+    """One book in a domain's stack (bookstacks.json "stacks" → "books")."""
+
+    book_id: str = None
+    title: str = None
+    author: str = None
+    why: str = None
+    difficulty: str = None
+    time_estimate: str = None
+    craft_focus: str = None
+    position: int = None
+    added_at: str = None
+    extra: dict = None
+
+    _REQUIRED = ("title",)
+    _OMIT_NONE = frozenset({
+        "book_id", "author", "why", "difficulty", "time_estimate", "craft_focus", "position", "added_at"
+    })
+    _CHOICES = {"difficulty": DIFFICULTIES}
+    _INTERN = ("author", "difficulty")
+
+
+@_record
+class Connection(_Record):
+    """One connection between two books (connections.json "connections")."""
+
+    from_title: str = None
+    to_title: str = None
+    from_id: str = None
+    to_id: str = None
+    relationship: str = None
+    reason: str = None
+    strength: str = None
+    created_at: str = None
+    updated_at: str = None
+    extra: dict = None
+
+    _KEYS = {"from_title": "from", "to_title": "to"}
+    _REQUIRED = ("from_title", "to_title", "relationship")
+    _OMIT_NONE = frozenset({"from_id", "to_id", "updated_at"})
+    _CHOICES = {"relationship": RELATIONSHIPS, "strength": STRENGTHS}
+    _INTERN = ("relationship", "strength")
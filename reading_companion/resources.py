@@ -3,15 +3,27 @@ MCP Resources (read-only data access).
 """
 
 import json
+from bisect import bisect_left
+from datetime import date
 
-from .config import PROGRESS_DIR
+from .archive import archive_summary, archived_count, archived_entries, full_log
+from .config import LOG_PAGE_SIZE, progress_dir
 from .storage import load_json
+from .cache import memoize, cache_stats
+from .handlers import HandlerRegistrar
+from .indexes import authors_by_slug, log_by_date, stacks_by_domain
+from .metrics import metrics_snapshot
+from .subscriptions import enable_subscriptions, subscriber_count
+from .tenancy import tenant_stats
 
 
 def register_resources(mcp):
     """Register MCP resources with the server."""
+    enable_subscriptions(mcp)
+    mcp = HandlerRegistrar(mcp)
 
     @mcp.resource("profile://current")
+    @memoize("profile")
     def get_profile_resource() -> str:
         """Current user reading profile."""
         profile = load_json("profile")
@@ -20,6 +32,7 @@ def register_resources(mcp):
         return json.dumps(profile, indent=2)
 
     @mcp.resource("bookstacks://all")
+    @memoize("bookstacks")
     def get_all_stacks_resource() -> str:
         """All reading stacks across domains."""
         stacks = load_json("bookstacks")
@@ -28,10 +41,87 @@ def register_resources(mcp):
         return json.dumps(stacks, indent=2)
 
     @mcp.resource("log://recent")
+    @memoize("reading_log", "log_archive")
     def get_recent_log_resource() -> str:
         """Recent reading log entries (last 10)."""
-        log = load_json("reading_log", PROGRESS_DIR)
-        entries = log.get("entries", [])[-10:]
+        log = load_json("reading_log", progress_dir())
+        entries = log.get("entries", [])
+        entries = (entries if len(entries) >= 10 else full_log())[-10:]
         if not entries:
             return json.dumps({"message": "No books logged yet."})
         return json.dumps(entries, indent=2)
+
+    @mcp.resource("bookstacks://{domain}")
+    @memoize("bookstacks")
+    def get_stack_resource(domain: str) -> str:
+        """One domain's reading stack."""
+        stacks = stacks_by_domain()
+        if domain not in stacks:
+            return json.dumps({"message": f"No stack for domain '{domain}'", "available": list(stacks)})
+        return json.dumps(stacks[domain], indent=2)
+
+    @mcp.resource("author://{slug}")
+    @memoize("authors")
+    def get_author_resource(slug: str) -> str:
+        """One author's profile, by slug (e.g., leo-tolstoy)."""
+        author = authors_by_slug().get(slug)
+        if author is None:
+            return json.dumps({"message": f"No author '{slug}' yet."})
+        return json.dumps(author, indent=2)
+
+    @mcp.resource("log://page/{n}")
+    @memoize("reading_log", "log_archive")
+    def get_log_page_resource(n: str) -> str:
+        """One page of the reading log, newest first (page 1 is the most recent)."""
+        page = int(n)
+        if page < 1:
+            raise ValueError("Page numbers start at 1")
+        _, entries = log_by_date()
+        archived = archived_count()
+        total = archived + len(entries)
+        end = total - (page - 1) * LOG_PAGE_SIZE
+        start = max(0, end - LOG_PAGE_SIZE)
+        if start < archived:
+            # Archived years all precede the hot entries
+            entries = _by_date(archived_entries()) + entries
+        else:
+            start, end = start - archived, end - archived
+        return json.dumps({
+            "page": page,
+            "pages": -(-total // LOG_PAGE_SIZE),
+            "total": total,
+            "entries": entries[start:end][::-1] if end > 0 else []
+        }, indent=2)
+
+    @mcp.resource("log://since/{date}")
+    @memoize("reading_log", "log_archive")
+    def get_log_since_resource(date: str) -> str:
+        """Reading log entries finished on or after a date (YYYY-MM-DD), oldest first."""
+        since = _parse_date(date)
+        dates, entries = log_by_date()
+        found = entries[bisect_left(dates, since):]
+        if archive_summary() and since[:4] <= max(archive_summary()):
+            archived = _by_date(archived_entries())
+            found = archived[bisect_left([e.get("finished_at") or "" for e in archived], since):] + found
+        return json.dumps(found, indent=2)
+
+    @mcp.resource("metrics://tools")
+    def get_tool_metrics_resource() -> str:
+        """Per-tool call counts, latency percentiles and file I/O, plus cache, tenant and subscription stats."""
+        return json.dumps({
+            "handlers": metrics_snapshot(),
+            "cache": cache_stats(),
+            "tenants": tenant_stats(),
+            "subscriptions": subscriber_count()
+        }, indent=2)
+
+
+def _by_date(entries: list[dict]) -> list[dict]:
+    return sorted(entries, key=lambda e: e.get("finished_at") or "")
+
+
+def _parse_date(value: str) -> str:
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise ValueError(f"Invalid date '{value}': use YYYY-MM-DD") from None
@@ -0,0 +1,143 @@
+"""
+Monthly rollups of the reading log.
+
+Each month bucket holds the book count, rated-book count and rating sum,
+overall and per domain. log_book adds each new entry to its bucket, so
+trend queries read one small bucket per month instead of scanning the log.
+The rollups are the "rollups" dataset, stored next to the reading log.
+Archived years keep their own month buckets in their summaries, so
+rebuilding the rollups doesn't decompress the archive.
+"""
+
+import copy
+import re
+
+from .archive import archive_summary, segment_entries
+from .config import progress_dir
+from .indexes import index
+from .storage import load_json
+
+PERIODS = ("month", "quarter", "year")
+
+
+def _new_bucket() -> dict:
+    return {"books": 0, "rated": 0, "rating_sum": 0}
+
+
+def add_entry(rollups: dict, entry: dict) -> None:
+    """Count a log entry in its month's bucket."""
+    month = (entry.get("finished_at") or "")[:7]
+    if not month:
+        return
+    bucket = rollups.setdefault("months", {}).setdefault(month, {**_new_bucket(), "domains": {}})
+    domain_bucket = bucket["domains"].setdefault(entry.get("domain") or "other", _new_bucket())
+    rating = entry.get("rating")
+    for b in (bucket, domain_bucket):
+        b["books"] += 1
+        if rating:
+            b["rated"] += 1
+            b["rating_sum"] += rating
+
+
+def build_rollups(entries: list[dict]) -> dict:
+    """Rollups for a whole log, for data logged before rollups existed."""
+    rollups = {"version": "1.0", "months": {}}
+    for entry in entries:
+        add_entry(rollups, entry)
+    return rollups
+
+
+def log_rollups(hot: list[dict]) -> dict:
+    """
+    Rollups for the whole log: archived years from their summaries, then the hot entries.
+
+    Args:
+        hot: Entries of the hot reading log
+    """
+    rollups = {"version": "1.0", "months": {}}
+    for summary in archive_summary().values():
+        months = summary.get("months")
+        if months is None:
+            # Archived before summaries kept month buckets
+            months = build_rollups(segment_entries(summary["segment"]))["months"]
+        rollups["months"].update(copy.deepcopy(months))
+    for entry in hot:
+        add_entry(rollups, entry)
+    return rollups
+
+
+@index("reading_log", "log_archive", "rollups")
+def monthly_rollups() -> dict:
+    """Month buckets keyed by "YYYY-MM", built from the log if none are saved yet."""
+    rollups = load_json("rollups", progress_dir())
+    if not rollups:
+        rollups = log_rollups(load_json("reading_log", progress_dir()).get("entries", []))
+    return rollups.get("months", {})
+
+
+def _period_key(month: str, period: str) -> str:
+    if period == "year":
+        return month[:4]
+    if period == "quarter":
+        return f"{month[:4]}-Q{(int(month[5:7]) - 1) // 3 + 1}"
+    return month
+
+
+def _check_month(value: str) -> str:
+    if not re.fullmatch(r"\d{4}-(0[1-9]|1[0-2])", value):
+        raise ValueError(f"Invalid month '{value}': use YYYY-MM")
+    return value
+
+
+def _months(start: str, end: str):
+    year, month = int(start[:4]), int(start[5:7])
+    while f"{year:04d}-{month:02d}" <= end:
+        yield f"{year:04d}-{month:02d}"
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def reading_trends(period: str = "month", domain: str = None, start: str = None, end: str = None) -> list[dict]:
+    """
+    Books, average rating and domain mix per period, oldest first.
+
+    Periods with no books between start and end are included as zeros.
+
+    Args:
+        period: "month", "quarter" or "year"
+        domain: Only count books in this domain
+        start: First month, "YYYY-MM" (default: first month with books)
+        end: Last month, "YYYY-MM" (default: last month with books)
+    """
+    if period not in PERIODS:
+        raise ValueError(f"Unknown period '{period}': use one of {', '.join(PERIODS)}")
+    start = _check_month(start) if start else None
+    end = _check_month(end) if end else None
+    months = monthly_rollups()
+    if not months and not (start and end):
+        # An empty log has no first or last month to default to
+        return []
+    start = start or min(months)
+    end = end or max(months)
+
+    totals: dict[str, dict] = {}
+    for month in _months(start, end):
+        total = totals.setdefault(_period_key(month, period), {**_new_bucket(), "domains": {}})
+        bucket = months.get(month)
+        if bucket is None:
+            continue
+        source = bucket["domains"].get(domain, _new_bucket()) if domain else bucket
+        for key in ("books", "rated", "rating_sum"):
+            total[key] += source[key]
+        for name, domain_bucket in bucket["domains"].items():
+            if domain is None or name == domain:
+                total["domains"][name] = total["domains"].get(name, 0) + domain_bucket["books"]
+
+    return [
+        {
+            "period": key,
+            "books": total["books"],
+            "average_rating": round(total["rating_sum"] / total["rated"], 2) if total["rated"] else None,
+            "domains": total["domains"],
+        }
+        for key, total in totals.items()
+    ]
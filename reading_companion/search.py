@@ -0,0 +1,281 @@
+"""
+Full-text search over reflections, notes and stack rationales.
+
+Every logged book (quick note and reflection), author (notes and style
+notes) and stack book ("why") is a document in an inverted index saved as
+the "search_index" dataset. Tools that change those fields record just the
+affected documents in a small delta, and queries are ranked with BM25
+against the parsed main index and delta kept in memory, so nothing is
+scanned at query time.
+"""
+
+import heapq
+import math
+import re
+import unicodedata
+from collections import Counter
+
+from .archive import full_log
+from .indexes import index
+from .progress import track
+from .storage import load_json, save_json
+
+# BM25 parameters
+K1 = 1.5
+B = 0.75
+
+# Changed documents held in the delta before it is merged into the main index
+MERGE_THRESHOLD = 256
+
+# Characters of context shown around the best match
+SNIPPET_CHARS = 160
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "for", "from", "had", "has",
+    "have", "he", "her", "his", "i", "in", "is", "it", "its", "me", "my", "of", "on",
+    "or", "she", "so", "that", "the", "their", "them", "they", "this", "to", "was",
+    "we", "were", "what", "when", "which", "who", "with", "you", "your",
+}
+
+KINDS = ("book", "author", "stack")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase, diacritic-folded words, without stopwords."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    return [t for t in re.findall(r"\w+", text) if len(t) > 1 and t not in STOPWORDS]
+
+
+def _join(*parts) -> str:
+    flat = []
+    for part in parts:
+        if isinstance(part, (list, tuple)):
+            flat.extend(str(p) for p in part if p)
+        elif part:
+            flat.append(str(part))
+    return " · ".join(flat)
+
+
+def book_document(entry: dict) -> tuple[str, dict]:
+    """Search document for a reading log entry."""
+    reflection = entry.get("reflection") or {}
+    doc_id = f"book:{entry.get('finished_at')}|{entry.get('title')}"
+    return doc_id, {
+        "kind": "book",
+        "title": entry.get("title"),
+        "detail": entry.get("author"),
+        "text": _join(
+            entry.get("title"), entry.get("author"), entry.get("quick_note"),
+            reflection.get("key_takeaway"), reflection.get("craft_lessons"),
+            reflection.get("personal_insights"), reflection.get("favorite_quotes"),
+        ),
+    }
+
+
+def author_document(slug: str, data: dict) -> tuple[str, dict]:
+    """Search document for an author record."""
+    style = data.get("style_notes") or {}
+    return f"author:{slug}", {
+        "kind": "author",
+        "title": data.get("name", slug),
+        "detail": f"{data.get('total_books', 0)} books",
+        "text": _join(data.get("name"), data.get("your_notes"), *style.values()),
+    }
+
+
+def stack_documents(domain: str, stack: dict) -> list[tuple[str, dict]]:
+    """Search documents for every book in a domain's stack."""
+    return [
+        (f"stack:{domain}:{position}", {
+            "kind": "stack",
+            "title": book.get("title"),
+            "detail": domain,
+            "text": _join(book.get("title"), book.get("author"), book.get("why"), book.get("craft_focus")),
+        })
+        for position, book in enumerate(stack.get("books", []), 1)
+    ]
+
+
+def _add(search_index: dict, doc_id: str, doc: dict) -> None:
+    terms = Counter(tokenize(doc["text"]))
+    doc["length"] = sum(terms.values())
+    search_index["docs"][doc_id] = doc
+    search_index["total_length"] += doc["length"]
+    for term, tf in terms.items():
+        search_index["postings"].setdefault(term, {})[doc_id] = tf
+
+
+def _remove(search_index: dict, doc_id: str) -> None:
+    doc = search_index["docs"].pop(doc_id, None)
+    if doc is None:
+        return
+    search_index["total_length"] -= doc["length"]
+    for term in set(tokenize(doc["text"])):
+        postings = search_index["postings"].get(term, {})
+        postings.pop(doc_id, None)
+        if not postings:
+            search_index["postings"].pop(term, None)
+
+
+def _new_index() -> dict:
+    return {"version": "1.0", "docs": {}, "postings": {}, "total_length": 0}
+
+
+def build_search_index() -> dict:
+    """Index every document from scratch, for data saved before the index existed."""
+    search_index = _new_index()
+    for entry in track(full_log(), label="log entries"):
+        _add(search_index, *book_document(entry))
+    for slug, data in load_json("authors").get("authors", {}).items():
+        _add(search_index, *author_document(slug, data))
+    for domain, stack in load_json("bookstacks").get("stacks", {}).items():
+        for doc_id, doc in stack_documents(domain, stack):
+            _add(search_index, doc_id, doc)
+    return search_index
+
+
+@index("search_index")
+def _main_index() -> dict:
+    return load_json("search_index") or build_search_index()
+
+
+@index("search_delta")
+def _delta_index() -> dict:
+    delta = load_json("search_delta")
+    search_index = _new_index()
+    for doc_id, doc in delta.get("docs", {}).items():
+        _add(search_index, doc_id, dict(doc))
+    search_index["removed"] = set(delta.get("removed", []))
+    return search_index
+
+
+def update_search_index(documents: list[tuple[str, dict]] = (), remove_prefix: str = None,
+                        remove: list[str] = ()) -> None:
+    """
+    Add, replace or drop documents.
+
+    Changes go to a small delta (the "search_delta" dataset) that hides the
+    main index's copies of changed documents; the delta is merged into the
+    main index once it holds MERGE_THRESHOLD documents, so most writes
+    don't rewrite the whole index. Tools calling this must declare
+    "search_index" and "search_delta" in writes=.
+
+    Args:
+        documents: (doc_id, document) pairs to add or replace
+        remove_prefix: Also drop documents whose id starts with this (e.g., "stack:neuro:")
+        remove: Also drop these document ids
+    """
+    delta = load_json("search_delta")
+    # The delta only exists once a main index has been saved
+    if not delta:
+        if not load_json("search_index"):
+            save_json("search_index", build_search_index(), indent=None)
+        delta = {"version": "1.0", "docs": {}, "removed": []}
+    main_docs = _main_index()["docs"]
+
+    removed = set(delta["removed"])
+    stale = set(remove) | {doc_id for doc_id, _ in documents}
+    if remove_prefix:
+        stale |= {doc_id for doc_id in main_docs if doc_id.startswith(remove_prefix)}
+        stale |= {doc_id for doc_id in delta["docs"] if doc_id.startswith(remove_prefix)}
+    for doc_id in stale:
+        delta["docs"].pop(doc_id, None)
+        if doc_id in main_docs:
+            removed.add(doc_id)
+    for doc_id, doc in documents:
+        delta["docs"][doc_id] = doc
+
+    if len(delta["docs"]) + len(removed) < MERGE_THRESHOLD:
+        delta["removed"] = sorted(removed)
+        save_json("search_delta", delta, indent=None)
+        return
+
+    search_index = load_json("search_index")
+    for doc_id in removed | set(delta["docs"]):
+        _remove(search_index, doc_id)
+    for doc_id, doc in delta["docs"].items():
+        _add(search_index, doc_id, doc)
+    save_json("search_index", search_index, indent=None)
+    save_json("search_delta", {"version": "1.0", "docs": {}, "removed": []}, indent=None)
+
+
+def _snippet(text: str, terms: set[str]) -> str:
+    words = list(re.finditer(r"\w+", text))
+    folded = [tokenize(w.group())[:1] for w in words]
+    hits = [i for i, tokens in enumerate(folded) if tokens and tokens[0] in terms]
+    if not hits:
+        return text[:SNIPPET_CHARS]
+
+    # Start and end on word boundaries, with some context before the first hit
+    earliest = words[hits[0]].start() - SNIPPET_CHARS // 3
+    start = next(w.start() for w in words if w.start() >= earliest)
+    end = max((w.end() for w in words if w.end() <= start + SNIPPET_CHARS), default=len(text))
+    parts = []
+    position = start
+    for i in hits:
+        match = words[i]
+        if match.start() < start or match.end() > end:
+            continue
+        parts.append(text[position:match.start()])
+        parts.append(f"**{match.group()}**")
+        position = match.end()
+    parts.append(text[position:end])
+    return ("…" if start > 0 else "") + "".join(parts) + ("…" if end < len(text) else "")
+
+
+def search(query: str, kind: str = None, limit: int = 10) -> list[dict]:
+    """
+    Documents matching a query, best first, with highlighted snippets.
+
+    Args:
+        query: Words to look for
+        kind: Only return "book", "author" or "stack" documents
+        limit: Maximum results
+    """
+    main, delta = _main_index(), _delta_index()
+    terms = set(tokenize(query))
+    # Main-index documents superseded or removed by the delta
+    hidden = {doc_id for doc_id in delta["removed"] | set(delta["docs"]) if doc_id in main["docs"]}
+
+    def doc(doc_id):
+        return delta["docs"].get(doc_id) or main["docs"][doc_id]
+
+    n = len(main["docs"]) - len(hidden) + len(delta["docs"])
+    if not n or not terms:
+        return []
+    total_length = (
+        main["total_length"] + delta["total_length"]
+        - sum(main["docs"][doc_id]["length"] for doc_id in hidden)
+    )
+    average_length = total_length / n or 1
+
+    scores: dict[str, float] = {}
+    for term in terms:
+        postings = {
+            doc_id: tf for doc_id, tf in main["postings"].get(term, {}).items() if doc_id not in hidden
+        }
+        postings.update(delta["postings"].get(term, {}))
+        if not postings:
+            continue
+        idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+        for doc_id, tf in postings.items():
+            norm = K1 * (1 - B + B * doc(doc_id)["length"] / average_length)
+            scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+
+    ranked = heapq.nlargest(
+        limit,
+        (doc_id for doc_id in scores if kind is None or doc(doc_id)["kind"] == kind),
+        key=scores.get
+    )
+
+    return [
+        {
+            "kind": doc(doc_id)["kind"],
+            "title": doc(doc_id)["title"],
+            "detail": doc(doc_id)["detail"],
+            "score": round(scores[doc_id], 3),
+            "snippet": _snippet(doc(doc_id)["text"], terms),
+        }
+        for doc_id in ranked
+    ]
@@ -0,0 +1,164 @@
+"""
+Content similarity between books.
+
+Each book, whether logged or waiting in a stack, gets a sparse TF-IDF vector
+built from its quick note and reflection, its stacks' "why" and
+"craft_focus" text, and its author's style notes. Vectors are L2-normalised
+and kept as an inverted term -> {book: weight} matrix, so a nearest-neighbour
+query only touches books sharing a term with the query book. Everything is
+computed locally from the saved datasets. Archived books are read from the
+archive summaries, so they take part through their title, stacks and author
+but without their notes, and no archive segment is decompressed.
+
+The matrix is an index rebuilt when one of its datasets changes, but each
+book's term counts are cached by text and only re-tokenised when that
+book's text changed, so a rebuild after one edit is mostly arithmetic.
+"""
+
+import heapq
+import math
+from collections import Counter
+
+from .aliases import resolve_author
+from .archive import archived_books
+from .catalog import book_ref
+from .indexes import authors_by_slug, index
+from .progress import track
+from .search import tokenize
+from .config import progress_dir
+from .storage import load_json, slugify
+from .tenancy import tenant_state
+
+# Cosine score above which a suggestion is a "strong" connection
+STRONG_SCORE = 0.45
+# ...and above which it is "moderate" (below: "weak")
+MODERATE_SCORE = 0.25
+
+
+def _book_texts() -> dict[str, dict]:
+    """Join key (see book_ref) -> {"title", "author", "parts": [text, ...]} for every known book."""
+    books: dict[str, dict] = {}
+
+    def add(title, author, book_id, *parts):
+        if not title:
+            return
+        key = book_ref(title, author, book_id)
+        book = books.setdefault(key, {"title": title, "author": author, "parts": []})
+        book["author"] = book["author"] or author
+        book["parts"].extend(str(p) for p in parts if p)
+
+    for book in archived_books():
+        add(book["title"], book["author"], None)
+    for entry in load_json("reading_log", progress_dir()).get("entries", []):
+        reflection = entry.get("reflection") or {}
+        add(
+            entry.get("title"), entry.get("author"), entry.get("book_id"), entry.get("quick_note"),
+            reflection.get("key_takeaway"), *(reflection.get("craft_lessons") or []),
+            *(reflection.get("personal_insights") or []),
+        )
+    for stack in load_json("bookstacks").get("stacks", {}).values():
+        for book in stack.get("books", []):
+            add(
+                book.get("title"), book.get("author"), book.get("book_id"),
+                book.get("why"), book.get("craft_focus"),
+            )
+
+    authors = authors_by_slug()
+    for book in books.values():
+        if not book["author"]:
+            continue
+        data = authors.get(resolve_author(book["author"]) or slugify(book["author"]), {})
+        for note in (data.get("style_notes") or {}).values():
+            book["parts"].extend(note if isinstance(note, list) else [note])
+    return books
+
+
+@index("reading_log", "log_archive", "bookstacks", "authors", "aliases", "catalog")
+def similarity_matrix() -> dict:
+    """
+    TF-IDF vectors for every book.
+
+    Returns {"books": {key: {"title", "author", "vector"}}, "postings": {term: {key: weight}}}.
+    """
+    # Term counts from the previous build, reused for books whose text is unchanged
+    state = tenant_state().indexes
+    previous = state.get("_similarity_terms", {})
+    terms: dict[str, tuple[str, Counter]] = {}
+
+    books = _book_texts()
+    for key, book in track(books.items(), label="books"):
+        text = "\n".join(book["parts"])
+        cached = previous.get(key)
+        terms[key] = cached if cached and cached[0] == text else (text, Counter(tokenize(text)))
+    state["_similarity_terms"] = terms
+
+    document_frequency = Counter()
+    for _, counts in terms.values():
+        document_frequency.update(counts.keys())
+    n = len(terms)
+
+    matrix = {"books": {}, "postings": {}}
+    for key, (_, counts) in terms.items():
+        vector = {
+            term: (1 + math.log(tf)) * (math.log((1 + n) / (1 + document_frequency[term])) + 1)
+            for term, tf in counts.items()
+        }
+        norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+        vector = {term: w / norm for term, w in vector.items()}
+        matrix["books"][key] = {"title": books[key]["title"], "author": books[key]["author"], "vector": vector}
+        for term, weight in vector.items():
+            matrix["postings"].setdefault(term, {})[key] = weight
+    return matrix
+
+
+def similar_books(title: str, limit: int = 5, min_score: float = 0.0, exclude: set[str] = ()) -> list[dict]:
+    """
+    Books whose text is closest to a book's, best first.
+
+    Args:
+        title: Book title, in any spelling variant
+        limit: Maximum results
+        min_score: Drop results with a lower cosine similarity
+        exclude: Join keys (see book_ref) of books to leave out
+
+    Returns [{"title", "author", "score", "shared_terms"}]; empty if the book is unknown.
+    """
+    matrix = similarity_matrix()
+    key = book_ref(title)
+    book = matrix["books"].get(key)
+    if book is None:
+        return []
+
+    scores: dict[str, float] = {}
+    for term, weight in book["vector"].items():
+        for other, other_weight in matrix["postings"][term].items():
+            scores[other] = scores.get(other, 0.0) + weight * other_weight
+
+    candidates = (
+        other for other, score in scores.items()
+        if other != key and other not in exclude and score >= min_score
+    )
+    results = []
+    for other in heapq.nlargest(limit, candidates, key=scores.get):
+        other_vector = matrix["books"][other]["vector"]
+        shared = sorted(
+            (t for t in book["vector"] if t in other_vector),
+            key=lambda t: book["vector"][t] * other_vector[t],
+            reverse=True,
+        )
+        results.append({
+            "title": matrix["books"][other]["title"],
+            "author": matrix["books"][other]["author"],
+            "score": round(scores[other], 3),
+            "shared_terms": shared[:5],
+        })
+    return results
+
+
+def strength_for(score: float) -> str:
+    """Connection strength for a cosine similarity score."""
+    if score >= STRONG_SCORE:
+        return "strong"
+    if score >= MODERATE_SCORE:
+        return "moderate"
+    return "weak"
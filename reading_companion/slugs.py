@@ -0,0 +1,111 @@
+"""
+Slug registry for reflection and author pages.
+
+Each book (by catalog ID) and author key is assigned a page path the first
+time its page is written, and keeps it from then on. The slug is made from
+the book's title, and slugs are unique within a section, so "Dune" and
+"Dune!", or two books both titled "Collected Poems", get their own pages
+instead of one overwriting the other. New pages are placed according to
+PAGE_LAYOUT.
+
+The registry is the "slugs" dataset; tools that write these pages must
+declare it in writes=.
+"""
+
+from pathlib import Path
+
+from .config import PAGE_LAYOUT, authors_dir, reflections_dir
+from .indexes import index
+from .storage import load_json, save_json, slugify
+
+SECTIONS = {"reflections": reflections_dir, "authors": authors_dir}
+
+
+@index("slugs")
+def slug_registry() -> dict:
+    """Registered page paths per section: {section: {key: relative path}}."""
+    return load_json("slugs")
+
+
+def _shard(slug: str, year: str = None) -> str:
+    if PAGE_LAYOUT == "prefix":
+        return slug[:2]
+    if PAGE_LAYOUT == "year":
+        return year or "undated"
+    return ""
+
+
+def _written_for(path: Path, name: str) -> bool:
+    # Pages start with "# <title>"
+    with open(path) as f:
+        return f.readline().rstrip("\n") == f"# {name}"
+
+
+def page_path(section: str, key: str, name: str = None) -> Path:
+    """
+    Path of the page for a book ID or author key, without registering it.
+
+    Keys that were never registered (pages written before the registry
+    existed) resolve to their flat slug path.
+
+    Args:
+        section: "reflections" or "authors"
+        key: Book ID or author key
+        name: Book title the slug is made from (default: key)
+    """
+    pages = slug_registry().get(section, {})
+    relative = pages.get(key) or pages.get(name)
+    return SECTIONS[section]() / (relative or f"{slugify(name or key)}.md")
+
+
+def page_links(section: str) -> dict:
+    """Registered {key: path relative to the section folder}, for index pages."""
+    return slug_registry().get(section, {})
+
+
+def assign_page(section: str, key: str, year: str = None, name: str = None) -> Path:
+    """
+    Path of the page for a book ID or author key, registering a new one if needed.
+
+    Args:
+        section: "reflections" or "authors"
+        key: Book ID or author key
+        year: Year used by the "year" layout (e.g., "2024")
+        name: Book title the slug is made from (default: key)
+    """
+    registry = load_json("slugs") or {"version": "1.0"}
+    pages = registry.setdefault(section, {})
+    if key in pages:
+        return SECTIONS[section]() / pages[key]
+
+    if name in pages:
+        # Registered under its title before pages were keyed by book ID
+        pages[key] = pages.pop(name)
+        save_json("slugs", registry)
+        return SECTIONS[section]() / pages[key]
+
+    base = slugify(name or key) or "untitled"
+    taken = {Path(relative).stem for relative in pages.values()}
+    relative = None
+    legacy = SECTIONS[section]() / f"{base}.md"
+    if base not in taken and legacy.exists():
+        # Page written before the registry existed: keep it where it is if
+        # it's this book's, else keep its slug free for the book it belongs
+        # to (author pages are named after their key, so they can't collide)
+        if name is None or _written_for(legacy, name):
+            relative = f"{base}.md"
+        else:
+            taken.add(base)
+    if relative is None:
+        slug, n = base, 2
+        while slug in taken:
+            slug, n = f"{base}-{n}", n + 1
+        shard = _shard(slug, year)
+        relative = f"{shard}/{slug}.md" if shard else f"{slug}.md"
+
+    pages[key] = relative
+    save_json("slugs", registry)
+
+    path = SECTIONS[section]() / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
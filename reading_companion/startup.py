@@ -0,0 +1,70 @@
+"""
+Startup phase timing.
+
+The server is created lazily, and each startup phase (imports, tool
+registration, first dataset load, first response) is timed so cold-start
+regressions are visible with `reading-companion --profile-startup`.
+"""
+
+import asyncio
+import sys
+import time
+from contextlib import contextmanager
+
+from .config import STARTUP_TARGET_MS
+
+# (phase name, duration in ms), in the order phases finished
+_phases: list[tuple[str, float]] = []
+
+
+@contextmanager
+def phase(name: str):
+    """Time a startup phase."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _phases.append((name, (time.perf_counter() - start) * 1000))
+
+
+def startup_phases() -> list[dict]:
+    """Phases recorded so far in this process."""
+    return [{"phase": name, "ms": round(ms, 1)} for name, ms in _phases]
+
+
+def profile_startup(started_at: float) -> int:
+    """
+    Run every startup phase up to the first tool response and print a report.
+
+    Args:
+        started_at: perf_counter() value taken when the package was imported
+
+    Returns a process exit code: 0 if time-to-first-response is within
+    STARTUP_TARGET_MS, 1 otherwise.
+    """
+    from . import get_server
+    from .storage import load_json
+
+    server = get_server()
+
+    with phase("first_dataset_load"):
+        load_json("profile")
+
+    with phase("first_response"):
+        asyncio.run(server.call_tool("get_profile", {}))
+
+    ttfr = (time.perf_counter() - started_at) * 1000
+    within = ttfr <= STARTUP_TARGET_MS
+
+    # stdout is the MCP transport, so the report goes to stderr
+    out = sys.stderr
+    print("Startup profile", file=out)
+    print("", file=out)
+    for item in startup_phases():
+        print(f"  {item['phase']:<22} {item['ms']:>8.1f} ms", file=out)
+    print(f"  {'time_to_first_response':<22} {ttfr:>8.1f} ms", file=out)
+    print("", file=out)
+    status = "within" if within else "OVER"
+    print(f"Target: {STARTUP_TARGET_MS} ms ({status} target)", file=out)
+
+    return 0 if within else 1
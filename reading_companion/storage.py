@@ -1,12 +1,114 @@
 """
 JSON storage utilities.
+
+Writes made by a tool are committed as one transaction: inside
+transaction(), save_json and write_text only buffer their output (and
+load_json sees the buffered data). On exit the whole batch is written to a
+journal file and fsynced, then applied file by file; the journal is removed
+once the applied files and their directories are fsynced too. If the
+process dies before that, the journal is replayed the next time that data
+root is used; a journal that never finished writing is discarded, which
+rolls the transaction back since nothing was applied yet.
 """
 
+import itertools
 import json
+import logging
+import os
 import re
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
 
-from .config import DATA_DIR, PROMPTS_DIR, ensure_dirs
+from .config import PROMPTS_DIR, data_dir, ensure_dirs, progress_dir
+from .metrics import record_read, record_write
+from .tenancy import pinned_state, tenant_state
+
+logger = logging.getLogger(__name__)
+
+# Journal files live here, inside each data root
+JOURNAL_DIR = ".journal"
+
+# Buffered writes of the running transaction: {path: (dataset name or None, text)}
+_transaction = ContextVar("reading_companion_transaction", default=None)
+# Indexes and memoized results built inside the running transaction: {key: (datasets, value)}
+_derived = ContextVar("reading_companion_derived", default=None)
+_journal_ids = itertools.count()
+
+# Serializes recovery passes (each tenant state records whether its own ran)
+_recovered_lock = threading.Lock()
+
+# Journals of this process's transactions that are still being committed
+_in_flight: set[str] = set()
+
+# Guards creation of the per-tenant dataset locks
+_dataset_locks_guard = threading.Lock()
+
+
+@contextmanager
+def dataset_lock(*names: str):
+    """
+    Hold the current tenant's locks on the named datasets.
+
+    Locks are taken in sorted order so concurrent writers can't deadlock.
+    They live in the tenant's state, which stays loaded while they're held,
+    so every holder of a tenant's lock sees the same lock object.
+    """
+    with pinned_state() as state:
+        with _dataset_locks_guard:
+            locks = [state.locks.setdefault(name, threading.Lock()) for name in sorted(set(names))]
+        for lock in locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+
+# Called as listener(tenant, dataset name) after every save
+_change_listeners: list = []
+
+
+def add_change_listener(listener) -> None:
+    """Call listener(tenant, name) whenever a dataset is saved."""
+    _change_listeners.append(listener)
+
+
+def get_generation(name: str) -> int:
+    """Current tenant's write generation of a dataset (0 if not written since loaded)."""
+    return tenant_state().generations.get(name, 0)
+
+
+def bump_generation(name: str) -> int:
+    """Mark a dataset as changed, invalidating results derived from it."""
+    state = tenant_state()
+    generations = state.generations
+    generations[name] = generations.get(name, 0) + 1
+    for listener in _change_listeners:
+        listener(state.tenant, name)
+    return generations[name]
+
+
+# Datasets saved in progress/ rather than at the top of the data root
+PROGRESS_DATASETS = frozenset({"reading_log", "rollups", "facets", "log_archive"})
+
+
+def dataset_version(name: str) -> tuple:
+    """
+    Version of a dataset for cache keys: its write generation plus the file's identity.
+
+    Generations only count saves made by this process; the file's
+    (inode, mtime, size) also changes when another process saves it
+    (saves replace the file, so the inode changes on every save).
+    """
+    directory = progress_dir() if name in PROGRESS_DATASETS else data_dir()
+    try:
+        stat = os.stat(directory / f"{name}.json")
+    except FileNotFoundError:
+        return get_generation(name), None
+    return get_generation(name), (stat.st_ino, stat.st_mtime_ns, stat.st_size)
 
 
 def load_json(name: str, subdir: Path = None) -> dict:
@@ -15,20 +117,25 @@ def load_json(name: str, subdir: Path = None) -> dict:
 
     Args:
         name: File name without .json extension
-        subdir: Optional subdirectory (e.g., PROGRESS_DIR)
+        subdir: Optional subdirectory (e.g., progress_dir())
 
     Returns:
         Parsed JSON as dict, or empty dict if file doesn't exist
     """
-    directory = subdir or DATA_DIR
+    recover_journal()
+    directory = subdir or data_dir()
     path = directory / f"{name}.json"
+    pending = _transaction.get()
+    if pending is not None and path in pending:
+        return json.loads(pending[path][1])
     if not path.exists():
         return {}
-    with open(path, "r") as f:
-        return json.load(f)
+    raw = path.read_bytes()
+    record_read(path, len(raw))
+    return json.loads(raw)
 
 
-def save_json(name: str, data: dict, subdir: Path = None) -> None:
+def save_json(name: str, data: dict, subdir: Path = None, indent: int = 2) -> None:
     """
     Save data to a JSON file.
 
@@ -36,12 +143,191 @@ def save_json(name: str, data: dict, subdir: Path = None) -> None:
         name: File name without .json extension
         data: Dictionary to save
         subdir: Optional subdirectory
+        indent: Pretty-print indent; None writes compact JSON for large derived data
     """
     ensure_dirs()
-    directory = subdir or DATA_DIR
+    directory = subdir or data_dir()
     path = directory / f"{name}.json"
-    with open(path, "w") as f:
-        json.dump(data, f, indent=2)
+    text = json.dumps(data, indent=indent, separators=None if indent else (",", ":"))
+    pending = _transaction.get()
+    if pending is not None:
+        pending[path] = (name, text)
+        derived = _derived.get()
+        for key in [key for key, (datasets, _) in derived.items() if name in datasets]:
+            del derived[key]
+        return
+    _replace(path, text)
+    bump_generation(name)
+
+
+def write_text(path: Path, text: str) -> None:
+    """
+    Replace a file's contents atomically.
+
+    Writes to a temporary file next to the target and renames it into
+    place, so concurrent readers see either the old or the new contents.
+    Inside a transaction the write is buffered until commit.
+    """
+    pending = _transaction.get()
+    if pending is not None:
+        pending[path] = (None, text)
+        return
+    _replace(path, text)
+
+
+def _replace(path: Path, text: str, sync: bool = False) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "w") as f:
+        written = f.write(text)
+        if sync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp, path)
+    record_write(path, written)
+
+
+def _apply(root: Path, writes) -> None:
+    """Replace each (path, text) durably: the files and their directories are fsynced."""
+    directories = set()
+    for path, text in writes:
+        _replace(path, text, sync=True)
+        directories.add(path.parent)
+    for directory in directories:
+        _fsync_dir(directory)
+
+
+def _fsync_dir(directory: Path) -> None:
+    """Persist renames into a directory (not supported on every platform)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def transaction():
+    """
+    Commit every save made in the block as one crash-consistent unit.
+
+    Nothing is written if the block raises. Nested transactions join the
+    outermost one.
+    """
+    if _transaction.get() is not None:
+        yield
+        return
+
+    recover_journal()
+    pending: dict[Path, tuple] = {}
+    token = _transaction.set(pending)
+    derived_token = _derived.set({})
+    try:
+        yield
+    finally:
+        _derived.reset(derived_token)
+        _transaction.reset(token)
+    if pending:
+        _commit(pending)
+
+
+def in_transaction() -> bool:
+    """True while the current call is inside transaction()."""
+    return _transaction.get() is not None
+
+
+def transaction_cache():
+    """
+    Cache for indexes and memoized results built inside the running transaction, or None outside one.
+
+    Entries are {key: (dataset names, value)}. Saving one of an entry's
+    datasets in the transaction drops the entry, so later lookups see the
+    save; the cache ends with the transaction, so uncommitted data never
+    reaches the tenant's caches.
+    """
+    return _derived.get()
+
+
+def _commit(pending: dict) -> None:
+    root = data_dir()
+    journal_dir = root / JOURNAL_DIR
+    journal_dir.mkdir(parents=True, exist_ok=True)
+    journal = journal_dir / f"{os.getpid()}-{threading.get_ident()}-{next(_journal_ids)}.json"
+    record = {
+        "writes": [
+            {"path": str(path.relative_to(root)), "text": text}
+            for path, (_, text) in pending.items()
+        ]
+    }
+    # Recovery passes in other threads leave the journal alone until it's done
+    with _recovered_lock:
+        _in_flight.add(str(journal))
+    try:
+        with open(journal, "w") as f:
+            json.dump(record, f)
+            f.flush()
+            os.fsync(f.fileno())
+        _apply(root, ((path, text) for path, (_, text) in pending.items()))
+    except BaseException:
+        # Leave the journal for the next recovery pass to finish
+        with _recovered_lock:
+            _in_flight.discard(str(journal))
+            tenant_state().recovered = False
+        raise
+    journal.unlink()
+    with _recovered_lock:
+        _in_flight.discard(str(journal))
+
+    for name, _ in pending.values():
+        if name is not None:
+            bump_generation(name)
+
+
+def recover_journal() -> None:
+    """
+    Finish or discard transactions interrupted by a crash, once per data root.
+
+    Complete journals are replayed (applying a write twice is harmless);
+    truncated ones were never applied and are deleted.
+    """
+    root = data_dir()
+    state = tenant_state()
+    if state.recovered:
+        return
+    with _recovered_lock:
+        if state.recovered:
+            return
+        journal_dir = root / JOURNAL_DIR
+        for journal in sorted(journal_dir.glob("*.json")) if journal_dir.is_dir() else []:
+            if _still_committing(journal):
+                continue
+            try:
+                record = json.loads(journal.read_text())
+            except ValueError:
+                logger.warning("Discarding incomplete journal %s", journal)
+            else:
+                _apply(root, ((root / write["path"], write["text"]) for write in record["writes"]))
+                logger.warning("Replayed interrupted transaction %s", journal)
+            journal.unlink()
+        state.recovered = True
+
+
+def _still_committing(journal: Path) -> bool:
+    """True if the journal belongs to a commit in progress, in this process or another running one."""
+    pid = int(journal.name.split("-", 1)[0])
+    if pid == os.getpid():
+        return str(journal) in _in_flight
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
 
 
 def load_prompt(name: str) -> str:
@@ -0,0 +1,143 @@
+"""
+Resource subscriptions and change notifications.
+
+Clients can subscribe to a resource instead of polling it. When a write
+bumps the generation of a dataset a subscribed resource is derived from,
+each subscriber gets a notifications/resources/updated message whose _meta
+carries the resource's new version tag. Clients re-fetch only then.
+"""
+
+import asyncio
+import logging
+import re
+import threading
+
+from mcp import types
+
+from .storage import add_change_listener, get_generation
+from .tenancy import request_tenant, tenant_state, use_tenant
+
+logger = logging.getLogger(__name__)
+
+# URI (or URI template) -> (compiled pattern, dataset names it is derived from)
+_resources: dict[str, tuple[re.Pattern, tuple[str, ...]]] = {}
+
+# (tenant, uri) -> {session: event loop the session lives on}
+_subscribers: dict[tuple, dict] = {}
+
+# Notifications scheduled but not yet sent, so bursts of writes coalesce
+_pending: set[tuple] = set()
+
+_lock = threading.Lock()
+
+
+def track_resource(uri: str, datasets: tuple[str, ...]) -> None:
+    """Record which datasets a resource (or resource template) is derived from."""
+    if not datasets:
+        return
+    pattern = re.compile("^" + re.sub(r"\\{\w+\\}", "[^/]+", re.escape(uri)) + "$")
+    _resources[uri] = (pattern, tuple(datasets))
+
+
+def _datasets_for(uri: str) -> tuple[str, ...]:
+    for pattern, datasets in _resources.values():
+        if pattern.match(uri):
+            return datasets
+    return ()
+
+
+def resource_version(uri: str) -> str:
+    """
+    Version tag of a resource for the current tenant.
+
+    Changes whenever one of its datasets is saved, and never repeats across
+    restarts or tenant evictions because it includes the state's epoch.
+    """
+    generations = ".".join(str(get_generation(name)) for name in _datasets_for(uri))
+    return f"{tenant_state().epoch}.{generations}"
+
+
+def _on_dataset_change(tenant, name: str) -> None:
+    with _lock:
+        targets = [
+            (session, loop, uri)
+            for (sub_tenant, uri), sessions in _subscribers.items()
+            if sub_tenant == tenant and name in _datasets_for(uri)
+            for session, loop in sessions.items()
+        ]
+        scheduled = []
+        for session, loop, uri in targets:
+            key = (session, uri, tenant)
+            if key not in _pending:
+                _pending.add(key)
+                scheduled.append((loop, key))
+
+    for loop, key in scheduled:
+        try:
+            loop.call_soon_threadsafe(lambda k=key: asyncio.ensure_future(_notify(*k)))
+        except RuntimeError:
+            # The session's loop has closed
+            with _lock:
+                _pending.discard(key)
+
+
+async def _notify(session, uri: str, tenant) -> None:
+    with _lock:
+        _pending.discard((session, uri, tenant))
+    with use_tenant(tenant):
+        version = resource_version(uri)
+    params = types.ResourceUpdatedNotificationParams(uri=uri, _meta={"version": version})
+    try:
+        await session.send_notification(
+            types.ServerNotification(types.ResourceUpdatedNotification(params=params))
+        )
+    except Exception:
+        logger.debug("Dropping subscriber for %s after failed notification", uri, exc_info=True)
+        with _lock:
+            _subscribers.get((tenant, uri), {}).pop(session, None)
+
+
+def subscriber_count() -> int:
+    """Active (session, resource) subscriptions across all tenants."""
+    with _lock:
+        return sum(len(sessions) for sessions in _subscribers.values())
+
+
+def enable_subscriptions(mcp) -> None:
+    """Register subscribe/unsubscribe handlers and advertise the capability."""
+    lowlevel = mcp._mcp_server
+
+    @lowlevel.subscribe_resource()
+    async def subscribe(uri) -> None:
+        uri = str(uri)
+        with use_tenant(request_tenant(mcp)):
+            tenant = tenant_state().tenant
+        session = mcp.get_context().session
+        with _lock:
+            _subscribers.setdefault((tenant, uri), {})[session] = asyncio.get_running_loop()
+
+    @lowlevel.unsubscribe_resource()
+    async def unsubscribe(uri) -> None:
+        uri = str(uri)
+        with use_tenant(request_tenant(mcp)):
+            tenant = tenant_state().tenant
+        session = mcp.get_context().session
+        with _lock:
+            sessions = _subscribers.get((tenant, uri), {})
+            sessions.pop(session, None)
+            if not sessions:
+                _subscribers.pop((tenant, uri), None)
+
+    # The low-level server always reports subscribe=False; report what we support
+    get_capabilities = lowlevel.get_capabilities
+
+    def get_capabilities_with_subscribe(*args, **kwargs):
+        capabilities = get_capabilities(*args, **kwargs)
+        if capabilities.resources is not None:
+            capabilities.resources.subscribe = True
+        return capabilities
+
+    lowlevel.get_capabilities = get_capabilities_with_subscribe
+
+
+add_change_listener(_on_dataset_change)
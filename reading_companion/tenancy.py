@@ -0,0 +1,147 @@
+"""
+Tenant-scoped state.
+
+Every request runs as one tenant (reader). Paths come from config.data_dir(),
+which reads the current tenant, and each tenant's write generations,
+memoized results, indexes and dataset locks live in a TenantState. A
+bounded LRU keeps the states of hot tenants in memory and drops cold ones;
+a dropped tenant simply starts with empty caches on its next request. A
+state is never dropped while a request holds its locks (see pinned_state).
+
+Clients pick their tenant with "tenant" in the request _meta, honoured on
+stdio and the daemon socket, where the client is the local user. Over HTTP
+any client could name any tenant that way, so HTTP requests use the
+X-Reading-Companion-Tenant header instead, and only when
+HTTP_TENANT_HEADER is on, behind a proxy that authenticates the reader and
+sets the header.
+"""
+
+import re
+import secrets
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from .config import HTTP_TENANT_HEADER, MAX_LOADED_TENANTS, current_tenant
+
+TENANT_ID = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,63}$")
+
+# Request header and _meta key a client can use to pick its tenant
+TENANT_HEADER = "x-reading-companion-tenant"
+TENANT_META_KEY = "tenant"
+
+
+class TenantState:
+    """In-memory caches for one tenant."""
+
+    __slots__ = ("tenant", "epoch", "generations", "memo", "indexes", "locks", "recovered", "pins")
+
+    def __init__(self, tenant):
+        self.tenant = tenant
+        # Distinguishes this state from earlier ones whose generations restarted at 0
+        self.epoch = secrets.token_hex(4)
+        # Write generation per dataset name
+        self.generations: dict[str, int] = {}
+        # Memoized results per function name: {args_key: (generations, result)}
+        self.memo: dict[str, dict] = {}
+        # Derived indexes, keyed by whoever builds them
+        self.indexes: dict = {}
+        # One lock per dataset (see storage.dataset_lock)
+        self.locks: dict[str, threading.Lock] = {}
+        # Whether leftover journals have been recovered (see storage.recover_journal)
+        self.recovered = False
+        # Requests holding this state's locks; a pinned state isn't evicted
+        self.pins = 0
+
+
+_states: OrderedDict = OrderedDict()
+_lock = threading.Lock()
+_evictions = 0
+
+
+def validate_tenant(tenant: str) -> str:
+    """Return tenant unchanged if it is a safe directory name, else raise ValueError."""
+    if not TENANT_ID.match(tenant):
+        raise ValueError(
+            f"Invalid tenant '{tenant}': use 1-64 letters, digits, '.', '_' or '-'"
+        )
+    return tenant
+
+
+def _load(tenant) -> TenantState:
+    # Caller holds _lock
+    global _evictions
+    state = _states.get(tenant)
+    if state is not None:
+        _states.move_to_end(tenant)
+        return state
+    state = _states[tenant] = TenantState(tenant)
+    if len(_states) > MAX_LOADED_TENANTS:
+        # Coldest first; pinned states stay, so the LRU can briefly run over
+        for cold in [t for t, s in _states.items() if not s.pins][:len(_states) - MAX_LOADED_TENANTS]:
+            del _states[cold]
+            _evictions += 1
+    return state
+
+
+def tenant_state() -> TenantState:
+    """State for the current tenant, loading it (and evicting the coldest) if needed."""
+    with _lock:
+        return _load(current_tenant.get())
+
+
+@contextmanager
+def pinned_state():
+    """The current tenant's state, kept loaded until the block exits (for locks held across it)."""
+    with _lock:
+        state = _load(current_tenant.get())
+        state.pins += 1
+    try:
+        yield state
+    finally:
+        with _lock:
+            state.pins -= 1
+
+
+def tenant_stats() -> dict:
+    """How many tenants are loaded and how many have been evicted."""
+    with _lock:
+        return {
+            "loaded": len(_states),
+            "max_loaded": MAX_LOADED_TENANTS,
+            "evictions": _evictions,
+        }
+
+
+@contextmanager
+def use_tenant(tenant):
+    """Run a block as the given tenant (None for the default data root)."""
+    token = current_tenant.set(validate_tenant(tenant) if tenant is not None else None)
+    try:
+        yield
+    finally:
+        current_tenant.reset(token)
+
+
+def request_tenant(mcp):
+    """
+    Tenant named by the current MCP request, if any.
+
+    Over stdio and the daemon socket this is the request's _meta
+    ("tenant"). Over HTTP it is the X-Reading-Companion-Tenant header, and
+    only with HTTP_TENANT_HEADER on; _meta is ignored there. Returns the
+    process default tenant otherwise.
+    """
+    try:
+        request_context = mcp.get_context().request_context
+    except (LookupError, ValueError):
+        return current_tenant.get()
+
+    request = getattr(request_context, "request", None)
+    if request is not None and hasattr(request, "headers"):
+        tenant = request.headers.get(TENANT_HEADER) if HTTP_TENANT_HEADER else None
+    else:
+        meta = getattr(request_context, "meta", None)
+        tenant = getattr(meta, TENANT_META_KEY, None) if meta is not None else None
+
+    return tenant if tenant is not None else current_tenant.get()
@@ -2,17 +2,23 @@
 MCP Tools organized by stage.
 """
 
+from ..handlers import HandlerRegistrar
 from .interview import register_interview_tools
 from .context import register_context_tools
 from .syllabus import register_syllabus_tools
 from .reflection import register_reflection_tools
 from .patterns import register_pattern_tools
+from .search import register_search_tools
+from .export import register_export_tools
 
 
 def register_all_tools(mcp):
-    """Register all tools with the MCP server."""
+    """Register all tools with the MCP server as async, offloaded handlers."""
+    mcp = HandlerRegistrar(mcp)
     register_interview_tools(mcp)
     register_context_tools(mcp)
     register_syllabus_tools(mcp)
     register_reflection_tools(mcp)
     register_pattern_tools(mcp)
+    register_search_tools(mcp)
+    register_export_tools(mcp)
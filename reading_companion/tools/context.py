@@ -8,12 +8,13 @@ from datetime import datetime
 
 from ..storage import load_json, save_json, load_prompt
 from ..markdown import save_profile_markdown
+from ..handlers import READ_ONLY
 
 
 def register_context_tools(mcp):
     """Register context builder tools with the MCP server."""
 
-    @mcp.tool()
+    @mcp.tool(annotations=READ_ONLY)
     def extract_context() -> dict:
         """
         Analyze the profile to extract latent features.
@@ -33,7 +34,7 @@ def register_context_tools(mcp):
             "profile": profile
         }
 
-    @mcp.tool()
+    @mcp.tool(writes=("profile",))
     def update_latent_features(features: dict) -> dict:
         """
         Update the profile with extracted latent features.
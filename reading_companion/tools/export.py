@@ -0,0 +1,29 @@
+"""
+Export Tools
+
+Tools for pulling the library out for analysis in other software.
+"""
+
+from ..export import FORMATS, export_library as run_export
+
+
+def register_export_tools(mcp):
+    """Register export tools with the MCP server."""
+
+    @mcp.tool(writes=("exports",))
+    def export_library(format: str = "csv", datasets: list[str] = None, full: bool = False) -> dict:
+        """
+        Export your reading log, authors, stacks and connections to files.
+
+        Files are written to the exports/ folder of your data directory, one
+        per dataset. Repeat exports only add what changed since the last one.
+
+        Args:
+            format: "csv", "jsonl" or "parquet" (parquet needs pyarrow installed)
+            datasets: Any of "reading_log", "authors", "bookstacks", "connections" (default: all)
+            full: Rewrite the files from scratch instead of exporting only changes
+        """
+        try:
+            return run_export(format, datasets=datasets, full=full)
+        except ValueError as e:
+            return {"error": str(e), "formats": list(FORMATS)}
@@ -6,15 +6,16 @@ Tools for conducting the reading goal interview and saving the user profile.
 
 from datetime import datetime
 
-from ..config import DATA_DIR
+from ..config import data_dir
 from ..storage import load_json, save_json, load_prompt
-from ..markdown import save_profile_markdown
+from ..markdown import save_profile_markdown, update_progress_markdown
+from ..handlers import READ_ONLY
 
 
 def register_interview_tools(mcp):
     """Register interview-related tools with the MCP server."""
 
-    @mcp.tool()
+    @mcp.tool(annotations=READ_ONLY)
     def start_interview() -> str:
         """
         Begin the reading goal interview.
@@ -24,7 +25,7 @@ def register_interview_tools(mcp):
         """
         return load_prompt("interviewer")
 
-    @mcp.tool()
+    @mcp.tool(writes=("profile",))
     def save_profile(
         name: str,
         domains: list[dict],
@@ -68,6 +69,7 @@ def register_interview_tools(mcp):
 
         save_json("profile", profile)
         save_profile_markdown(profile)
+        update_progress_markdown()
 
         domain_names = [d.get("name", d.get("id")) for d in domains]
 
@@ -76,13 +78,13 @@ def register_interview_tools(mcp):
             "message": f"Profile created for {name}",
             "domains": domain_names,
             "files_created": [
-                str(DATA_DIR / "profile.json"),
-                str(DATA_DIR / "profile.md")
+                str(data_dir() / "profile.json"),
+                str(data_dir() / "profile.md")
             ],
             "next_step": "Run extract_context to analyze deeper patterns, then build_bookstack for recommendations"
         }
 
-    @mcp.tool()
+    @mcp.tool(annotations=READ_ONLY)
     def get_profile() -> dict:
         """Retrieve the current user profile."""
         profile = load_json("profile")
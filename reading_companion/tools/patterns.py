@@ -4,17 +4,68 @@ Author & Pattern Analysis Tools
 Tools for analyzing reading patterns, managing author profiles, and book connections.
 """
 
+import os
 from datetime import datetime
 
-from ..config import PROGRESS_DIR, AUTHORS_DIR
-from ..storage import load_json, save_json, slugify
+from ..config import progress_dir, authors_dir
+from ..storage import load_json, save_json, slugify, write_text
+from ..cache import memoize
 from ..markdown import save_author_markdown, update_authors_index, save_patterns_markdown
+from ..aliases import add_alias, find_duplicate_groups, merge_author_records, resolve_author
+from ..handlers import READ_ONLY
+from ..search import author_document, update_search_index
+from ..similarity import similar_books, strength_for
+from ..facets import merge_author_bits
+from ..catalog import book_ref, connections_by_book, register_book, save_catalog, stacked_refs
+from ..slugs import page_path
+from ..progress import track
+from ..records import Connection
+from ..archive import archived_totals
+
+
+def connect_books(connections: dict, catalog: dict, from_book: str, to_book: str, relationship: str,
+                  reason: str, strength: str = "moderate"):
+    """
+    Add or update a connection in loaded connections and catalog data (the caller saves both).
+
+    Returns ("added" | "updated", connection).
+    """
+    connections.setdefault("version", "1.0")
+    connections.setdefault("connections", [])
+    connections.setdefault("clusters", [])
+    from_id = register_book(catalog, from_book)
+    to_id = register_book(catalog, to_book)
+
+    for conn in connections["connections"]:
+        same_ends = (conn.get("from_id"), conn.get("to_id")) == (from_id, to_id) or (
+            not conn.get("from_id") and (conn.get("from"), conn.get("to")) == (from_book, to_book)
+        )
+        if same_ends:
+            conn["from_id"], conn["to_id"] = from_id, to_id
+            conn["relationship"] = relationship
+            conn["reason"] = reason
+            conn["strength"] = strength
+            conn["updated_at"] = datetime.now().isoformat()
+            return "updated", conn
+
+    new_connection = {
+        "from": from_book,
+        "to": to_book,
+        "from_id": from_id,
+        "to_id": to_id,
+        "relationship": relationship,
+        "reason": reason,
+        "strength": strength,
+        "created_at": datetime.now().isoformat()
+    }
+    connections["connections"].append(new_connection)
+    return "added", new_connection
 
 
 def register_pattern_tools(mcp):
     """Register pattern analysis tools with the MCP server."""
 
-    @mcp.tool()
+    @mcp.tool(writes=("patterns",))
     def analyze_reading_patterns() -> dict:
         """
         Analyze your reading history to identify patterns.
@@ -27,36 +78,44 @@ def register_pattern_tools(mcp):
 
         Results are saved and used for smarter recommendations.
         """
-        log = load_json("reading_log", PROGRESS_DIR)
+        log = load_json("reading_log", progress_dir())
         authors_data = load_json("authors")
         profile = load_json("profile")
 
         entries = log.get("entries", [])
+        archived = archived_totals()
+        total_books = archived["books"] + len(entries)
 
-        if len(entries) < 2:
+        if total_books < 2:
             return {
                 "message": "Need at least 2 books logged to analyze patterns.",
-                "books_logged": len(entries),
+                "books_logged": total_books,
                 "suggestion": "Log more books with log_book to enable pattern analysis"
             }
 
-        # Analyze ratings by domain
-        domain_ratings = {}
-        for entry in entries:
+        # Analyze ratings by domain as [rated books, rating sum], starting
+        # from the archived years' summaries
+        domain_ratings = {
+            domain: [bucket["rated"], bucket["rating_sum"]]
+            for domain, bucket in archived["domains"].items()
+            if bucket["rated"]
+        }
+        for entry in track(entries, label="books"):
             domain = entry.get("domain", "other")
             rating = entry.get("rating")
             if rating:
                 if domain not in domain_ratings:
-                    domain_ratings[domain] = []
-                domain_ratings[domain].append(rating)
+                    domain_ratings[domain] = [0, 0]
+                domain_ratings[domain][0] += 1
+                domain_ratings[domain][1] += rating
 
         # Calculate average ratings per domain
         themes_loved = []
-        for domain, ratings in domain_ratings.items():
-            avg = round(sum(ratings) / len(ratings), 1)
+        for domain, (rated, rating_sum) in domain_ratings.items():
+            avg = round(rating_sum / rated, 1)
             themes_loved.append({
                 "theme": domain.replace("_", " ").title(),
-                "frequency": len(ratings),
+                "frequency": rated,
                 "avg_rating": avg
             })
 
@@ -88,8 +147,8 @@ def register_pattern_tools(mcp):
                     "success_rate_by_difficulty": {}
                 },
                 "pacing_insights": {
-                    "total_books": len(entries),
-                    "books_with_reflections": len([e for e in entries if e.get("reflection")])
+                    "total_books": total_books,
+                    "books_with_reflections": archived["reflected"] + len([e for e in entries if e.get("reflection")])
                 },
                 "author_preferences": {
                     "repeat_authors": repeat_authors,
@@ -104,13 +163,13 @@ def register_pattern_tools(mcp):
 
         return {
             "status": "analyzed",
-            "message": f"Analyzed {len(entries)} books across {len(domain_ratings)} domains",
+            "message": f"Analyzed {total_books} books across {len(domain_ratings)} domains",
             "patterns": patterns["patterns"],
-            "file": str(PROGRESS_DIR / "_insights.md"),
+            "file": str(progress_dir() / "_insights.md"),
             "suggestion": "These patterns will now inform your book recommendations"
         }
 
-    @mcp.tool()
+    @mcp.tool(annotations=READ_ONLY)
     def get_author_profile(author: str) -> dict:
         """
         Get or create a profile for an author.
@@ -121,7 +180,7 @@ def register_pattern_tools(mcp):
         Returns author data including books read, ratings, and notes.
         """
         authors_data = load_json("authors")
-        author_slug = slugify(author)
+        author_slug = resolve_author(author) or slugify(author)
 
         if "authors" not in authors_data:
             authors_data = {"version": "1.0", "authors": {}}
@@ -131,7 +190,7 @@ def register_pattern_tools(mcp):
             return {
                 "found": True,
                 "author": author_entry,
-                "file": str(AUTHORS_DIR / f"{author_slug}.md")
+                "file": str(page_path("authors", author_slug))
             }
         else:
             return {
@@ -140,7 +199,7 @@ def register_pattern_tools(mcp):
                 "suggestion": f"Log a book by {author} with log_book to create their profile"
             }
 
-    @mcp.tool()
+    @mcp.tool(writes=("authors", "slugs", "search_index", "search_delta"))
     def update_author_notes(
         author: str,
         style_notes: dict = None,
@@ -159,7 +218,7 @@ def register_pattern_tools(mcp):
             your_notes: Your personal notes about this author
         """
         authors_data = load_json("authors")
-        author_slug = slugify(author)
+        author_slug = resolve_author(author) or slugify(author)
 
         if "authors" not in authors_data or author_slug not in authors_data.get("authors", {}):
             return {
@@ -182,6 +241,7 @@ def register_pattern_tools(mcp):
             author_entry["your_notes"] = your_notes
 
         save_json("authors", authors_data)
+        update_search_index([author_document(author_slug, author_entry)])
         save_author_markdown(author_slug, author_entry)
 
         return {
@@ -189,10 +249,103 @@ def register_pattern_tools(mcp):
             "author": author,
             "style_notes": author_entry.get("style_notes"),
             "your_notes": author_entry.get("your_notes"),
-            "file": str(AUTHORS_DIR / f"{author_slug}.md")
+            "file": str(page_path("authors", author_slug))
+        }
+
+    @mcp.tool(writes=("authors", "aliases", "facets", "slugs", "search_index", "search_delta"))
+    def merge_authors(into: str = None, duplicates: list[str] = None) -> dict:
+        """
+        Combine duplicate author records (e.g., "Leo Tolstoy" and "Tolstoy, L. N.").
+
+        With no arguments, finds every group of records that look like the
+        same person (same surname, compatible given names or initials) and
+        merges each group into its record with the most books.
+
+        Args:
+            into: Author to keep (optional)
+            duplicates: Authors to fold into it (required with into)
+        """
+        authors_data = load_json("authors")
+        all_authors = authors_data.get("authors", {})
+
+        if into:
+            target = resolve_author(into)
+            if target not in all_authors:
+                return {"error": f"Author '{into}' not found"}
+            group = [target]
+            for name in duplicates or []:
+                slug = resolve_author(name)
+                if slug not in all_authors:
+                    return {"error": f"Author '{name}' not found"}
+                if slug not in group:
+                    group.append(slug)
+            groups = [group] if len(group) > 1 else []
+        else:
+            groups = [
+                sorted(group, key=lambda slug: -all_authors[slug].get("total_books", 0))
+                for group in find_duplicate_groups(all_authors)
+            ]
+
+        if not groups:
+            return {"status": "unchanged", "message": "No duplicate authors to merge"}
+
+        merged = []
+        merged_into = {}
+        merged_names = []
+        for target, *rest in groups:
+            target_entry = all_authors[target]
+            target_page = page_path("authors", target)
+            names = []
+            for slug in rest:
+                duplicate = all_authors.pop(slug)
+                merge_author_records(target_entry, duplicate)
+                merged_into[slug] = target
+                names.append(duplicate.get("name", slug))
+                merged_names.append((names[-1], target))
+                # Leave a pointer behind so existing links still lead somewhere
+                page = page_path("authors", slug)
+                write_text(page, (
+                    f"# {names[-1]}\n\n"
+                    f"Merged into [{target_entry['name']}]({os.path.relpath(target_page, page.parent)}).\n"
+                ))
+            save_author_markdown(target, target_entry)
+            merged.append({
+                "author": target_entry["name"],
+                "merged": names,
+                "total_books": target_entry["total_books"]
+            })
+
+        # Names that led to a merged record now lead to the one it joined
+        aliases_data = load_json("aliases")
+        for name, slug in aliases_data.get("aliases", {}).items():
+            if slug in merged_into:
+                aliases_data["aliases"][name] = merged_into[slug]
+        for name, target in merged_names:
+            add_alias(aliases_data, name, target)
+
+        save_json("aliases", aliases_data)
+        save_json("authors", authors_data)
+
+        facets = load_json("facets", progress_dir())
+        if facets:
+            for slug, target in merged_into.items():
+                merge_author_bits(facets, target, slug)
+            save_json("facets", facets, progress_dir(), indent=None)
+
+        update_search_index(
+            [author_document(target, all_authors[target]) for target, *_ in groups],
+            remove=[f"author:{slug}" for slug in merged_into]
+        )
+        update_authors_index()
+
+        return {
+            "status": "merged",
+            "merged": merged,
+            "total_authors": len(all_authors)
         }
 
-    @mcp.tool()
+    @mcp.tool(annotations=READ_ONLY)
+    @memoize("authors")
     def get_favorite_authors(limit: int = 10) -> dict:
         """
         Get your favorite authors ranked by affinity.
@@ -233,10 +386,10 @@ def register_pattern_tools(mcp):
         return {
             "total_authors": len(all_authors),
             "top_authors": result,
-            "file": str(AUTHORS_DIR / "_index.md")
+            "file": str(authors_dir() / "_index.md")
         }
 
-    @mcp.tool()
+    @mcp.tool(writes=("connections", "catalog"))
     def add_book_connection(
         from_book: str,
         to_book: str,
@@ -258,43 +411,83 @@ def register_pattern_tools(mcp):
             reason: Why these books are connected
             strength: "strong" | "moderate" | "weak"
         """
-        connections = load_json("connections")
-
-        if "connections" not in connections:
-            connections = {"version": "1.0", "connections": [], "clusters": []}
-
-        for conn in connections["connections"]:
-            if conn.get("from") == from_book and conn.get("to") == to_book:
-                conn["relationship"] = relationship
-                conn["reason"] = reason
-                conn["strength"] = strength
-                conn["updated_at"] = datetime.now().isoformat()
-                save_json("connections", connections)
-                return {
-                    "status": "updated",
-                    "message": f"Updated connection: {from_book} → {to_book}"
-                }
-
-        new_connection = {
-            "from": from_book,
-            "to": to_book,
-            "relationship": relationship,
-            "reason": reason,
-            "strength": strength,
-            "created_at": datetime.now().isoformat()
-        }
+        try:
+            Connection.from_dict({
+                "from": from_book, "to": to_book, "relationship": relationship,
+                "reason": reason, "strength": strength,
+            })
+        except ValueError as e:
+            return {"error": str(e)}
 
-        connections["connections"].append(new_connection)
+        connections = load_json("connections")
+        catalog = load_json("catalog")
+        status, connection = connect_books(connections, catalog, from_book, to_book, relationship, reason, strength)
+        save_catalog(catalog)
         save_json("connections", connections)
 
+        if status == "updated":
+            return {
+                "status": "updated",
+                "message": f"Updated connection: {from_book} → {to_book}"
+            }
         return {
             "status": "added",
             "message": f"Connected: {from_book} → {to_book} ({relationship})",
-            "connection": new_connection,
+            "connection": connection,
             "total_connections": len(connections["connections"])
         }
 
-    @mcp.tool()
+    @mcp.tool(writes=("connections", "catalog"))
+    def suggest_connections(title: str, limit: int = 5, min_score: float = 0.1, apply: bool = False) -> dict:
+        """
+        Suggest connections to books with similar reflections, stack notes and author style.
+
+        Similarity is TF-IDF cosine similarity over your own notes, computed
+        locally. Books already connected to this one are skipped.
+
+        Args:
+            title: Title of a book you've read or have in a stack
+            limit: Maximum suggestions
+            min_score: Minimum similarity (0-1)
+            apply: Save the suggestions as "similar_theme" connections
+        """
+        connections = load_json("connections")
+        connected = {ref for *_, ref in connections_by_book().get(book_ref(title), [])}
+        suggestions = [
+            {
+                "from_book": title,
+                "to_book": match["title"],
+                "relationship": "similar_theme",
+                "reason": f"Shared themes: {', '.join(match['shared_terms'])}",
+                "strength": strength_for(match["score"]),
+                "score": match["score"],
+            }
+            for match in similar_books(title, limit, min_score, exclude=connected)
+        ]
+
+        if not suggestions:
+            return {
+                "book": title,
+                "message": f"No similar books found for '{title}'",
+                "suggestion": "Reflections and stack notes give the similarity engine more to work with"
+            }
+
+        if apply:
+            catalog = load_json("catalog")
+            for edge in suggestions:
+                connect_books(connections, catalog, edge["from_book"], edge["to_book"], edge["relationship"],
+                              edge["reason"], edge["strength"])
+            save_catalog(catalog)
+            save_json("connections", connections)
+
+        return {
+            "book": title,
+            "suggestions": suggestions,
+            "applied": apply,
+            "total_connections": len(connections.get("connections", []))
+        }
+
+    @mcp.tool(annotations=READ_ONLY)
     def get_similar_books(title: str) -> dict:
         """
         Find books connected to one you've read.
@@ -302,50 +495,43 @@ def register_pattern_tools(mcp):
         Args:
             title: Title of a book you've read
 
-        Returns books that are connected to this one.
+        Returns books that are connected to this one, plus unconnected books
+        with similar reflections and notes.
         """
         connections = load_json("connections")
-        stacks = load_json("bookstacks")
 
         if not connections.get("connections"):
             return {
                 "message": "No book connections recorded yet",
-                "suggestion": "Use add_book_connection to link related books"
+                "suggestion": "Use add_book_connection to link related books",
+                "similar_by_content": similar_books(title, min_score=0.1)
             }
 
         related = []
-        for conn in connections.get("connections", []):
-            if conn.get("from", "").lower() == title.lower():
-                related.append({
-                    "book": conn.get("to"),
-                    "relationship": conn.get("relationship"),
-                    "reason": conn.get("reason"),
-                    "direction": "leads_to"
-                })
-            elif conn.get("to", "").lower() == title.lower():
-                related.append({
-                    "book": conn.get("from"),
-                    "relationship": conn.get("relationship"),
-                    "reason": conn.get("reason"),
-                    "direction": "leads_from"
-                })
-
-        all_stack_books = []
-        for _, stack in stacks.get("stacks", {}).items():
-            for book in stack.get("books", []):
-                all_stack_books.append(book.get("title", "").lower())
-
-        for item in related:
-            item["in_stack"] = item["book"].lower() in all_stack_books
+        related_refs = set()
+        in_stack = stacked_refs()
+        for conn, direction, other, ref in connections_by_book().get(book_ref(title), []):
+            related.append({
+                "book": other,
+                "relationship": conn.get("relationship"),
+                "reason": conn.get("reason"),
+                "direction": direction,
+                "in_stack": ref in in_stack
+            })
+            related_refs.add(ref)
+
+        similar = similar_books(title, min_score=0.1, exclude=related_refs)
 
         if not related:
             return {
                 "message": f"No connections found for '{title}'",
-                "suggestion": "Use add_book_connection to link this to related books"
+                "suggestion": "Use suggest_connections or add_book_connection to link this to related books",
+                "similar_by_content": similar
             }
 
         return {
             "book": title,
             "connected_books": related,
-            "total": len(related)
+            "total": len(related),
+            "similar_by_content": similar
         }
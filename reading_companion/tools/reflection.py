@@ -6,17 +6,37 @@ Tools for logging books, conducting reflections, and tracking progress.
 
 from datetime import datetime
 
-from ..config import PROGRESS_DIR, REFLECTIONS_DIR
+from ..config import progress_dir
 from ..storage import load_json, save_json, load_prompt, slugify
+from ..cache import memoize
 from ..markdown import (
     save_reflection_markdown,
     update_progress_markdown,
     save_author_markdown,
     update_authors_index,
 )
+from ..aliases import add_alias, author_lookup, name_key, refresh_author_stats, resolve_author
+from ..handlers import READ_ONLY
+from ..rollups import PERIODS, add_entry, log_rollups, reading_trends
+from ..facets import FACETS, build_facets, current_facets, mark_reflected, query_facets
+from ..facets import add_entry as add_facet_bits
+from ..search import author_document, book_document, update_search_index
+from ..slugs import page_path
+from ..catalog import book_matcher, register_book, save_catalog
+from ..records import ReadingEntry
+from ..archive import (
+    archive_log,
+    archived_count,
+    archived_entries,
+    archived_totals,
+    find_archived,
+    full_log,
+    update_archived_entry,
+)
 
 
-def update_author_on_book_log(author: str, title: str, rating: int = None, finished_date: str = None):
+def update_author_on_book_log(author: str, title: str, rating: int = None, finished_date: str = None,
+                              book_id: str = None):
     """
     Update author tracking when a book is logged.
     Creates author profile if it doesn't exist.
@@ -26,12 +46,13 @@ def update_author_on_book_log(author: str, title: str, rating: int = None, finis
     if "authors" not in authors_data:
         authors_data = {"version": "1.0", "authors": {}}
 
-    author_slug = slugify(author)
+    author_slug = resolve_author(author) or slugify(author)
 
     if author_slug not in authors_data["authors"]:
         authors_data["authors"][author_slug] = {
             "name": author,
             "books_read": [],
+            "book_ids": [],
             "total_books": 0,
             "ratings": [],
             "average_rating": None,
@@ -44,24 +65,17 @@ def update_author_on_book_log(author: str, title: str, rating: int = None, finis
 
     author_entry = authors_data["authors"][author_slug]
 
-    # Add book if not already tracked
-    if title not in author_entry["books_read"]:
+    # Add book if not already tracked, under this or another spelling of the title
+    book_ids = author_entry.setdefault("book_ids", [])
+    if title not in author_entry["books_read"] and book_id not in book_ids:
         author_entry["books_read"].append(title)
-        author_entry["total_books"] = len(author_entry["books_read"])
+    if book_id and book_id not in book_ids:
+        book_ids.append(book_id)
 
     # Update rating
     if rating:
         author_entry["ratings"].append(rating)
-        author_entry["average_rating"] = round(
-            sum(author_entry["ratings"]) / len(author_entry["ratings"]), 1
-        )
-        avg = author_entry["average_rating"]
-        if avg >= 4.5:
-            author_entry["affinity"] = "high"
-        elif avg >= 3.5:
-            author_entry["affinity"] = "medium"
-        else:
-            author_entry["affinity"] = "low"
+    refresh_author_stats(author_entry)
 
     # Update dates
     if finished_date:
@@ -69,15 +83,38 @@ def update_author_on_book_log(author: str, title: str, rating: int = None, finis
         if not author_entry["first_read"]:
             author_entry["first_read"] = finished_date
 
+    if author_lookup()["names"].get(name_key(author)) != author_slug:
+        aliases_data = load_json("aliases")
+        add_alias(aliases_data, author, author_slug)
+        save_json("aliases", aliases_data)
+
     save_json("authors", authors_data)
     save_author_markdown(author_slug, author_entry)
     update_authors_index()
+    return author_slug, author_entry
+
+
+def new_entry_id(entries: list[dict]) -> str:
+    """
+    ID for a new log entry: log_<date>_<time>, with a suffix if a book was already logged that second.
+
+    Archived entries are years old, so only the hot log can hold a clash.
+    """
+    base = f"log_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    taken = {entry.get("id") for entry in entries}
+    entry_id, n = base, 2
+    while entry_id in taken:
+        entry_id, n = f"{base}_{n}", n + 1
+    return entry_id
 
 
 def register_reflection_tools(mcp):
     """Register reflection tools with the MCP server."""
 
-    @mcp.tool()
+    @mcp.tool(writes=(
+        "reading_log", "rollups", "facets", "authors", "aliases", "slugs", "catalog",
+        "search_index", "search_delta"
+    ))
     def log_book(
         title: str,
         author: str,
@@ -95,54 +132,81 @@ def register_reflection_tools(mcp):
             rating: Optional 1-5 rating
             quick_note: Optional brief note
         """
-        log = load_json("reading_log", PROGRESS_DIR)
+        log = load_json("reading_log", progress_dir())
 
         if "entries" not in log:
             log = {"version": "1.0", "entries": []}
 
-        entry = {
-            "id": f"log_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-            "title": title,
-            "author": author,
-            "domain": domain,
-            "finished_at": datetime.now().isoformat(),
-            "rating": rating,
-            "quick_note": quick_note,
-            "reflection": None
-        }
+        try:
+            record = ReadingEntry.from_dict({
+                "id": new_entry_id(log["entries"]),
+                "title": title,
+                "author": author,
+                "domain": domain,
+                "finished_at": datetime.now().isoformat(),
+                "rating": rating,
+                "quick_note": quick_note,
+                "reflection": None
+            })
+        except ValueError as e:
+            return {"error": str(e)}
+
+        catalog = load_json("catalog")
+        book_id = register_book(catalog, title, author)
+        save_catalog(catalog)
+
+        record.book_id = book_id
+        entry = record.to_dict()
 
         log["entries"].append(entry)
-        save_json("reading_log", log, PROGRESS_DIR)
+        save_json("reading_log", log, progress_dir())
+
+        rollups = load_json("rollups", progress_dir())
+        if rollups:
+            add_entry(rollups, entry)
+        else:
+            rollups = log_rollups(log["entries"])
+        save_json("rollups", rollups, progress_dir())
 
         save_reflection_markdown(entry)
         update_progress_markdown()
 
-        update_author_on_book_log(
+        author_record = update_author_on_book_log(
             author=author,
             title=title,
             rating=rating,
-            finished_date=entry["finished_at"]
+            finished_date=entry["finished_at"],
+            book_id=book_id
         )
+        update_search_index([book_document(entry), author_document(*author_record)])
+
+        facets = current_facets(log["entries"])
+        add_facet_bits(facets, archived_count() + len(log["entries"]) - 1, entry, author_record[0])
+        save_json("facets", facets, progress_dir(), indent=None)
 
         return {
             "status": "logged",
             "message": f"'{title}' by {author} logged!",
-            "file": str(REFLECTIONS_DIR / f"{slugify(title)}.md"),
+            "file": str(page_path("reflections", book_id, name=title)),
             "suggestion": "Want to do a quick reflection or deep dive? Say 'reflect on [title]'"
         }
 
-    @mcp.tool()
+    @mcp.tool(annotations=READ_ONLY)
     def start_reflection(title: str) -> dict:
         """Start a deep reflection session for a book."""
         prompt = load_prompt("reflection")
-        log = load_json("reading_log", PROGRESS_DIR)
+        log = load_json("reading_log", progress_dir())
         profile = load_json("profile")
 
         book_entry = None
+        is_title = book_matcher(title)
         for entry in log.get("entries", []):
-            if entry.get("title", "").lower() == title.lower():
+            if is_title(entry):
                 book_entry = entry
                 break
+        else:
+            archived = find_archived(is_title)
+            book_entry = archived[3] if archived else None
 
         if not book_entry:
             return {
@@ -165,7 +229,7 @@ def register_reflection_tools(mcp):
             "user_context": profile.get("context", {})
         }
 
-    @mcp.tool()
+    @mcp.tool(writes=("reading_log", "log_archive", "facets", "slugs", "search_index", "search_delta"))
     def save_reflection(
         title: str,
         key_takeaway: str,
@@ -185,62 +249,88 @@ def register_reflection_tools(mcp):
             favorite_quotes: Memorable passages
             next_appetite: "more_like_this" | "ready_for_challenge" | "palette_cleanser"
         """
-        log = load_json("reading_log", PROGRESS_DIR)
+        log = load_json("reading_log", progress_dir())
+        entries = log.get("entries", [])
+        archived = archived_count()
+        reflection = {
+            "key_takeaway": key_takeaway,
+            "craft_lessons": craft_lessons or [],
+            "personal_insights": personal_insights or [],
+            "favorite_quotes": favorite_quotes or [],
+            "next_appetite": next_appetite,
+            "reflected_at": datetime.now().isoformat()
+        }
 
         found_entry = None
-        for entry in log.get("entries", []):
-            if entry.get("title", "").lower() == title.lower():
-                entry["reflection"] = {
-                    "key_takeaway": key_takeaway,
-                    "craft_lessons": craft_lessons or [],
-                    "personal_insights": personal_insights or [],
-                    "favorite_quotes": favorite_quotes or [],
-                    "next_appetite": next_appetite,
-                    "reflected_at": datetime.now().isoformat()
-                }
+        is_title = book_matcher(title)
+        for position, entry in enumerate(entries):
+            if is_title(entry):
+                entry["reflection"] = reflection
                 found_entry = entry
+                position += archived
+                save_json("reading_log", log, progress_dir())
                 break
+        else:
+            found = find_archived(is_title)
+            if found:
+                year, i, position, entry = found
+                found_entry = {**entry, "reflection": reflection}
+                update_archived_entry(year, i, found_entry)
 
         if not found_entry:
             return {"error": f"'{title}' not found in reading log"}
 
-        save_json("reading_log", log, PROGRESS_DIR)
+        update_search_index([book_document(found_entry)])
+
+        facets = load_json("facets", progress_dir())
+        if facets.get("size") != archived + len(entries):
+            facets = build_facets(archived_entries() + entries)
+        mark_reflected(facets, position)
+        save_json("facets", facets, progress_dir(), indent=None)
         save_reflection_markdown(found_entry)
         update_progress_markdown()
 
         return {
             "status": "saved",
-            "message": f"Reflection saved for '{title}'",
-            "file": str(REFLECTIONS_DIR / f"{slugify(title)}.md"),
+            "message": f"Reflection saved for '{found_entry['title']}'",
+            "file": str(page_path(
+                "reflections", found_entry.get("book_id") or found_entry["title"], name=found_entry["title"]
+            )),
             "key_takeaway": key_takeaway,
             "next_appetite": next_appetite
         }
 
-    @mcp.tool()
+    @mcp.tool(annotations=READ_ONLY)
     def get_reading_log(limit: int = None) -> dict:
         """Get reading log entries."""
-        log = load_json("reading_log", PROGRESS_DIR)
+        log = load_json("reading_log", progress_dir())
         entries = log.get("entries", [])
+        total = archived_count() + len(entries)
 
-        if not entries:
+        if not total:
             return {"message": "No books logged yet. Use log_book to start tracking."}
 
+        # Only reach into the archive when the request goes past the hot entries
+        if not limit or limit > len(entries):
+            entries = full_log()
         if limit:
             entries = entries[-limit:]
 
         return {
-            "total_books": len(log.get("entries", [])),
+            "total_books": total,
             "entries": entries
         }
 
-    @mcp.tool()
+    @mcp.tool(annotations=READ_ONLY)
+    @memoize("reading_log", "log_archive", "profile")
     def get_progress(period: str = "all") -> dict:
         """Get reading progress summary across all domains."""
-        log = load_json("reading_log", PROGRESS_DIR)
+        log = load_json("reading_log", progress_dir())
         profile = load_json("profile")
 
         entries = log.get("entries", [])
         domains = profile.get("goals", {}).get("domains", [])
+        archived = archived_totals()
 
         if not domains:
             return {"error": "No profile found. Run start_interview first."}
@@ -249,9 +339,10 @@ def register_reflection_tools(mcp):
         for domain in domains:
             domain_id = domain.get("id")
             domain_entries = [e for e in entries if e.get("domain") == domain_id]
+            archived_titles = archived["domains"].get(domain_id, {}).get("titles", [])
 
             target = domain.get("target_books", 0)
-            completed = len(domain_entries)
+            completed = len(archived_titles) + len(domain_entries)
 
             if completed == 0:
                 status = "not_started"
@@ -267,19 +358,117 @@ def register_reflection_tools(mcp):
                 "target": target,
                 "completed": completed,
                 "status": status,
-                "titles": [e.get("title") for e in domain_entries]
+                "titles": archived_titles + [e.get("title") for e in domain_entries]
             }
 
         total_target = sum(d.get("target_books", 0) for d in domains)
-        total_completed = len(entries)
-
-        update_progress_markdown()
+        total_completed = archived["books"] + len(entries)
 
         return {
             "total_books": total_completed,
             "total_target": total_target,
             "by_domain": by_domain,
-            "recent": entries[-3:] if entries else [],
+            "recent": (entries if len(entries) >= 3 else full_log())[-3:],
             "message": f"You've read {total_completed} books across {len(by_domain)} domains",
-            "file": str(PROGRESS_DIR / "_current.md")
+            "file": str(progress_dir() / "_current.md")
+        }
+
+    @mcp.tool(annotations=READ_ONLY)
+    @memoize("reading_log", "log_archive", "rollups")
+    def get_reading_trends(
+        period: str = "month",
+        domain: str = None,
+        start: str = None,
+        end: str = None
+    ) -> dict:
+        """
+        Get reading trends over time: books finished, average rating and domain mix.
+
+        Args:
+            period: "month", "quarter" or "year"
+            domain: Optional domain ID to focus on (e.g., "neuroscience")
+            start: Optional first month, "YYYY-MM" (e.g., "2025-01")
+            end: Optional last month, "YYYY-MM"
+        """
+        try:
+            trends = reading_trends(period, domain=domain, start=start, end=end)
+        except ValueError as e:
+            return {"error": str(e), "periods": list(PERIODS)}
+
+        if not trends:
+            return {
+                "message": "No books logged yet.",
+                "suggestion": "Log books with log_book to see trends"
+            }
+
+        rated = [t for t in trends if t["average_rating"] is not None]
+        busiest = max(trends, key=lambda t: t["books"])
+        return {
+            "period": period,
+            "domain": domain,
+            "trends": trends,
+            "total_books": sum(t["books"] for t in trends),
+            "busiest": busiest["period"] if busiest["books"] else None,
+            "best_rated": max(rated, key=lambda t: t["average_rating"])["period"] if rated else None
+        }
+
+    @mcp.tool(annotations=READ_ONLY)
+    @memoize("reading_log", "log_archive", "facets", "authors")
+    def facet_query(
+        all_of: list[str] = None,
+        any_of: list[str] = None,
+        none_of: list[str] = None,
+        limit: int = 20
+    ) -> dict:
+        """
+        Find logged books by facets, with counts of each facet value among the matches.
+
+        Terms are "facet:value". Facets: domain, rating (1-5 or "none"),
+        difficulty (from the book's stack, or "unknown"), year, reflection
+        ("yes"/"no"), affinity (author affinity: high/medium/low/unknown)
+        and author (author slug).
+        Example: 5-star challenging classic_lit books finished in 2025 with a reflection:
+        all_of=["rating:5", "difficulty:challenging", "domain:classic_lit", "year:2025", "reflection:yes"]
+
+        Args:
+            all_of: Books must match every term
+            any_of: Books must match at least one of these terms
+            none_of: Books must match none of these terms
+            limit: Maximum books returned (newest first)
+        """
+        try:
+            result = query_facets(all_of or [], any_of or [], none_of or [], limit=limit)
+        except ValueError as e:
+            return {"error": str(e), "facets": list(FACETS)}
+
+        if not result["total"]:
+            return {
+                "message": "No logged books match those facets",
+                "total": 0,
+                "counts": result["counts"]
+            }
+        return {**result, "returned": len(result["entries"])}
+
+    @mcp.tool(writes=("reading_log", "log_archive", "facets"))
+    def archive_reading_log(older_than_years: int = None) -> dict:
+        """
+        Move old reading log entries into compressed yearly archives.
+
+        Entries from years that ended more than older_than_years ago are
+        archived; totals, progress and trends keep counting them, and tools
+        that need the entries themselves still find them.
+
+        Args:
+            older_than_years: Age in whole years (default: ARCHIVE_AFTER_YEARS, 5 unless configured)
+        """
+        try:
+            result = archive_log(older_than_years)
+        except ValueError as e:
+            return {"error": str(e)}
+
+        if not result["archived"]:
+            return {**result, "message": "Nothing old enough to archive"}
+        return {
+            **result,
+            "message": f"Archived {result['archived']} entries from {len(result['years'])} years"
         }
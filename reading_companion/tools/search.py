@@ -0,0 +1,38 @@
+"""
+Search Tools
+
+Tools for finding things in your reflections, notes and stacks.
+"""
+
+from ..cache import memoize
+from ..handlers import READ_ONLY
+from ..search import KINDS, search
+
+
+def register_search_tools(mcp):
+    """Register search tools with the MCP server."""
+
+    @mcp.tool(annotations=READ_ONLY)
+    @memoize("search_index", "search_delta")
+    def search_library(query: str, kind: str = None, limit: int = 10) -> dict:
+        """
+        Search your reflections, quick notes, author notes and stack rationales.
+
+        Args:
+            query: Words to search for (e.g., "unreliable narrator")
+            kind: Optional filter: "book", "author" or "stack"
+            limit: Maximum number of results (default 10)
+
+        Returns the best matches with the matching words highlighted.
+        """
+        if kind is not None and kind not in KINDS:
+            return {"error": f"Unknown kind '{kind}'", "kinds": list(KINDS)}
+
+        results = search(query, kind=kind, limit=limit)
+        if not results:
+            return {
+                "query": query,
+                "results": [],
+                "message": f"Nothing matched '{query}'"
+            }
+        return {"query": query, "results": results}
@@ -6,65 +6,60 @@ Tools for building and managing curated book stacks.
 
 from datetime import datetime
 
-from ..config import BOOKSTACKS_DIR, PROGRESS_DIR
+from ..config import bookstacks_dir, progress_dir, HISTORY_BUDGET_TOKENS
 from ..storage import load_json, save_json, load_prompt
+from ..budget import budget_reading_history
+from ..cache import memoize
 from ..markdown import save_bookstack_markdown
+from ..handlers import READ_ONLY
+from ..search import stack_documents, update_search_index
+from ..catalog import book_ref, logged_refs, register_book, save_catalog
+from ..avoidance import book_avoidances, stack_avoidances
+from ..archive import archived_books
+from ..records import StackBook
+from ..facets import stack_difficulties, update_difficulties
 
 
-def get_reading_history_context() -> dict:
+@memoize("reading_log", "log_archive", "authors", "patterns", "connections", "profile", "catalog")
+def get_reading_history_context(domain: str = None, budget_tokens: int = None) -> dict:
     """
-    Gather all reading history context for recommendations.
-    Returns a rich context dict with patterns, authors, and connections.
+    Gather reading history context for recommendations.
+
+    Returns the slice of patterns, authors, connections and reflections most
+    relevant to the target domain, trimmed to budget_tokens, with the rest
+    summarised as counts.
     """
-    log = load_json("reading_log", PROGRESS_DIR)
+    log = load_json("reading_log", progress_dir())
     authors_data = load_json("authors")
     patterns = load_json("patterns")
     connections = load_json("connections")
     profile = load_json("profile")
 
-    entries = log.get("entries", [])
-
-    # Get top authors by affinity
-    all_authors = authors_data.get("authors", {})
-    favorite_authors = [
-        {"name": a["name"], "books": a["total_books"], "rating": a.get("average_rating")}
-        for _, a in all_authors.items()
-        if a.get("affinity") == "high"
-    ]
-
-    avoidances = profile.get("context", {}).get("avoidances", [])
-
-    return {
-        "books_read": [
-            {
-                "title": e.get("title"),
-                "author": e.get("author"),
-                "domain": e.get("domain"),
-                "rating": e.get("rating"),
-                "had_reflection": e.get("reflection") is not None
-            }
-            for e in entries
-        ],
-        "total_books": len(entries),
-        "favorite_authors": favorite_authors,
-        "patterns": patterns.get("patterns", {}),
-        "themes_loved": patterns.get("patterns", {}).get("themes_loved", []),
-        "themes_avoided": [{"theme": a, "reason": "stated avoidance"} for a in avoidances],
-        "connections": connections.get("connections", []),
-        "clusters": connections.get("clusters", [])
-    }
+    return budget_reading_history(
+        domain=domain,
+        entries=log.get("entries", []),
+        archived=archived_books(),
+        all_authors=authors_data.get("authors", {}),
+        patterns=patterns.get("patterns", {}),
+        avoidances=profile.get("context", {}).get("avoidances", []),
+        connections=connections.get("connections", []),
+        clusters=connections.get("clusters", []),
+        budget_tokens=budget_tokens or HISTORY_BUDGET_TOKENS
+    )
 
 
 def register_syllabus_tools(mcp):
     """Register syllabus builder tools with the MCP server."""
 
-    @mcp.tool()
-    def build_bookstack(domain: str) -> dict:
+    @mcp.tool(annotations=READ_ONLY)
+    def build_bookstack(domain: str, max_history_tokens: int = None) -> dict:
         """
         Build a curated reading stack for a specific domain.
 
         Args:
             domain: The domain ID to build a stack for (e.g., "classic_lit").
+            max_history_tokens: Optional size budget for the reading history
+                context (defaults to HISTORY_BUDGET_TOKENS)
 
         Returns the syllabus builder prompt with user context.
         After generating recommendations, call save_bookstack to persist them.
@@ -89,7 +84,7 @@ def register_syllabus_tools(mcp):
                 "available_domains": available
             }
 
-        reading_history = get_reading_history_context()
+        reading_history = get_reading_history_context(domain, max_history_tokens)
 
         return {
             "instruction": f"Create a curated book stack for the '{domain}' domain",
@@ -102,29 +97,62 @@ def register_syllabus_tools(mcp):
             "reading_history": reading_history
         }
 
-    @mcp.tool()
-    def save_bookstack(domain: str, books: list[dict], description: str = None) -> dict:
+    @mcp.tool(writes=("bookstacks", "catalog", "facets", "search_index", "search_delta"))
+    def save_bookstack(
+        domain: str,
+        books: list[dict],
+        description: str = None,
+        skip_avoided: bool = False
+    ) -> dict:
         """
         Save a curated book stack for a domain.
 
+        Books touching one of the profile's avoidances are flagged in the
+        result, or left out with skip_avoided.
+
         Args:
             domain: The domain ID this stack belongs to
-            books: List of book recommendations
+            books: List of book recommendations ({"title", "author", "why",
+                "difficulty": "light" | "moderate" | "challenging",
+                "time_estimate", "craft_focus", "position"}; only title is required)
             description: Optional description of what this stack will achieve
+            skip_avoided: Leave out books that touch an avoidance
         """
+        try:
+            books = [StackBook.from_dict(book, f"books[{i}]").to_dict() for i, book in enumerate(books)]
+        except ValueError as e:
+            return {"error": str(e)}
+
+        flagged = [
+            {"title": book.get("title"), "avoids": avoids}
+            for book, avoids in zip(books, stack_avoidances(books))
+            if avoids
+        ]
+        if skip_avoided and flagged:
+            skipped = {item["title"] for item in flagged}
+            books = [book for book in books if book.get("title") not in skipped]
+
         stacks = load_json("bookstacks")
 
         if "stacks" not in stacks:
             stacks = {"version": "1.0", "stacks": {}}
 
+        catalog = load_json("catalog")
+        for book in books:
+            book["book_id"] = register_book(catalog, book.get("title", ""), book.get("author"))
+        save_catalog(catalog)
+
         stack_data = {
             "generated_at": datetime.now().isoformat(),
             "description": description,
             "books": books
         }
 
+        difficulties = stack_difficulties()
         stacks["stacks"][domain] = stack_data
         save_json("bookstacks", stacks)
+        update_difficulties(difficulties)
+        update_search_index(stack_documents(domain, stack_data), remove_prefix=f"stack:{domain}:")
 
         # Get domain name for markdown
         profile = load_json("profile")
@@ -136,15 +164,19 @@ def register_syllabus_tools(mcp):
 
         save_bookstack_markdown(domain, stack_data, domain_name)
 
-        return {
+        result = {
             "status": "saved",
             "domain": domain,
             "book_count": len(books),
             "titles": [b.get("title") for b in books],
-            "file": str(BOOKSTACKS_DIR / f"{domain}.md")
+            "file": str(bookstacks_dir() / f"{domain}.md")
         }
+        if flagged:
+            result["skipped_for_avoidances" if skip_avoided else "avoidance_warnings"] = flagged
+        return result
 
-    @mcp.tool()
+    @mcp.tool(annotations=READ_ONLY)
+    @memoize("bookstacks")
     def get_bookstacks(domain: str = None) -> dict:
         """Get all book stacks, or a specific domain's stack."""
         stacks = load_json("bookstacks")
@@ -162,35 +194,47 @@ def register_syllabus_tools(mcp):
 
         return stacks
 
-    @mcp.tool()
+    @mcp.tool(annotations=READ_ONLY)
     def get_next_book(domain: str = None) -> dict:
-        """Get the next recommended book to read."""
+        """Get the next recommended book to read, passing over books that touch an avoidance."""
         stacks = load_json("bookstacks")
-        log = load_json("reading_log", PROGRESS_DIR)
 
         if not stacks.get("stacks"):
             return {"message": "No bookstacks yet. Use build_bookstack first."}
 
-        completed = [e.get("title", "").lower() for e in log.get("entries", [])]
+        completed = logged_refs()
+        passed_over = []
 
         for stack_domain, stack_data in stacks.get("stacks", {}).items():
             if domain and stack_domain != domain:
                 continue
 
-            for book in stack_data.get("books", []):
-                if book.get("title", "").lower() not in completed:
-                    return {
-                        "domain": stack_domain,
-                        "book": book,
-                        "message": f"Next up in {stack_domain}"
-                    }
+            books = [
+                book for book in stack_data.get("books", [])
+                if book_ref(book.get("title", ""), book.get("author"), book.get("book_id")) not in completed
+            ]
+            for book, avoids in zip(books, stack_avoidances(books)):
+                if avoids:
+                    passed_over.append({"title": book.get("title"), "avoids": avoids})
+                    continue
+                result = {
+                    "domain": stack_domain,
+                    "book": book,
+                    "message": f"Next up in {stack_domain}"
+                }
+                if passed_over:
+                    result["skipped_for_avoidances"] = passed_over
+                return result
 
-        return {
+        result = {
             "message": "All books in stacks completed! Time to refresh recommendations.",
             "suggestion": "Use build_bookstack to add more books"
         }
+        if passed_over:
+            result["skipped_for_avoidances"] = passed_over
+        return result
 
-    @mcp.tool()
+    @mcp.tool(writes=("bookstacks", "catalog", "facets", "search_index", "search_delta"))
     def add_book_to_stack(
         domain: str,
         title: str,
@@ -199,6 +243,16 @@ def register_syllabus_tools(mcp):
         difficulty: str = "moderate"
     ) -> dict:
         """Manually add a book to an existing stack."""
+        try:
+            record = StackBook.from_dict({
+                "title": title,
+                "author": author,
+                "why": why or "Manually added",
+                "difficulty": difficulty,
+            })
+        except ValueError as e:
+            return {"error": str(e)}
+
         stacks = load_json("bookstacks")
 
         if "stacks" not in stacks:
@@ -213,17 +267,20 @@ def register_syllabus_tools(mcp):
         current_books = stacks["stacks"][domain].get("books", [])
         position = len(current_books) + 1
 
-        new_book = {
-            "title": title,
-            "author": author,
-            "why": why or "Manually added",
-            "difficulty": difficulty,
-            "position": position,
-            "added_at": datetime.now().isoformat()
-        }
+        catalog = load_json("catalog")
+        book_id = register_book(catalog, title, author)
+        save_catalog(catalog)
+
+        record.book_id = book_id
+        record.position = position
+        record.added_at = datetime.now().isoformat()
+        new_book = record.to_dict()
 
+        difficulties = stack_difficulties()
         stacks["stacks"][domain]["books"].append(new_book)
         save_json("bookstacks", stacks)
+        update_difficulties(difficulties)
+        update_search_index(stack_documents(domain, stacks["stacks"][domain])[-1:])
 
         # Update markdown
         profile = load_json("profile")
@@ -235,10 +292,14 @@ def register_syllabus_tools(mcp):
 
         save_bookstack_markdown(domain, stacks["stacks"][domain], domain_name)
 
-        return {
+        result = {
             "status": "added",
             "domain": domain,
             "book": title,
             "position": position,
             "total_in_stack": len(stacks["stacks"][domain]["books"])
         }
+        avoids = book_avoidances(new_book)
+        if avoids:
+            result["avoidance_warning"] = f"'{title}' touches avoidances: {', '.join(avoids)}"
+        return result
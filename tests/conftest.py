@@ -0,0 +1,62 @@
+"""
+Shared fixtures.
+
+Tests run against a scratch data directory, each as its own tenant, so
+every test starts from empty data and empty caches.
+"""
+
+import inspect
+import itertools
+import json
+import os
+import tempfile
+
+os.environ["READING_COMPANION_DATA_DIR"] = tempfile.mkdtemp(prefix="rc-tests-")
+
+import pytest  # noqa: E402
+
+from reading_companion.config import data_dir  # noqa: E402
+from reading_companion.storage import transaction  # noqa: E402
+from reading_companion.tenancy import use_tenant  # noqa: E402
+
+_tenants = itertools.count()
+
+
+@pytest.fixture(autouse=True)
+def tenant():
+    """A fresh tenant (data root and caches) for every test."""
+    name = f"test-{next(_tenants)}"
+    with use_tenant(name):
+        yield name
+
+
+@pytest.fixture(scope="session")
+def server():
+    from reading_companion import get_server
+
+    return get_server()
+
+
+@pytest.fixture
+def call(server):
+    """Call a tool's function directly, committing its saves like the server does."""
+    tools = {tool.name: inspect.unwrap(tool.fn) for tool in server._tool_manager.list_tools()}
+
+    def call(tool, /, **kwargs):
+        with transaction():
+            return tools[tool](**kwargs)
+
+    return call
+
+
+@pytest.fixture
+def save_elsewhere():
+    """Save a top-level dataset the way another server process would, unseen by this one."""
+
+    def save(name, data):
+        path = data_dir() / f"{name}.json"
+        tmp = path.with_name(f".{name}.elsewhere.tmp")
+        tmp.write_text(json.dumps(data))
+        os.replace(tmp, path)
+
+    return save
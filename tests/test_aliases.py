@@ -0,0 +1,42 @@
+from reading_companion.aliases import name_key, resolve_author, split_name
+from reading_companion.storage import load_json, save_json
+
+
+def test_names_are_normalised():
+    assert split_name("Tolstoy, Lev N.") == (["lev", "n"], "tolstoy")
+    assert name_key("Gabriel García Márquez") == "gabriel garcia marquez"
+    assert name_key("Martin Luther King, Jr.") == name_key("Martin Luther King Jr")
+
+
+def test_variants_resolve_to_one_record_unless_ambiguous():
+    save_json("authors", {"authors": {"leo-tolstoy": {"name": "Leo Tolstoy"}}})
+    assert resolve_author("Tolstoy, Leo") == "leo-tolstoy"
+    assert resolve_author("L. Tolstoy") == "leo-tolstoy"
+    assert resolve_author("Alexei Tolstoy") is None
+
+    save_json("authors", {"authors": {
+        "leo-tolstoy": {"name": "Leo Tolstoy"}, "lisa-tolstoy": {"name": "Lisa Tolstoy"},
+    }})
+    assert resolve_author("L. Tolstoy") is None
+
+
+def test_logging_a_variant_updates_the_existing_author(call):
+    call("log_book", title="War and Peace", author="Leo Tolstoy", domain="fiction", rating=5)
+    call("log_book", title="Anna Karenina", author="Tolstoy, Leo", domain="fiction", rating=4)
+
+    authors = load_json("authors")["authors"]
+    assert list(authors) == ["leo-tolstoy"]
+    assert authors["leo-tolstoy"]["books_read"] == ["War and Peace", "Anna Karenina"]
+
+
+def test_merge_authors_folds_duplicates_together(call):
+    save_json("authors", {"authors": {
+        "leo-tolstoy": {"name": "Leo Tolstoy", "books_read": ["War and Peace"], "ratings": [5]},
+        "lev-tolstoy": {"name": "Lev Tolstoy", "books_read": ["Resurrection"], "ratings": [3]},
+    }})
+    call("merge_authors", into="Leo Tolstoy", duplicates=["Lev Tolstoy"])
+
+    authors = load_json("authors")["authors"]
+    assert list(authors) == ["leo-tolstoy"]
+    assert authors["leo-tolstoy"]["books_read"] == ["War and Peace", "Resurrection"]
+    assert resolve_author("Lev Tolstoy") == "leo-tolstoy"
@@ -0,0 +1,56 @@
+import pytest
+
+from reading_companion import archive
+from reading_companion.archive import archive_log, archived_at, archived_books, archived_count, full_log
+from reading_companion.config import progress_dir
+from reading_companion.storage import load_json, save_json, transaction
+
+
+def _entry(n, year, domain="fiction", author="Jane Austen"):
+    return {
+        "id": f"log_{n}", "title": f"Book {n}", "author": author, "domain": domain,
+        "finished_at": f"{year}-06-01T12:00:00", "rating": 4, "quick_note": None, "reflection": None,
+    }
+
+
+@pytest.fixture
+def log():
+    entries = [_entry(0, 2001), _entry(1, 2001, "history", "Mary Beard"), _entry(2, 2002), _entry(3, 2999)]
+    save_json("reading_log", {"version": "1.0", "entries": entries}, progress_dir())
+    with transaction():
+        archive_log(5)
+    return entries
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    """Names of the segments decompressed from here on."""
+    names = []
+    segment_entries = archive.segment_entries
+
+    def counting(name):
+        names.append(name)
+        return segment_entries(name)
+
+    monkeypatch.setattr(archive, "segment_entries", counting)
+    return names
+
+
+def test_archived_entries_round_trip(log):
+    assert load_json("reading_log", progress_dir())["entries"] == log[3:]
+    assert archived_count() == 3
+    assert full_log() == log
+
+
+def test_archived_books_come_from_the_summaries(log, reads):
+    assert archived_books() == [
+        {"title": "Book 0", "author": "Jane Austen", "domain": "fiction", "year": "2001"},
+        {"title": "Book 1", "author": "Mary Beard", "domain": "history", "year": "2001"},
+        {"title": "Book 2", "author": "Jane Austen", "domain": "fiction", "year": "2002"},
+    ]
+    assert reads == []
+
+
+def test_archived_at_reads_only_the_segments_holding_the_positions(log, reads):
+    assert archived_at([2]) == {2: log[2]}
+    assert [name[:4] for name in reads] == ["2002"]
@@ -0,0 +1,52 @@
+from reading_companion.avoidance import AvoidanceMatcher, book_avoidances
+from reading_companion.storage import save_json
+
+
+def test_matches_whole_words_ignoring_case_and_diacritics():
+    matcher = AvoidanceMatcher(["war", "body horror", "he", "Café"])
+    assert matcher.find("Two WARS and an award") == {"war"}
+    assert matcher.find("Body horror in the CAFE") == {"body horror", "Café"}
+    assert matcher.find("the theme") == set()
+    assert AvoidanceMatcher([]).find("war") == set()
+
+
+def test_overlapping_phrases_are_all_found():
+    assert AvoidanceMatcher(["she", "he", "hers"]).find("ushers he she") == {"she", "he"}
+
+
+def test_books_are_checked_against_the_profile_and_author_themes():
+    save_json("profile", {"context": {"avoidances": ["war", "grief"]}})
+    save_json("authors", {"authors": {"leo-tolstoy": {
+        "name": "Leo Tolstoy", "style_notes": {"themes": ["war", "faith"]},
+    }}})
+
+    assert book_avoidances({"title": "War and Peace", "author": "Tolstoy, Leo"}) == ["war"]
+    assert book_avoidances({"title": "Emma", "why": "A comedy, not about grief"}) == ["grief"]
+    assert book_avoidances({"title": "Emma", "author": "Jane Austen"}) == []
+
+
+def test_stack_tools_flag_or_skip_avoided_books(call):
+    save_json("profile", {"context": {"avoidances": ["war"]}})
+    books = [{"title": "War and Peace"}, {"title": "Emma"}]
+
+    flagged = call("save_bookstack", domain="fiction", books=books)
+    assert flagged["avoidance_warnings"] == [{"title": "War and Peace", "avoids": ["war"]}]
+
+    skipped = call("save_bookstack", domain="fiction", books=books, skip_avoided=True)
+    assert skipped["titles"] == ["Emma"]
+    assert call("get_next_book")["book"]["title"] == "Emma"
+
+
+def test_a_stack_is_checked_with_one_matcher_and_author_lookup(monkeypatch, call):
+    from reading_companion import avoidance
+
+    save_json("profile", {"context": {"avoidances": ["war"]}})
+    lookups = []
+    for name in ("avoidance_matcher", "authors_by_slug"):
+        original = getattr(avoidance, name)
+        monkeypatch.setattr(avoidance, name, lambda original=original, name=name: lookups.append(name) or original())
+
+    books = [{"title": f"War {n}", "author": "Leo Tolstoy"} for n in range(20)]
+    result = call("save_bookstack", domain="fiction", books=books)
+    assert len(result["avoidance_warnings"]) == 20
+    assert sorted(lookups) == ["authors_by_slug", "avoidance_matcher"]
@@ -0,0 +1,52 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "benchmarks"))
+
+from run import blocking, tool_cases  # noqa: E402
+from synthetic import generate  # noqa: E402
+
+from reading_companion.config import data_dir  # noqa: E402
+
+
+def _files(root: Path) -> dict:
+    return {str(p.relative_to(root)): p.read_bytes() for p in sorted(root.rglob("*")) if p.is_file()}
+
+
+def test_generator_is_deterministic(tmp_path):
+    generate(tmp_path / "a", books=40, authors=8, connections=30, stack_size=5)
+    generate(tmp_path / "b", books=40, authors=8, connections=30, stack_size=5)
+    assert _files(tmp_path / "a") == _files(tmp_path / "b")
+
+
+@pytest.fixture
+def sample():
+    return generate(data_dir(), books=40, authors=8, connections=30, stack_size=5)
+
+
+def test_every_tool_has_a_benchmark_case(server, sample):
+    assert {name for name, _ in tool_cases(sample)} == {tool.name for tool in server._tool_manager.list_tools()}
+
+
+def test_every_benchmark_case_runs_on_synthetic_data(call, sample):
+    for name, kwargs in tool_cases(sample):
+        result = call(name, **kwargs)
+        assert not (isinstance(result, dict) and "error" in result), (name, result)
+
+
+def test_benchmark_calls_commit_through_the_registered_handler(server, sample, monkeypatch):
+    from reading_companion import storage
+
+    commits = []
+    commit = storage._commit
+    monkeypatch.setattr(storage, "_commit", lambda pending: commits.append(len(pending)) or commit(pending))
+    loop = asyncio.new_event_loop()
+    try:
+        tools = {tool.name: blocking(loop, tool.fn) for tool in server._tool_manager.list_tools()}
+        tools["update_latent_features"](features={"exploration_score": 0.7})
+    finally:
+        loop.close()
+    assert len(commits) == 1
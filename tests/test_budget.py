@@ -0,0 +1,44 @@
+from reading_companion import archive
+from reading_companion.archive import archive_log
+from reading_companion.budget import budget_reading_history, json_size
+from reading_companion.config import progress_dir
+from reading_companion.storage import save_json, transaction
+from reading_companion.tools.syllabus import get_reading_history_context
+
+
+def _entry(n, domain, year=2999):
+    return {
+        "id": f"log_{n}", "title": f"Book {n}", "author": f"Author {n}", "domain": domain,
+        "finished_at": f"{year}-06-01T12:00:00", "rating": 3, "quick_note": "x" * 200, "reflection": None,
+    }
+
+
+def _fail(name):
+    raise AssertionError(f"decompressed {name}")
+
+
+def test_context_fits_the_budget_and_prefers_the_domain():
+    entries = [_entry(n, "history" if n % 10 else "fiction") for n in range(200)]
+    context = budget_reading_history(
+        domain="fiction", entries=entries, all_authors={}, patterns={}, avoidances=[],
+        connections=[], clusters=[], budget_tokens=1000,
+    )
+    assert json_size(context) <= 4000
+    assert context["total_books"] == 200
+    fiction = [b for b in context["books_read"] if b["domain"] == "fiction"]
+    assert len(fiction) == 20
+    assert context["omitted"]["books_by_domain"]["history"] > 0
+    assert "fiction" not in context["omitted"]["books_by_domain"]
+
+
+def test_archived_books_come_from_summaries(monkeypatch):
+    entries = [_entry(0, "fiction", 2001), _entry(1, "history", 2002), _entry(2, "fiction")]
+    save_json("reading_log", {"version": "1.0", "entries": entries}, progress_dir())
+    with transaction():
+        archive_log(5)
+    monkeypatch.setattr(archive, "segment_entries", _fail)
+
+    context = get_reading_history_context("fiction")
+    assert context["total_books"] == 3
+    assert [b["title"] for b in context["books_read"]] == ["Book 0", "Book 1", "Book 2"]
+    assert context["books_read"][0]["archived_year"] == "2001"
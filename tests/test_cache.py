@@ -0,0 +1,57 @@
+import pytest
+
+from reading_companion.cache import memoize
+from reading_companion.storage import load_json, save_json, transaction
+
+
+calls = []
+
+
+@memoize("profile")
+def profile_name() -> str:
+    calls.append(1)
+    return load_json("profile").get("name")
+
+
+def test_result_is_cached_until_the_dataset_is_saved():
+    calls.clear()
+    save_json("profile", {"name": "Ada"})
+    assert profile_name() == profile_name() == "Ada"
+    assert len(calls) == 1
+
+    save_json("profile", {"name": "Grace"})
+    assert profile_name() == "Grace"
+    assert len(calls) == 2
+
+
+def test_saves_by_another_process_invalidate_the_cache(save_elsewhere):
+    save_json("profile", {"name": "Ada"})
+    assert profile_name() == "Ada"
+
+    save_elsewhere("profile", {"name": "Grace"})
+    assert profile_name() == "Grace"
+
+
+def test_calls_inside_a_transaction_see_its_saves_and_never_publish_them():
+    save_json("profile", {"name": "Ada"})
+    assert profile_name() == "Ada"
+
+    with pytest.raises(RuntimeError):
+        with transaction():
+            save_json("profile", {"name": "Grace"})
+            assert profile_name() == "Grace"
+            raise RuntimeError("roll back")
+
+    assert profile_name() == "Ada"
+
+
+def test_calls_inside_a_transaction_are_cached_until_it_saves_the_dataset():
+    save_json("profile", {"name": "Ada"})
+    calls.clear()
+    with transaction():
+        assert profile_name() == profile_name() == "Ada"
+        assert len(calls) == 1
+
+        save_json("profile", {"name": "Grace"})
+        assert profile_name() == profile_name() == "Grace"
+        assert len(calls) == 2
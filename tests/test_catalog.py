@@ -0,0 +1,52 @@
+from reading_companion.catalog import migrate_catalog, register_book, title_key
+from reading_companion.config import progress_dir
+from reading_companion.storage import load_json, save_json
+
+FELLOWSHIP = "The Lord of the Rings: The Fellowship of the Ring"
+TWO_TOWERS = "The Lord of the Rings: The Two Towers"
+RETURN = "The Lord of the Rings: The Return of the King"
+
+
+def test_generic_subtitles_and_articles_are_ignored():
+    assert title_key("The Count of Monte Cristo") == title_key("Count of Monte-Cristo: A Novel")
+    assert title_key("Educated (A Memoir)") == title_key("educated")
+
+
+def test_series_volumes_get_different_ids():
+    catalog = {}
+    ids = {register_book(catalog, title, "J. R. R. Tolkien") for title in (FELLOWSHIP, TWO_TOWERS, RETURN)}
+    assert len(ids) == 3
+    assert register_book(catalog, FELLOWSHIP.upper(), "J. R. R. Tolkien") in ids
+
+
+def test_series_volumes_stay_apart_in_tools(call):
+    call("save_profile", name="Reader", domains=[{"id": "fantasy", "name": "Fantasy"}],
+         preferences={}, context={})
+    call("save_bookstack", domain="fantasy", books=[
+        {"title": title, "author": "J. R. R. Tolkien"} for title in (FELLOWSHIP, TWO_TOWERS, RETURN)
+    ])
+    call("log_book", title=FELLOWSHIP, author="J. R. R. Tolkien", domain="fantasy")
+    call("log_book", title=TWO_TOWERS, author="J. R. R. Tolkien", domain="fantasy")
+
+    call("save_reflection", title=TWO_TOWERS, key_takeaway="Hope in the dark")
+    entries = load_json("reading_log", progress_dir())["entries"]
+    assert [e["title"] for e in entries if e["reflection"]] == [TWO_TOWERS]
+
+    author = call("get_author_profile", author="J. R. R. Tolkien")["author"]
+    assert author["books_read"] == [FELLOWSHIP, TWO_TOWERS]
+    assert call("get_next_book", domain="fantasy")["book"]["title"] == RETURN
+
+
+def test_migrate_splits_volumes_merged_under_one_id():
+    catalog = {}
+    book_id = register_book(catalog, FELLOWSHIP, "J. R. R. Tolkien")
+    save_json("catalog", catalog)
+    save_json("reading_log", {"entries": [
+        {"id": "a", "book_id": book_id, "title": FELLOWSHIP, "author": "J. R. R. Tolkien"},
+        {"id": "b", "book_id": book_id, "title": TWO_TOWERS, "author": "J. R. R. Tolkien"},
+    ]}, progress_dir())
+
+    assert migrate_catalog()["stamped"]["reading_log"] == 1
+    first, second = load_json("reading_log", progress_dir())["entries"]
+    assert first["book_id"] == book_id
+    assert second["book_id"] not in (None, book_id)
@@ -0,0 +1,33 @@
+import os
+import stat
+import tempfile
+
+from reading_companion import daemon
+
+
+def test_socket_is_owner_only_when_bound(monkeypatch, server):
+    import anyio
+
+    modes = []
+    create = anyio.create_unix_listener
+
+    async def recording(path, *args, **kwargs):
+        listener = await create(path, *args, **kwargs)
+        modes.append(stat.S_IMODE(os.stat(path).st_mode))
+        await listener.aclose()
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(anyio, "create_unix_listener", recording)
+    path = os.path.join(tempfile.mkdtemp(prefix="rc-sock-"), "daemon.sock")
+    umask = os.umask(0o022)
+    try:
+        try:
+            daemon.serve_daemon(server, path)
+        except KeyboardInterrupt:
+            pass
+        assert os.umask(0o022) == 0o022
+    finally:
+        os.umask(umask)
+
+    assert modes == [0o600]
+    assert not os.path.exists(path)
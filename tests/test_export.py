@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+from reading_companion.config import data_dir
+from reading_companion.export import STATE_FILE, export_library
+from reading_companion.storage import transaction
+
+
+def _rows(name="reading_log"):
+    lines = (data_dir() / "exports" / f"{name}.jsonl").read_text().splitlines()
+    return [json.loads(line) for line in lines]
+
+
+def test_books_logged_in_the_same_second_get_distinct_ids(call):
+    for title in ("Emma", "Persuasion", "Sanditon"):
+        call("log_book", title=title, author="Jane Austen", domain="fiction")
+
+    export_library("jsonl", datasets=["reading_log"])
+    assert len({row["id"] for row in _rows()}) == 3
+
+
+def test_repeat_exports_append_only_changes(call):
+    call("log_book", title="Emma", author="Jane Austen", domain="fiction")
+    first = export_library("jsonl", datasets=["reading_log"])["datasets"]["reading_log"]
+    assert (first["mode"], first["rows"]) == ("full", 1)
+
+    assert export_library("jsonl", datasets=["reading_log"])["datasets"]["reading_log"]["mode"] == "unchanged"
+
+    call("save_reflection", title="Emma", key_takeaway="Matchmaking backfires")
+    second = export_library("jsonl", datasets=["reading_log"])["datasets"]["reading_log"]
+    assert (second["mode"], second["rows"]) == ("incremental", 1)
+    rows = _rows()
+    assert [row["id"] for row in rows] == [rows[0]["id"]] * 2
+    assert rows[-1]["reflection_key_takeaway"] == "Matchmaking backfires"
+
+
+def test_export_state_is_kept_when_the_tool_is_rolled_back(call):
+    call("log_book", title="Emma", author="Jane Austen", domain="fiction")
+    with pytest.raises(RuntimeError):
+        with transaction():
+            export_library("jsonl", datasets=["reading_log"])
+            raise RuntimeError("roll back")
+
+    state = json.loads((data_dir() / "exports" / STATE_FILE).read_text())
+    assert "reading_log" in state["jsonl"]
+    assert export_library("jsonl", datasets=["reading_log"])["datasets"]["reading_log"]["mode"] == "unchanged"
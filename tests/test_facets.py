@@ -0,0 +1,104 @@
+import pytest
+
+from reading_companion import archive
+from reading_companion.archive import archive_log
+from reading_companion.config import progress_dir
+from reading_companion.facets import build_facets, facet_bitmaps, query_facets
+from reading_companion.storage import save_json, transaction
+
+
+def _entry(n, year, domain):
+    return {
+        "id": f"log_{n}", "title": f"Book {n}", "author": "Jane Austen", "domain": domain,
+        "finished_at": f"{year}-06-01T12:00:00", "rating": 4, "quick_note": None, "reflection": None,
+    }
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    entries = [_entry(0, 2001, "history"), _entry(1, 2002, "fiction"), _entry(2, 2999, "fiction")]
+    save_json("reading_log", {"version": "1.0", "entries": entries}, progress_dir())
+    save_json("facets", build_facets(entries), progress_dir())
+    with transaction():
+        archive_log(5)
+
+    names = []
+    segment_entries = archive.segment_entries
+    monkeypatch.setattr(archive, "segment_entries", lambda name: names.append(name) or segment_entries(name))
+    return names
+
+
+def test_query_decompresses_only_segments_with_matches(reads):
+    result = query_facets(all_of=["domain:fiction"])
+    assert [e["title"] for e in result["entries"]] == ["Book 2", "Book 1"]
+    assert result["counts"]["year"] == {"2002": 1, "2999": 1}
+    assert [name[:4] for name in reads] == ["2002"]
+
+
+def test_query_on_the_hot_log_decompresses_nothing(reads):
+    result = query_facets(all_of=["year:2999"])
+    assert [e["title"] for e in result["entries"]] == ["Book 2"]
+    assert reads == []
+
+
+def test_facet_terms_are_checked(reads):
+    with pytest.raises(ValueError):
+        query_facets(all_of=["colour:red"])
+
+
+def test_difficulty_follows_stack_edits(call):
+    call("log_book", title="Emma", author="Jane Austen", domain="fiction")
+    call("log_book", title="Dune", author="Frank Herbert", domain="fiction")
+    assert query_facets(all_of=["difficulty:unknown"])["total"] == 2
+
+    books = [{"title": "Emma", "author": "Jane Austen", "difficulty": "light"}]
+    call("save_bookstack", domain="fiction", books=books)
+    assert [e["title"] for e in query_facets(all_of=["difficulty:light"])["entries"]] == ["Emma"]
+
+    call("add_book_to_stack", domain="history", title="Dune", author="Frank Herbert", difficulty="challenging")
+    assert query_facets(all_of=["difficulty:challenging"])["total"] == 1
+
+    call("save_bookstack", domain="fiction", books=[])
+    assert query_facets()["counts"]["difficulty"] == {"challenging": 1, "unknown": 1}
+    assert facet_bitmaps()["size"] == 2
+
+
+def test_difficulty_of_archived_entries_follows_stack_edits(reads, monkeypatch, call):
+    from reading_companion import facets
+
+    moved = []
+    monkeypatch.setattr(facets, "segment_entries", lambda name: moved.append(name) or archive.segment_entries(name))
+    call("add_book_to_stack", domain="history", title="Book 0", author="Jane Austen", difficulty="light")
+
+    assert [name[:4] for name in moved] == ["2001"]
+    assert [e["title"] for e in query_facets(all_of=["difficulty:light"])["entries"]] == ["Book 0"]
+
+
+def test_stack_difficulties_reads_the_catalog_once_in_a_transaction(monkeypatch):
+    from reading_companion import catalog
+    from reading_companion.facets import stack_difficulties
+
+    books = [{"title": f"Book {n}", "author": "Jane Austen", "difficulty": "light"} for n in range(5)]
+    save_json("bookstacks", {"version": "1.0", "stacks": {"fiction": {"books": books}}})
+
+    loads = []
+    load_json = catalog.load_json
+    monkeypatch.setattr(catalog, "load_json", lambda name, *args: loads.append(name) or load_json(name, *args))
+    with transaction():
+        assert len(stack_difficulties()) == 5
+    assert loads == ["catalog"]
+
+
+def test_rebuild_looks_up_stack_difficulties_once(monkeypatch):
+    from reading_companion import facets
+
+    books = [{"title": "Book 3", "author": "Jane Austen", "difficulty": "light"}]
+    save_json("bookstacks", {"version": "1.0", "stacks": {"fiction": {"books": books}}})
+
+    lookups = []
+    stack_difficulties = facets.stack_difficulties
+    monkeypatch.setattr(facets, "stack_difficulties", lambda: lookups.append(1) or stack_difficulties())
+    with transaction():
+        built = build_facets([_entry(n, 2020, "fiction") for n in range(50)])
+    assert len(lookups) == 1
+    assert facets._decode(built["bitmaps"]["difficulty"]["light"]) == 1 << 3
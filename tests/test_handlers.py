@@ -0,0 +1,71 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from mcp.server.fastmcp import FastMCP
+
+from reading_companion.handlers import READ_ONLY, HandlerRegistrar
+from reading_companion.storage import load_json, save_json
+
+
+@pytest.fixture
+def app():
+    mcp = FastMCP("test")
+    return mcp, HandlerRegistrar(mcp)
+
+
+def _call(mcp, name, **arguments):
+    async def run():
+        return await mcp.call_tool(name, arguments)
+
+    return asyncio.run(run())
+
+
+def test_tools_run_off_the_event_loop(app):
+    mcp, registrar = app
+
+    @registrar.tool(annotations=READ_ONLY)
+    def where() -> str:
+        return threading.current_thread().name
+
+    _, result = _call(mcp, "where")
+    assert result["result"].startswith("reading-companion-read")
+
+
+def test_tools_must_declare_what_they_write(app):
+    _, registrar = app
+    with pytest.raises(ValueError, match="READ_ONLY or declare writes="):
+        @registrar.tool()
+        def sneaky() -> None:
+            pass
+
+
+def test_writes_to_one_dataset_never_interleave(app):
+    mcp, registrar = app
+
+    @registrar.tool(writes=("profile",))
+    def bump() -> int:
+        count = load_json("profile").get("count", 0)
+        time.sleep(0.02)
+        save_json("profile", {"count": count + 1})
+        return count + 1
+
+    async def run():
+        await asyncio.gather(*(mcp.call_tool("bump", {}) for _ in range(4)))
+
+    asyncio.run(run())
+    assert load_json("profile") == {"count": 4}
+
+
+def test_write_tool_saves_nothing_when_it_raises(app):
+    mcp, registrar = app
+
+    @registrar.tool(writes=("profile",))
+    def half_done() -> None:
+        save_json("profile", {"name": "Ada"})
+        raise RuntimeError("failed")
+
+    with pytest.raises(Exception):
+        _call(mcp, "half_done")
+    assert load_json("profile") == {}
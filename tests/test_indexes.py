@@ -0,0 +1,53 @@
+import pytest
+
+from reading_companion.indexes import authors_by_slug, stacks_by_domain
+from reading_companion.storage import save_json, transaction
+
+
+def test_index_is_rebuilt_after_a_save():
+    save_json("bookstacks", {"stacks": {"fiction": {"books": []}}})
+    first = stacks_by_domain()
+    assert stacks_by_domain() is first
+
+    save_json("bookstacks", {"stacks": {"history": {"books": []}}})
+    assert list(stacks_by_domain()) == ["history"]
+
+
+def test_index_notices_saves_by_another_process(save_elsewhere):
+    save_json("authors", {"authors": {"leo-tolstoy": {"name": "Leo Tolstoy"}}})
+    assert list(authors_by_slug()) == ["leo-tolstoy"]
+
+    save_elsewhere("authors", {"authors": {"jane-austen": {"name": "Jane Austen"}}})
+    assert list(authors_by_slug()) == ["jane-austen"]
+
+
+def test_index_inside_a_transaction_sees_its_saves_and_never_publishes_them():
+    save_json("bookstacks", {"stacks": {"fiction": {"books": []}}})
+    assert list(stacks_by_domain()) == ["fiction"]
+
+    with pytest.raises(RuntimeError):
+        with transaction():
+            save_json("bookstacks", {"stacks": {"history": {"books": []}}})
+            assert list(stacks_by_domain()) == ["history"]
+            raise RuntimeError("roll back")
+
+    assert list(stacks_by_domain()) == ["fiction"]
+
+
+def test_index_is_built_once_per_transaction_until_it_saves_the_dataset(monkeypatch):
+    from reading_companion import indexes
+
+    save_json("bookstacks", {"stacks": {"fiction": {"books": []}}})
+    loads = []
+    load_json = indexes.load_json
+    monkeypatch.setattr(indexes, "load_json", lambda name, *args: loads.append(name) or load_json(name, *args))
+
+    with transaction():
+        assert stacks_by_domain() is stacks_by_domain()
+        save_json("authors", {"authors": {}})
+        stacks_by_domain()
+        assert loads == ["bookstacks"]
+
+        save_json("bookstacks", {"stacks": {"history": {"books": []}}})
+        assert list(stacks_by_domain()) == ["history"]
+        assert loads == ["bookstacks", "bookstacks"]
@@ -0,0 +1,47 @@
+import contextvars
+import threading
+from contextlib import contextmanager
+
+from reading_companion.storage import dataset_lock
+from reading_companion.tenancy import use_tenant
+
+
+def _both_hold(first, second) -> bool:
+    """Whether two threads can hold their locks at the same time."""
+    barrier = threading.Barrier(2, timeout=0.5)
+    met = []
+
+    def hold(enter):
+        with enter():
+            try:
+                barrier.wait()
+                met.append(True)
+            except threading.BrokenBarrierError:
+                pass
+
+    threads = [
+        threading.Thread(target=contextvars.copy_context().run, args=(hold, enter))
+        for enter in (first, second)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(met) == 2
+
+
+def test_unrelated_datasets_are_written_in_parallel():
+    assert _both_hold(lambda: dataset_lock("profile"), lambda: dataset_lock("authors"))
+
+
+def test_one_dataset_has_one_writer_at_a_time():
+    assert not _both_hold(lambda: dataset_lock("profile", "authors"), lambda: dataset_lock("authors"))
+
+
+def test_tenants_write_the_same_dataset_in_parallel(tenant):
+    @contextmanager
+    def other():
+        with use_tenant(f"{tenant}-other"), dataset_lock("profile"):
+            yield
+
+    assert _both_hold(lambda: dataset_lock("profile"), other)
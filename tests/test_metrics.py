@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+from reading_companion.metrics import instrument, metrics_snapshot, reset_metrics
+from reading_companion.storage import load_json, save_json
+
+
+@pytest.fixture(autouse=True)
+def clean():
+    reset_metrics()
+    yield
+    reset_metrics()
+
+
+def test_calls_are_timed_and_their_file_io_attributed():
+    async def handler():
+        save_json("profile", {"name": "Ada"})
+        return load_json("profile")
+
+    assert asyncio.run(instrument("save_and_load", handler)()) == {"name": "Ada"}
+
+    stats = metrics_snapshot()["save_and_load"]
+    assert (stats["calls"], stats["errors"]) == (1, 0)
+    assert stats["bytes_written"] > 0 and stats["bytes_read"] > 0
+    assert any(path.endswith("profile.json") for path in stats["files"])
+    assert sum(stats["histogram"].values()) == 1
+
+
+def test_failed_calls_count_as_errors():
+    async def handler():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(instrument("fails", handler)())
+    assert metrics_snapshot()["fails"]["errors"] == 1
+
+
+def test_metrics_resource_reports_tool_calls(server):
+    async def run():
+        await server.call_tool("get_profile", {})
+        return await server.read_resource("metrics://tools")
+
+    (content,) = asyncio.run(run())
+    assert '"get_profile"' in content.content
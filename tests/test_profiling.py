@@ -0,0 +1,35 @@
+import pstats
+
+from reading_companion import profiling
+from reading_companion.profiling import profiled
+
+
+def _tool(n):
+    return sum(range(n))
+
+
+def test_unselected_tools_are_left_unwrapped(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_TOOLS", "")
+    assert profiled("sum_tool", _tool) is _tool
+
+
+def test_selected_calls_write_stats_and_allocations(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, "PROFILE_TOOLS", "other, sum_tool")
+    monkeypatch.setattr(profiling, "PROFILE_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(profiling, "PROFILE_DIR", tmp_path)
+
+    assert profiled("sum_tool", _tool)(1000) == sum(range(1000))
+
+    (stats_file,) = tmp_path.glob("*-sum_tool.pstats")
+    assert any(func[2] == "_tool" for func in pstats.Stats(str(stats_file)).stats)
+    (alloc_file,) = tmp_path.glob("*-sum_tool.alloc.txt")
+    assert alloc_file.read_text().startswith("# sum_tool")
+
+
+def test_unsampled_calls_write_nothing(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, "PROFILE_TOOLS", "all")
+    monkeypatch.setattr(profiling, "PROFILE_SAMPLE_RATE", 0.0)
+    monkeypatch.setattr(profiling, "PROFILE_DIR", tmp_path)
+
+    assert profiled("sum_tool", _tool)(10) == 45
+    assert list(tmp_path.iterdir()) == []
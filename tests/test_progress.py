@@ -0,0 +1,63 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from reading_companion import progress
+from reading_companion.progress import Cancelled, _Reporter, track
+from reading_companion.storage import load_json, save_json, transaction
+
+
+class Session:
+    def __init__(self):
+        self.sent = []
+
+    async def send_progress_notification(self, token, done, total, message, related_request_id=None):
+        self.sent.append((done, total, message))
+
+
+def _reporter(loop, session, token="t1"):
+    meta = SimpleNamespace(progressToken=token)
+    return _Reporter(SimpleNamespace(meta=meta, session=session, request_id=1), loop)
+
+
+def test_track_without_a_tool_call_only_yields():
+    assert list(track(range(5), chunk=2)) == [0, 1, 2, 3, 4]
+
+
+def test_progress_is_reported_per_chunk(monkeypatch):
+    monkeypatch.setattr(progress, "PROGRESS_MIN_INTERVAL", 0)
+    session = Session()
+
+    async def run():
+        reporter = _reporter(asyncio.get_running_loop(), session)
+        progress._current.set(reporter)
+        items = await asyncio.to_thread(lambda: list(track(range(10), label="books", chunk=4)))
+        await asyncio.sleep(0.05)
+        return items
+
+    assert asyncio.run(run()) == list(range(10))
+    assert [(done, total) for done, total, _ in session.sent] == [(4, 10), (8, 10), (10, 10)]
+    assert session.sent[0][2].startswith("4/10 books")
+
+
+def test_cancelled_tool_raises_and_saves_nothing():
+    session = Session()
+
+    async def run():
+        reporter = _reporter(asyncio.get_running_loop(), session, token=None)
+        progress._current.set(reporter)
+
+        def tool():
+            with transaction():
+                save_json("profile", {"name": "Ada"})
+                for i in track(range(100), chunk=10):
+                    if i == 15:
+                        reporter.cancelled.set()
+
+        await asyncio.to_thread(tool)
+
+    with pytest.raises(Cancelled):
+        asyncio.run(run())
+    assert load_json("profile") == {}
+    assert session.sent == []
@@ -0,0 +1,50 @@
+import pytest
+
+from reading_companion.archive import archive_log, segment_entries
+from reading_companion.config import progress_dir
+from reading_companion.records import ReadingEntry, StackBook
+from reading_companion.storage import load_json, save_json, transaction
+from reading_companion.tenancy import tenant_state
+
+ENTRY = {
+    "id": "log_1", "book_id": "bk_emma", "title": "Emma", "author": "Jane Austen", "domain": "fiction",
+    "finished_at": "2001-06-01T12:00:00", "rating": 5, "quick_note": None, "reflection": None,
+}
+
+
+def test_decode_round_trips_unknown_keys_and_shares_strings():
+    data = dict(ENTRY, legacy_field=[1, 2])
+    record = ReadingEntry.decode(data)
+    assert record.to_dict() == data
+    assert ReadingEntry.decode(dict(ENTRY, author="".join(["Jane ", "Austen"]))).author is record.author
+
+
+@pytest.mark.parametrize("data, message", [
+    ({"title": "Emma"}, "id is required"),
+    (dict(ENTRY, rating="5"), "rating must be an integer"),
+    (dict(ENTRY, rating=6), "rating must be between 1 and 5"),
+])
+def test_from_dict_names_the_bad_field(data, message):
+    with pytest.raises(ValueError, match=message):
+        ReadingEntry.from_dict(data)
+
+
+def test_stack_book_checks_difficulty_and_omits_unset_fields():
+    assert StackBook.from_dict({"title": "Emma"}).to_dict() == {"title": "Emma"}
+    with pytest.raises(ValueError, match=r"books\[2\]: difficulty must be one of"):
+        StackBook.from_dict({"title": "Emma", "difficulty": "hard"}, "books[2]")
+
+
+def test_archive_segments_are_cached_as_records():
+    save_json("reading_log", {"version": "1.0", "entries": [ENTRY]}, progress_dir())
+    with transaction():
+        archive_log(5)
+    (name,) = [summary["segment"] for summary in load_json("log_archive", progress_dir())["years"].values()]
+
+    entries = segment_entries(name)
+    assert entries == [ENTRY]
+    assert isinstance(tenant_state().indexes["_archive_segments"][name][0], ReadingEntry)
+
+    # Callers get their own dicts, so changing one doesn't touch the cache
+    entries[0]["rating"] = 1
+    assert segment_entries(name) == [ENTRY]
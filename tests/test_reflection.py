@@ -0,0 +1,25 @@
+from reading_companion.config import progress_dir
+from reading_companion.storage import transaction
+
+DOMAINS = [{"id": "fiction", "name": "Fiction", "target_books": 2}]
+
+
+def test_progress_page_is_written_by_the_write_tools(call):
+    call("save_profile", name="Ada", domains=DOMAINS, preferences={}, context={})
+    page = progress_dir() / "_current.md"
+    assert "0/2" in page.read_text()
+
+    call("log_book", title="Emma", author="Jane Austen", domain="fiction")
+    assert "1/2" in page.read_text()
+
+
+def test_get_progress_writes_nothing(call, monkeypatch):
+    from reading_companion import storage
+
+    call("save_profile", name="Ada", domains=DOMAINS, preferences={}, context={})
+    writes = []
+    monkeypatch.setattr(storage, "_commit", writes.append)
+    with transaction():
+        result = call("get_progress")
+    assert result["by_domain"]["fiction"]["status"] == "not_started"
+    assert writes == []
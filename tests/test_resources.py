@@ -0,0 +1,51 @@
+import asyncio
+import json
+
+import pytest
+
+from reading_companion.archive import archive_log
+from reading_companion.config import progress_dir
+from reading_companion.storage import save_json, transaction
+
+
+def _read(server, uri):
+    (content,) = asyncio.run(server.read_resource(uri))
+    return json.loads(content.content)
+
+
+@pytest.fixture
+def log():
+    # 5 entries in 2001 (archived below), then 20 in 2999
+    entries = [
+        {"id": f"log_{n}", "title": f"Book {n}", "author": "Jane Austen", "domain": "fiction",
+         "finished_at": f"{2001 if n < 5 else 2999}-01-{n + 1:02d}T12:00:00"}
+        for n in range(25)
+    ]
+    save_json("reading_log", {"version": "1.0", "entries": entries}, progress_dir())
+    with transaction():
+        archive_log(5)
+    return entries
+
+
+def test_log_pages_run_newest_first_into_the_archive(server, log):
+    first = _read(server, "log://page/1")
+    assert (first["total"], first["pages"]) == (25, 2)
+    assert [e["title"] for e in first["entries"]] == [f"Book {n}" for n in range(24, 4, -1)]
+
+    second = _read(server, "log://page/2")
+    assert [e["title"] for e in second["entries"]] == [f"Book {n}" for n in range(4, -1, -1)]
+    assert _read(server, "log://page/3")["entries"] == []
+
+
+def test_log_since_a_date(server, log):
+    assert [e["title"] for e in _read(server, "log://since/2999-01-24")] == ["Book 23", "Book 24"]
+    assert len(_read(server, "log://since/2001-01-04")) == 22
+
+
+def test_domain_and_author_resources(server):
+    save_json("bookstacks", {"stacks": {"fiction": {"books": [{"title": "Emma"}]}}})
+    save_json("authors", {"authors": {"jane-austen": {"name": "Jane Austen"}}})
+
+    assert _read(server, "bookstacks://fiction") == {"books": [{"title": "Emma"}]}
+    assert _read(server, "bookstacks://history")["available"] == ["fiction"]
+    assert _read(server, "author://jane-austen") == {"name": "Jane Austen"}
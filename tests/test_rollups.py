@@ -0,0 +1,76 @@
+import pytest
+
+from reading_companion.config import progress_dir
+from reading_companion.rollups import build_rollups, reading_trends
+from reading_companion.storage import load_json, save_json
+
+ENTRIES = [
+    {"title": "A", "domain": "fiction", "finished_at": "2024-01-05T10:00:00", "rating": 4},
+    {"title": "B", "domain": "history", "finished_at": "2024-01-20T10:00:00", "rating": 2},
+    {"title": "C", "domain": "fiction", "finished_at": "2024-03-02T10:00:00"},
+    {"title": "D", "domain": "fiction", "finished_at": "2024-05-11T10:00:00", "rating": 5},
+]
+
+
+@pytest.fixture
+def log():
+    save_json("reading_log", {"version": "1.0", "entries": ENTRIES}, progress_dir())
+
+
+def test_monthly_trends_include_empty_months(log):
+    trends = reading_trends("month")
+    assert [t["period"] for t in trends] == ["2024-01", "2024-02", "2024-03", "2024-04", "2024-05"]
+    assert trends[0] == {"period": "2024-01", "books": 2, "average_rating": 3.0,
+                         "domains": {"fiction": 1, "history": 1}}
+    assert trends[1]["books"] == 0
+
+
+def test_quarters_and_domains(log):
+    assert reading_trends("quarter", domain="fiction") == [
+        {"period": "2024-Q1", "books": 2, "average_rating": 4.0, "domains": {"fiction": 2}},
+        {"period": "2024-Q2", "books": 1, "average_rating": 5.0, "domains": {"fiction": 1}},
+    ]
+    with pytest.raises(ValueError):
+        reading_trends("week")
+    with pytest.raises(ValueError):
+        reading_trends("month", start="2024-13")
+
+
+def test_log_book_keeps_saved_rollups_current(call, log):
+    save_json("rollups", build_rollups(ENTRIES), progress_dir())
+    call("log_book", title="E", author="Jane Austen", domain="fiction", rating=3)
+
+    entries = load_json("reading_log", progress_dir())["entries"]
+    assert load_json("rollups", progress_dir()) == build_rollups(entries)
+
+
+def test_empty_log_gives_an_empty_trend():
+    assert reading_trends("month", start="2024-01") == []
+    assert reading_trends("year", end="2024-12") == []
+    assert [t["books"] for t in reading_trends("month", start="2024-01", end="2024-02")] == [0, 0]
+    with pytest.raises(ValueError):
+        reading_trends("month", start="2024-1")
+
+
+@pytest.mark.parametrize("with_months", [True, False])
+def test_rollups_are_rebuilt_from_archive_summaries(monkeypatch, call, log, with_months):
+    from reading_companion import archive, rollups
+    from reading_companion.archive import archive_log
+    from reading_companion.storage import transaction
+
+    with transaction():
+        archive_log(1)
+    if not with_months:
+        # Archived before summaries kept month buckets
+        summary = load_json("log_archive", progress_dir())
+        del summary["years"]["2024"]["months"]
+        save_json("log_archive", summary, progress_dir())
+    read = []
+    monkeypatch.setattr(rollups, "segment_entries", lambda name: read.append(name) or archive.segment_entries(name))
+
+    call("log_book", title="E", author="Jane Austen", domain="fiction", rating=3)
+    assert len(read) == (0 if with_months else 1)
+    trends = reading_trends("year")
+    assert trends[0] == {"period": "2024", "books": 4, "average_rating": 3.67,
+                         "domains": {"fiction": 3, "history": 1}}
+    assert trends[-1]["books"] == 1
@@ -0,0 +1,42 @@
+from reading_companion import search as search_module
+from reading_companion.search import search, tokenize
+from reading_companion.storage import load_json
+
+
+def _titles(results):
+    return [r["title"] for r in results]
+
+
+def test_tokenize_folds_case_and_diacritics_and_drops_stopwords():
+    assert tokenize("The Café of Émile") == ["cafe", "emile"]
+
+
+def test_logged_notes_and_stack_rationales_are_searchable(call):
+    call("log_book", title="Emma", author="Jane Austen", domain="fiction",
+         quick_note="Matchmaking goes wrong in a small village")
+    call("log_book", title="Dune", author="Frank Herbert", domain="scifi", quick_note="Desert ecology and empire")
+    call("add_book_to_stack", domain="scifi", title="Solaris", author="Stanisław Lem",
+         why="An ocean planet that resists every theory")
+
+    assert _titles(search("matchmaking village")) == ["Emma"]
+    results = search("ocean", kind="stack")
+    assert _titles(results) == ["Solaris"]
+    assert "**ocean**" in results[0]["snippet"]
+    assert search("ocean", kind="book") == []
+
+
+def test_reflections_replace_their_book_document(call):
+    call("log_book", title="Emma", author="Jane Austen", domain="fiction", quick_note="light comedy")
+    call("save_reflection", title="Emma", key_takeaway="Self-deception is the real plot")
+
+    assert _titles(search("self deception")) == ["Emma"]
+    assert len(search("emma")) == 1
+
+
+def test_delta_is_merged_into_the_main_index(call, monkeypatch):
+    monkeypatch.setattr(search_module, "MERGE_THRESHOLD", 2)
+    for title in ("Emma", "Persuasion", "Sanditon"):
+        call("log_book", title=title, author="Jane Austen", domain="fiction", quick_note=f"{title} notes")
+
+    assert len(load_json("search_delta")["docs"]) < 2
+    assert sorted(_titles(search("notes", kind="book"))) == ["Emma", "Persuasion", "Sanditon"]
@@ -0,0 +1,44 @@
+from reading_companion import archive
+from reading_companion.archive import archive_log
+from reading_companion.config import progress_dir
+from reading_companion.similarity import similar_books
+from reading_companion.storage import save_json, transaction
+
+
+def _entry(n, title, author, note, year=2999):
+    return {
+        "id": f"log_{n}", "title": title, "author": author, "domain": "fiction",
+        "finished_at": f"{year}-06-01T12:00:00", "rating": 4, "quick_note": note, "reflection": None,
+    }
+
+
+def _fail(name):
+    raise AssertionError(f"decompressed {name}")
+
+
+def test_books_sharing_notes_are_closest():
+    entries = [
+        _entry(0, "Emma", "Jane Austen", "matchmaking irony in a country village"),
+        _entry(1, "Middlemarch", "George Eliot", "provincial village life and marriage irony"),
+        _entry(2, "Dune", "Frank Herbert", "desert planet spice empire"),
+    ]
+    save_json("reading_log", {"version": "1.0", "entries": entries}, progress_dir())
+
+    assert [b["title"] for b in similar_books("Emma")] == ["Middlemarch"]
+    assert similar_books("Unknown Book") == []
+
+
+def test_archived_books_match_through_their_author_without_decompressing(monkeypatch):
+    entries = [
+        _entry(0, "Persuasion", "Jane Austen", "a note only the segment keeps", 2001),
+        _entry(1, "Emma", "Jane Austen", "matchmaking"),
+    ]
+    save_json("reading_log", {"version": "1.0", "entries": entries}, progress_dir())
+    save_json("authors", {"authors": {"jane-austen": {
+        "name": "Jane Austen", "style_notes": {"voice": "free indirect discourse"},
+    }}})
+    with transaction():
+        archive_log(5)
+    monkeypatch.setattr(archive, "segment_entries", _fail)
+
+    assert [b["title"] for b in similar_books("Emma")] == ["Persuasion"]
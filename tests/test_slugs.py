@@ -0,0 +1,43 @@
+from reading_companion.config import reflections_dir
+from reading_companion.slugs import assign_page, page_links, page_path
+from reading_companion.storage import save_json
+
+
+def test_books_sharing_a_title_get_their_own_pages():
+    first = assign_page("reflections", "bk_1", name="Collected Poems")
+    second = assign_page("reflections", "bk_2", name="Collected Poems!")
+    third = assign_page("reflections", "bk_3", name="Collected Poems")
+
+    assert [p.name for p in (first, second, third)] == [
+        "collected-poems.md", "collected-poems-2.md", "collected-poems-3.md"
+    ]
+    assert assign_page("reflections", "bk_1", name="Collected Poems") == first
+    assert page_path("reflections", "bk_3", name="Collected Poems") == third
+
+
+def test_pages_registered_by_title_move_to_the_book_id():
+    save_json("slugs", {"version": "1.0", "reflections": {"Dune": "dune.md"}})
+
+    assert page_path("reflections", "bk_dune", name="Dune") == reflections_dir() / "dune.md"
+    assert assign_page("reflections", "bk_dune", name="Dune") == reflections_dir() / "dune.md"
+    assert page_links("reflections") == {"bk_dune": "dune.md"}
+
+
+def test_logging_two_books_with_one_title_keeps_both_pages(call):
+    call("log_book", title="Collected Poems", author="Emily Dickinson", domain="poetry")
+    call("log_book", title="Collected Poems", author="Sylvia Plath", domain="poetry")
+
+    pages = sorted(p.name for p in reflections_dir().glob("collected-poems*.md"))
+    assert pages == ["collected-poems-2.md", "collected-poems.md"]
+    assert "Sylvia Plath" in (reflections_dir() / "collected-poems-2.md").read_text()
+
+
+def test_unregistered_pages_are_only_adopted_by_their_own_book():
+    reflections_dir().mkdir(parents=True, exist_ok=True)
+    legacy = reflections_dir() / "dune.md"
+    legacy.write_text("# Dune\n\n**Author**: Frank Herbert\n")
+
+    other = assign_page("reflections", "bk_other", name="Dune!")
+    assert other.name == "dune-2.md"
+    assert assign_page("reflections", "bk_dune", name="Dune") == legacy
+    assert legacy.read_text().startswith("# Dune\n")
@@ -0,0 +1,19 @@
+import subprocess
+import sys
+
+from reading_companion import startup
+
+
+def test_importing_the_package_leaves_the_mcp_stack_unloaded():
+    code = "import sys, reading_companion; print(sorted(m for m in sys.modules if m.split('.')[0] == 'mcp'))"
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    assert out.strip() == "[]"
+
+
+def test_profile_startup_times_every_phase_up_to_the_first_response(capsys, server, monkeypatch):
+    monkeypatch.setattr(startup, "_phases", [])
+    assert startup.profile_startup(started_at=0) in (0, 1)
+
+    phases = [item["phase"] for item in startup.startup_phases()]
+    assert phases == ["first_dataset_load", "first_response"]
+    assert "time_to_first_response" in capsys.readouterr().err
@@ -0,0 +1,107 @@
+import contextvars
+import json
+import os
+import threading
+
+import pytest
+
+from reading_companion import storage
+from reading_companion.config import data_dir
+from reading_companion.storage import JOURNAL_DIR, load_json, save_json, transaction
+from reading_companion.tenancy import tenant_state
+
+
+def _forget_recovery():
+    # As if the data root were used for the first time by a new process
+    tenant_state().recovered = False
+
+
+def test_transaction_commits_all_saves_or_none():
+    save_json("profile", {"name": "Ada"})
+    with pytest.raises(RuntimeError):
+        with transaction():
+            save_json("profile", {"name": "Grace"})
+            save_json("authors", {"authors": {}})
+            assert load_json("profile") == {"name": "Grace"}
+            raise RuntimeError("abort")
+    assert load_json("profile") == {"name": "Ada"}
+    assert load_json("authors") == {}
+
+
+def test_interrupted_journal_is_replayed_and_truncated_one_discarded():
+    save_json("profile", {"name": "Ada"})
+    journal_dir = data_dir() / JOURNAL_DIR
+    journal_dir.mkdir(exist_ok=True)
+    # No process has this pid, so both journals are left over from a crash
+    (journal_dir / "999999999-1-1.json").write_text(json.dumps(
+        {"writes": [{"path": "profile.json", "text": json.dumps({"name": "Grace"})}]}
+    ))
+    (journal_dir / "999999999-1-2.json").write_text('{"writes": [{"path": "authors.json", "te')
+
+    _forget_recovery()
+    assert load_json("profile") == {"name": "Grace"}
+    assert load_json("authors") == {}
+    assert not list(journal_dir.iterdir())
+
+
+def test_failed_commit_does_not_recover_journals_other_threads_are_committing(monkeypatch):
+    replace = storage._replace
+    failures = [OSError("disk full")]
+    other_applying = threading.Event()
+    release_other = threading.Event()
+
+    def flaky_replace(path, text, sync=False):
+        if path.name == "connections.json":
+            other_applying.set()
+            release_other.wait(5)
+        if path.name == "authors.json" and failures:
+            raise failures.pop()
+        replace(path, text, sync)
+
+    monkeypatch.setattr(storage, "_replace", flaky_replace)
+    errors = []
+
+    def other_writer(context):
+        def run():
+            try:
+                with transaction():
+                    save_json("connections", {"connections": []})
+            except Exception as e:
+                errors.append(e)
+        context.run(run)
+
+    thread = threading.Thread(target=other_writer, args=(contextvars.copy_context(),))
+    thread.start()
+    assert other_applying.wait(5)
+
+    with pytest.raises(OSError):
+        with transaction():
+            save_json("authors", {"authors": {}})
+    # Recovery runs again for this root: it finishes the failed commit but
+    # must leave the other thread's journal alone
+    assert load_json("authors") == {"authors": {}}
+
+    release_other.set()
+    thread.join(5)
+    assert errors == []
+    assert load_json("connections") == {"connections": []}
+
+
+def test_commit_fsyncs_files_and_directories_before_removing_the_journal(monkeypatch):
+    journal_dir = data_dir() / JOURNAL_DIR
+    synced = []
+    fsync = os.fsync
+
+    def recording_fsync(fd):
+        synced.append(bool(list(journal_dir.glob("*.json"))))
+        fsync(fd)
+
+    monkeypatch.setattr(os, "fsync", recording_fsync)
+    with transaction():
+        save_json("profile", {"name": "Ada"})
+        save_json("authors", {"authors": {}})
+
+    # Journal, both files and their directory, all while the journal still exists
+    assert len(synced) >= 4
+    assert all(synced[1:])
+    assert not list(journal_dir.glob("*.json"))
@@ -0,0 +1,43 @@
+import anyio
+from mcp import types
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from reading_companion.subscriptions import resource_version, subscriber_count
+
+
+def _updates(server, subscribe, tool, arguments):
+    """URIs and versions of the update notifications a subscribed client receives after one tool call."""
+    received = []
+
+    async def on_message(message):
+        if isinstance(message, types.ServerNotification):
+            notification = message.root
+            if isinstance(notification, types.ResourceUpdatedNotification):
+                received.append((str(notification.params.uri), notification.params.meta.version))
+
+    async def run():
+        async with create_connected_server_and_client_session(server, message_handler=on_message) as client:
+            for uri in subscribe:
+                await client.subscribe_resource(uri)
+            await client.call_tool(tool, arguments)
+            with anyio.fail_after(2):
+                while not received:
+                    await anyio.sleep(0.01)
+            await anyio.sleep(0.05)
+            for uri in subscribe:
+                await client.unsubscribe_resource(uri)
+
+    anyio.run(run)
+    return received
+
+
+def test_subscribers_hear_about_changes_to_their_datasets_only(server):
+    before = resource_version("bookstacks://all")
+    received = _updates(
+        server, ["bookstacks://all", "profile://current"],
+        "add_book_to_stack", {"domain": "fiction", "title": "Emma", "author": "Jane Austen"},
+    )
+
+    assert [uri for uri, _ in received] == ["bookstacks://all"]
+    assert received[0][1] == resource_version("bookstacks://all") != before
+    assert subscriber_count() == 0
@@ -0,0 +1,66 @@
+from types import SimpleNamespace
+
+import pytest
+
+from reading_companion import tenancy
+from reading_companion.config import data_dir
+from reading_companion.storage import dataset_lock, load_json, save_json
+from reading_companion.tenancy import pinned_state, request_tenant, tenant_state, use_tenant
+
+
+def test_tenants_see_only_their_own_data(tenant):
+    save_json("profile", {"name": "Ada"})
+    with use_tenant(f"{tenant}-other"):
+        assert load_json("profile") == {}
+        assert data_dir().name == f"{tenant}-other"
+        assert tenant_state().tenant == f"{tenant}-other"
+    assert load_json("profile") == {"name": "Ada"}
+
+
+@pytest.mark.parametrize("tenant", ["../escape", "", ".hidden", "a/b"])
+def test_unsafe_tenant_names_are_rejected(tenant):
+    with pytest.raises(ValueError):
+        with use_tenant(tenant):
+            pass
+
+
+def _mcp(meta=None, headers=None):
+    request = SimpleNamespace(headers=headers) if headers is not None else None
+    context = SimpleNamespace(meta=SimpleNamespace(tenant=meta) if meta else None, request=request)
+    return SimpleNamespace(get_context=lambda: SimpleNamespace(request_context=context))
+
+
+def test_meta_picks_the_tenant_outside_http(tenant):
+    assert request_tenant(_mcp(meta="ada")) == "ada"
+    assert request_tenant(_mcp()) == tenant
+
+
+def test_http_clients_cannot_pick_a_tenant_unless_enabled(tenant, monkeypatch):
+    headers = {tenancy.TENANT_HEADER: "ada"}
+    assert request_tenant(_mcp(meta="ada", headers={})) == tenant
+    assert request_tenant(_mcp(headers=headers)) == tenant
+
+    monkeypatch.setattr(tenancy, "HTTP_TENANT_HEADER", True)
+    assert request_tenant(_mcp(headers=headers)) == "ada"
+    assert request_tenant(_mcp(meta="grace", headers={})) == tenant
+
+
+def test_cold_tenants_are_evicted_with_their_locks_but_not_while_pinned(tenant, monkeypatch):
+    monkeypatch.setattr(tenancy, "MAX_LOADED_TENANTS", 1)
+    with dataset_lock("profile"):
+        held = tenant_state()
+        assert held.locks["profile"].locked()
+        with use_tenant(f"{tenant}-b"):
+            tenant_state()
+        assert tenant_state() is held
+
+    with use_tenant(f"{tenant}-b"):
+        tenant_state()
+    assert tenant_state() is not held
+    assert tenant_state().locks == {}
+
+
+def test_pinned_state_is_released(tenant):
+    with pinned_state() as state:
+        assert state.pins == 1
+    assert state.pins == 0